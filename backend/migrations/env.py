@@ -20,6 +20,7 @@ from src.db.session import Base
 from src.db.models import (  # noqa: F401
     audit_log,
     invoice,
+    ledger_summary,
     promo_code,
     tariff,
     transaction,
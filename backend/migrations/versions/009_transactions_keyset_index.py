@@ -0,0 +1,56 @@
+"""Composite index for keyset pagination of transaction history.
+
+Replaces idx_transactions_user_id with (user_id, created_at DESC, id DESC),
+which serves both the per-user filter and the history ordering.
+
+Revision ID: 009_tx_keyset_index
+Revises: 008_add_apply_feedbacks
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "009_tx_keyset_index"
+down_revision: Union[str, None] = "008_add_apply_feedbacks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_transactions_user_created_at_id",
+            "transactions",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "idx_transactions_user_id",
+            table_name="transactions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_transactions_user_id",
+            "transactions",
+            ["user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "idx_transactions_user_created_at_id",
+            table_name="transactions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,152 @@
+"""Add user_ledger_summary maintained by a transactions trigger.
+
+Keeps per-user totals by type, the transaction count and daily spend buckets
+for the last 30 days, so stats screens do not aggregate the whole ledger.
+The trigger runs in the same transaction as the ledger insert.
+
+Revision ID: 010_user_ledger_summary
+Revises: 009_tx_keyset_index
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision: str = "010_user_ledger_summary"
+down_revision: Union[str, None] = "009_tx_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Buckets older than 29 days before the inserted row's day are pruned,
+# keeping 30 days (DAILY_SPEND_RETENTION_DAYS in the model)
+APPLY_FUNCTION = """
+CREATE OR REPLACE FUNCTION apply_transaction_to_ledger_summary()
+RETURNS trigger AS $$
+DECLARE
+    day_key text := to_char(NEW.created_at, 'YYYY-MM-DD');
+    cutoff_key text := to_char(NEW.created_at - interval '29 days', 'YYYY-MM-DD');
+    is_spend boolean := NEW.type = 'spend';
+BEGIN
+    INSERT INTO user_ledger_summary AS s (
+        user_id, total_topup, total_spent, total_refund, total_adjustment,
+        total_subscription, transaction_count, daily_spend, updated_at
+    )
+    VALUES (
+        NEW.user_id,
+        CASE WHEN NEW.type = 'topup' THEN NEW.tokens_delta ELSE 0 END,
+        CASE WHEN is_spend THEN NEW.tokens_delta ELSE 0 END,
+        CASE WHEN NEW.type = 'refund' THEN NEW.tokens_delta ELSE 0 END,
+        CASE WHEN NEW.type = 'adjustment' THEN NEW.tokens_delta ELSE 0 END,
+        CASE WHEN NEW.type = 'subscription' THEN NEW.tokens_delta ELSE 0 END,
+        1,
+        CASE WHEN is_spend
+            THEN jsonb_build_object(day_key, NEW.tokens_delta)
+            ELSE '{}'::jsonb
+        END,
+        now() AT TIME ZONE 'utc'
+    )
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_topup = s.total_topup + EXCLUDED.total_topup,
+        total_spent = s.total_spent + EXCLUDED.total_spent,
+        total_refund = s.total_refund + EXCLUDED.total_refund,
+        total_adjustment = s.total_adjustment + EXCLUDED.total_adjustment,
+        total_subscription = s.total_subscription + EXCLUDED.total_subscription,
+        transaction_count = s.transaction_count + 1,
+        daily_spend = CASE WHEN is_spend THEN (
+            SELECT COALESCE(jsonb_object_agg(b.key, b.value), '{}'::jsonb)
+            FROM jsonb_each(
+                s.daily_spend || jsonb_build_object(
+                    day_key,
+                    COALESCE((s.daily_spend ->> day_key)::float8, 0) + NEW.tokens_delta
+                )
+            ) AS b
+            WHERE b.key >= cutoff_key
+        ) ELSE s.daily_spend END,
+        updated_at = EXCLUDED.updated_at;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Same query as _REBUILD_SQL in src/db/repositories/ledger_summary_repository.py
+# (kept inline so the migration does not depend on application code)
+BACKFILL = """
+INSERT INTO user_ledger_summary (
+    user_id, total_topup, total_spent, total_refund, total_adjustment,
+    total_subscription, transaction_count, daily_spend, updated_at
+)
+SELECT
+    t.user_id,
+    COALESCE(SUM(t.tokens_delta) FILTER (WHERE t.type = 'topup'), 0),
+    COALESCE(SUM(t.tokens_delta) FILTER (WHERE t.type = 'spend'), 0),
+    COALESCE(SUM(t.tokens_delta) FILTER (WHERE t.type = 'refund'), 0),
+    COALESCE(SUM(t.tokens_delta) FILTER (WHERE t.type = 'adjustment'), 0),
+    COALESCE(SUM(t.tokens_delta) FILTER (WHERE t.type = 'subscription'), 0),
+    COUNT(*),
+    COALESCE(d.buckets, '{}'::jsonb),
+    now() AT TIME ZONE 'utc'
+FROM transactions t
+LEFT JOIN (
+    SELECT user_id, jsonb_object_agg(day_key, spent) AS buckets
+    FROM (
+        SELECT user_id, to_char(created_at, 'YYYY-MM-DD') AS day_key,
+               SUM(tokens_delta) AS spent
+        FROM transactions
+        WHERE type = 'spend'
+          AND created_at >= date_trunc('day', now() AT TIME ZONE 'utc') - interval '29 days'
+        GROUP BY 1, 2
+    ) AS daily
+    GROUP BY user_id
+) AS d ON d.user_id = t.user_id
+GROUP BY t.user_id, d.buckets
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_ledger_summary",
+        sa.Column(
+            "user_id",
+            sa.BigInteger(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("total_topup", sa.Float(), server_default="0", nullable=False),
+        sa.Column("total_spent", sa.Float(), server_default="0", nullable=False),
+        sa.Column("total_refund", sa.Float(), server_default="0", nullable=False),
+        sa.Column("total_adjustment", sa.Float(), server_default="0", nullable=False),
+        sa.Column("total_subscription", sa.Float(), server_default="0", nullable=False),
+        sa.Column("transaction_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "daily_spend",
+            JSONB(),
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+    )
+
+    op.execute(APPLY_FUNCTION)
+
+    # Block ledger writes while the trigger is installed and the table is
+    # backfilled, so no insert is counted twice or missed
+    op.execute("LOCK TABLE transactions IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        "CREATE TRIGGER trg_transactions_ledger_summary "
+        "AFTER INSERT ON transactions "
+        "FOR EACH ROW EXECUTE FUNCTION apply_transaction_to_ledger_summary()"
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_ledger_summary ON transactions")
+    op.execute("DROP FUNCTION IF EXISTS apply_transaction_to_ledger_summary()")
+    op.drop_table("user_ledger_summary")
@@ -0,0 +1,35 @@
+"""Allocate Robokassa InvIds from a sequence.
+
+Creates invoices_inv_id_seq seeded past the current MAX(inv_id), replacing
+MAX(inv_id) + 1 allocation.
+
+Revision ID: 011_inv_id_sequence
+Revises: 010_user_ledger_summary
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "011_inv_id_sequence"
+down_revision: Union[str, None] = "010_user_ledger_summary"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS invoices_inv_id_seq AS bigint OWNED BY invoices.inv_id")
+
+    # Block invoice inserts by old code while seeding so MAX cannot move
+    op.execute("LOCK TABLE invoices IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        "SELECT setval('invoices_inv_id_seq', "
+        "(SELECT COALESCE(MAX(inv_id), 0) + 1 FROM invoices), false)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP SEQUENCE IF EXISTS invoices_inv_id_seq")
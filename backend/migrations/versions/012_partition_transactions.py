@@ -0,0 +1,119 @@
+"""Partition transactions by month on created_at.
+
+Rebuilds transactions as a RANGE-partitioned table with one partition per
+month from the oldest row up to PARTITIONS_AHEAD months ahead, plus a
+DEFAULT partition as a safety net. Later months are created by
+TransactionPartitionRepository.ensure_partitions.
+
+The primary key becomes (id, created_at) because a partitioned table's
+unique constraints must include the partition key. Ledger writes are
+blocked for the duration of the copy.
+
+Revision ID: 012_partition_transactions
+Revises: 011_inv_id_sequence
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+
+from datetime import date, datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "012_partition_transactions"
+down_revision: Union[str, None] = "011_inv_id_sequence"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS_AHEAD = 3
+
+INDEXES = (
+    ("idx_transactions_user_created_at_id", "(user_id, created_at DESC, id DESC)"),
+    ("idx_transactions_created_at", "(created_at)"),
+    ("idx_transactions_type", "(type)"),
+)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _detach_old_table() -> None:
+    """Rename current transactions out of the way, freeing its names."""
+    op.execute("LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_ledger_summary ON transactions")
+    op.execute("ALTER TABLE transactions RENAME TO transactions_old")
+    op.execute("ALTER INDEX pk_transactions RENAME TO pk_transactions_old")
+    for name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("DROP INDEX IF EXISTS idx_transactions_user_id")
+
+
+def _finish_new_table() -> None:
+    """Add constraints, indexes and the ledger summary trigger."""
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT fk_transactions_user_id_users "
+        "FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE RESTRICT"
+    )
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT fk_transactions_invoice_id_invoices "
+        "FOREIGN KEY (invoice_id) REFERENCES invoices (id) ON DELETE SET NULL"
+    )
+    for name, columns in INDEXES:
+        op.execute(f"CREATE INDEX {name} ON transactions {columns}")
+    op.execute(
+        "CREATE TRIGGER trg_transactions_ledger_summary "
+        "AFTER INSERT ON transactions "
+        "FOR EACH ROW EXECUTE FUNCTION apply_transaction_to_ledger_summary()"
+    )
+
+
+def upgrade() -> None:
+    _detach_old_table()
+
+    op.execute(
+        "CREATE TABLE transactions "
+        "(LIKE transactions_old INCLUDING DEFAULTS INCLUDING COMMENTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT pk_transactions "
+        "PRIMARY KEY (id, created_at)"
+    )
+
+    oldest: datetime | None = op.get_bind().execute(
+        sa.text("SELECT MIN(created_at) FROM transactions_old")
+    ).scalar()
+    current = date.today().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest is not None else current
+    last = _add_months(current, PARTITIONS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE transactions_p{month:%Y%m} PARTITION OF transactions "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+    op.execute("CREATE TABLE transactions_default PARTITION OF transactions DEFAULT")
+
+    op.execute("INSERT INTO transactions SELECT * FROM transactions_old")
+    op.execute("DROP TABLE transactions_old")
+
+    _finish_new_table()
+
+
+def downgrade() -> None:
+    _detach_old_table()
+
+    op.execute(
+        "CREATE TABLE transactions "
+        "(LIKE transactions_old INCLUDING DEFAULTS INCLUDING COMMENTS)"
+    )
+    op.execute("ALTER TABLE transactions ADD CONSTRAINT pk_transactions PRIMARY KEY (id)")
+    op.execute("INSERT INTO transactions SELECT * FROM transactions_old")
+    op.execute("DROP TABLE transactions_old")
+
+    _finish_new_table()
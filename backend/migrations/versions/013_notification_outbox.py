@@ -0,0 +1,57 @@
+"""Add notification_outbox table.
+
+Payment and subscription notifications are written here in the same
+transaction as the balance change and delivered by OutboxDispatcher.
+
+Revision ID: 013_notification_outbox
+Revises: 012_partition_transactions
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013_notification_outbox'
+down_revision: Union[str, None] = '012_partition_transactions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    outbox_status_enum = sa.Enum('pending', 'sent', 'failed', name='outbox_status')
+    outbox_status_enum.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column('chat_id', sa.BigInteger(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('dedupe_key', sa.Text(), nullable=True),
+        sa.Column('status', outbox_status_enum, server_default='pending', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('dedupe_key', name='uq_notification_outbox_dedupe_key'),
+    )
+
+    # Dispatcher scans only due pending rows
+    op.create_index(
+        'idx_notification_outbox_pending',
+        'notification_outbox',
+        ['next_attempt_at'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index('idx_notification_outbox_created_at', 'notification_outbox', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_notification_outbox_created_at', table_name='notification_outbox')
+    op.drop_index('idx_notification_outbox_pending', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
+    sa.Enum(name='outbox_status').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,45 @@
+"""Add archived_ledger_totals for dropped transactions partitions.
+
+Archiving a transactions partition folds its per-user totals into this
+table before the partition is dropped, so rebuilding user_ledger_summary
+from the remaining ledger keeps the archived history.
+
+Revision ID: 014_archived_ledger_totals
+Revises: 013_notification_outbox
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "014_archived_ledger_totals"
+down_revision: Union[str, None] = "013_notification_outbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_ledger_totals",
+        sa.Column(
+            "user_id",
+            sa.BigInteger(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("total_topup", sa.Float(), server_default="0", nullable=False),
+        sa.Column("total_spent", sa.Float(), server_default="0", nullable=False),
+        sa.Column("total_refund", sa.Float(), server_default="0", nullable=False),
+        sa.Column("total_adjustment", sa.Float(), server_default="0", nullable=False),
+        sa.Column("total_subscription", sa.Float(), server_default="0", nullable=False),
+        sa.Column("transaction_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("archived_ledger_totals")
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark for the API rate limiter.
+
+Compares GCRARateLimiter with the previous per-client timestamp list
+(rebuilt on every request) while the number of distinct clients grows,
+with each client sending up to its limit:
+    python -m scripts.bench_rate_limiter
+    python -m scripts.bench_rate_limiter --clients 100 1000 10000 --calls 100 --requests 200000
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.core.rate_limiter import GCRARateLimiter  # noqa: E402
+
+
+class LegacyLimiter:
+    """Previous RateLimitMiddleware bookkeeping (without the asyncio.Lock)."""
+
+    def __init__(self, calls: int, period: int) -> None:
+        self.calls = calls
+        self.period = period
+        self.requests: dict[str, list[datetime]] = defaultdict(list)
+
+    def acquire(self, client_id: str) -> bool:
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.period)
+        self.requests[client_id] = [t for t in self.requests[client_id] if t > cutoff]
+        if len(self.requests[client_id]) >= self.calls:
+            return False
+        self.requests[client_id].append(datetime.utcnow())
+        return True
+
+
+def build_keys(clients: int, requests: int, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    return [f"ip:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in (rng.randrange(clients) for _ in range(requests))]
+
+
+def run(acquire, keys: list[str]) -> float:
+    """Return mean microseconds per request."""
+    started = time.perf_counter()
+    for key in keys:
+        acquire(key)
+    return (time.perf_counter() - started) / len(keys) * 1e6
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="API rate limiter micro-benchmark")
+    parser.add_argument(
+        "--clients",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 10000, 50000],
+        help="Distinct client counts to test (default: 10 100 1000 10000 50000)",
+    )
+    parser.add_argument("--calls", type=int, default=100, help="Allowed calls per period (default: 100)")
+    parser.add_argument("--period", type=int, default=60, help="Period in seconds (default: 60)")
+    parser.add_argument("--requests", type=int, default=200_000, help="Requests per run (default: 200000)")
+    parser.add_argument("--max-keys", type=int, default=100_000, help="GCRA key cap (default: 100000)")
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'legacy us/req':>14} {'gcra us/req':>12} {'speedup':>8} {'gcra keys':>10}")
+    for clients in args.clients:
+        keys = build_keys(clients, args.requests)
+
+        legacy = LegacyLimiter(args.calls, args.period)
+        legacy_us = run(legacy.acquire, keys)
+
+        gcra = GCRARateLimiter(args.calls, args.period, max_keys=args.max_keys)
+        gcra_us = run(gcra.acquire, keys)
+
+        print(
+            f"{clients:>8} {legacy_us:>14.2f} {gcra_us:>12.2f} "
+            f"{legacy_us / gcra_us:>7.1f}x {len(gcra):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Micro-benchmark for the Runner SSE decoder.
+
+Compares SSEDecoder with the previous line splitter (bytes concatenation
+plus split per line) on a stream of large bot_output events fed in
+network-sized chunks:
+    python -m scripts.bench_sse_parser
+    python -m scripts.bench_sse_parser --event-mb 8 --events 3 --chunk-kb 16
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.services.runner.sse import SSEDecoder  # noqa: E402
+
+
+def build_stream(event_bytes: int, events: int) -> bytes:
+    """Build an SSE stream of bot_output file events plus a final done."""
+    parts = []
+    for index in range(events):
+        payload = json.dumps(
+            {
+                "type": "bot_output",
+                "output_type": "file",
+                "filename": f"result_{index}.md",
+                "content": "x" * event_bytes,
+                "index": index,
+            }
+        )
+        parts.append(f"id: {index}\ndata: {payload}\n\n".encode())
+    parts.append(b'data: {"type": "done"}\n\n')
+    return b"".join(parts)
+
+
+def chunked(stream: bytes, chunk_size: int) -> list[bytes]:
+    return [stream[i : i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+def legacy_parse(chunks: list[bytes]) -> int:
+    """Previous RunnerClient.stream_task line handling."""
+    count = 0
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        while b"\n" in buffer:
+            line_bytes, buffer = buffer.split(b"\n", 1)
+            line_str = line_bytes.decode("utf-8").strip()
+            if line_str.startswith("data: "):
+                json.loads(line_str[6:])
+                count += 1
+    return count
+
+
+def decoder_parse(chunks: list[bytes]) -> int:
+    count = 0
+    decoder = SSEDecoder(max_event_size=1 << 30)
+    for chunk in chunks:
+        for event in decoder.feed(chunk):
+            json.loads(event.data)
+            count += 1
+    for event in decoder.flush():
+        json.loads(event.data)
+        count += 1
+    return count
+
+
+def run(name: str, parse, chunks: list[bytes], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = parse(chunks)
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<10} {best * 1000:>10.1f} ms  ({count} events)")
+    return best
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="SSE decoder micro-benchmark")
+    parser.add_argument("--event-mb", type=float, default=4.0, help="Size of each event (default: 4 MB)")
+    parser.add_argument("--events", type=int, default=3, help="Number of large events (default: 3)")
+    parser.add_argument("--chunk-kb", type=int, default=64, help="Network chunk size (default: 64 KB)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per parser, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    stream = build_stream(int(args.event_mb * 1024 * 1024), args.events)
+    chunks = chunked(stream, args.chunk_kb * 1024)
+    print(f"Stream: {len(stream) / 1024 / 1024:.1f} MB in {len(chunks)} chunks of {args.chunk_kb} KB")
+
+    legacy = run("legacy", legacy_parse, chunks, args.repeat)
+    decoder = run("decoder", decoder_parse, chunks, args.repeat)
+    print(f"Speedup: {legacy / decoder:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,7 @@ from uuid import uuid4
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from db.replica import get_read_session  # noqa: E402
 from db.session import async_session_factory  # noqa: E402
 from db.models.promo_code import DiscountType, PromoCode  # noqa: E402
 from db.repositories.promo_code_repository import PromoCodeRepository  # noqa: E402
@@ -104,7 +105,7 @@ async def create_promo(args: argparse.Namespace) -> None:
 
 async def list_promos(args: argparse.Namespace) -> None:
     """List promo codes."""
-    async with async_session_factory() as session:
+    async with get_read_session() as session:
         repo = PromoCodeRepository(session)
 
         if args.active:
@@ -130,7 +131,7 @@ async def list_promos(args: argparse.Namespace) -> None:
 
 async def show_promo(args: argparse.Namespace) -> None:
     """Show promo code details."""
-    async with async_session_factory() as session:
+    async with get_read_session() as session:
         repo = PromoCodeRepository(session)
         promo = await repo.get_by_code(args.code)
 
@@ -0,0 +1,185 @@
+"""CLI for monthly transactions partitions.
+
+Usage:
+    # List attached partitions with row counts
+    python -m scripts.manage_transaction_partitions list
+
+    # Create partitions up to N months ahead (default: TRANSACTION_PARTITIONS_AHEAD)
+    python -m scripts.manage_transaction_partitions ensure
+    python -m scripts.manage_transaction_partitions ensure --months-ahead 6
+
+    # Archive partitions older than 12 full months to gzipped CSV, then drop them
+    python -m scripts.manage_transaction_partitions archive --keep-months 12 \
+        --output-dir /var/backups/transactions
+
+    # Show what would be archived
+    python -m scripts.manage_transaction_partitions archive --dry-run
+
+Archived rows stay counted in user_ledger_summary: their per-user totals
+are kept in archived_ledger_totals, which scripts.rebuild_ledger_summary
+adds back.
+"""
+
+import argparse
+import asyncio
+import gzip
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.core.config import settings  # noqa: E402
+from src.db.replica import get_read_session  # noqa: E402
+from src.db.repositories.transaction_partition_repository import (  # noqa: E402
+    TransactionPartitionRepository,
+    add_months,
+)
+from src.db.session import async_session_factory  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def list_partitions(_args: argparse.Namespace) -> None:
+    """List attached partitions."""
+    async with get_read_session() as session:
+        repo = TransactionPartitionRepository(session)
+        partitions = await repo.list_partitions()
+
+        if not partitions:
+            print("No monthly partitions found")
+            return
+
+        print(f"{'Partition':<24} {'From':<12} {'To':<12} {'Rows':>10}")
+        print("-" * 61)
+        for p in partitions:
+            rows = await repo.count_rows(p.name)
+            print(f"{p.name:<24} {p.range_start!s:<12} {p.range_end!s:<12} {rows:>10}")
+
+
+async def ensure_partitions(args: argparse.Namespace) -> None:
+    """Create upcoming partitions."""
+    months_ahead = args.months_ahead
+    if months_ahead is None:
+        months_ahead = settings.transaction_partitions_ahead
+
+    async with async_session_factory() as session:
+        created = await TransactionPartitionRepository(session).ensure_partitions(months_ahead)
+        await session.commit()
+
+    if created:
+        print(f"Created partitions: {', '.join(created)}")
+    else:
+        print("All partitions already exist")
+
+
+async def archive_partitions(args: argparse.Namespace) -> None:
+    """Export old partitions to gzipped CSV, then detach and drop them."""
+    cutoff = add_months(datetime.utcnow().date().replace(day=1), -args.keep_months)
+    output_dir = Path(args.output_dir)
+
+    async with async_session_factory() as session:
+        partitions = await TransactionPartitionRepository(session).list_partitions()
+    candidates = [p for p in partitions if p.range_end <= cutoff]
+
+    if not candidates:
+        print(f"No partitions ending before {cutoff}")
+        return
+
+    if args.dry_run:
+        print(f"DRY RUN: would archive {len(candidates)} partitions to {output_dir}")
+        for p in candidates:
+            print(f"  - {p.name} ({p.range_start} .. {p.range_end})")
+        return
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for p in candidates:
+        target = output_dir / f"{p.name}.csv.gz"
+        partial = output_dir / f"{p.name}.csv.gz.partial"
+
+        # One transaction per partition: a failure leaves it attached
+        async with async_session_factory() as session:
+            repo = TransactionPartitionRepository(session)
+            expected = await repo.count_rows(p.name)
+
+            with gzip.open(partial, "wb") as output:
+                exported = await repo.export_csv(p.name, output)
+
+            if exported != expected:
+                partial.unlink()
+                logger.error(
+                    "Export of %s wrote %d of %d rows, partition kept",
+                    p.name,
+                    exported,
+                    expected,
+                )
+                continue
+
+            partial.replace(target)
+            await repo.detach_and_drop(p.name)
+            await session.commit()
+
+        logger.info("Archived %s (%d rows) to %s", p.name, exported, target)
+        print(f"Archived {p.name}: {exported} rows -> {target}")
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Transactions partition management CLI",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # List command
+    subparsers.add_parser("list", help="List monthly partitions")
+
+    # Ensure command
+    ensure_parser = subparsers.add_parser("ensure", help="Create upcoming partitions")
+    ensure_parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=None,
+        help=f"Months to create ahead (default: {settings.transaction_partitions_ahead})",
+    )
+
+    # Archive command
+    archive_parser = subparsers.add_parser(
+        "archive",
+        help="Export old partitions to gzipped CSV and drop them",
+    )
+    archive_parser.add_argument(
+        "--keep-months",
+        type=int,
+        default=12,
+        help="Full months to keep attached before the current one (default: 12)",
+    )
+    archive_parser.add_argument(
+        "--output-dir",
+        default="archive/transactions",
+        help="Directory for archive files (default: archive/transactions)",
+    )
+    archive_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show what would be archived without making changes",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        asyncio.run(list_partitions(args))
+    elif args.command == "ensure":
+        asyncio.run(ensure_partitions(args))
+    elif args.command == "archive":
+        asyncio.run(archive_partitions(args))
+
+
+if __name__ == "__main__":
+    main()
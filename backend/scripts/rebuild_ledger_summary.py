@@ -0,0 +1,53 @@
+"""
+Script to rebuild user_ledger_summary from the transactions ledger.
+
+The summary is kept up to date by a trigger on every ledger insert; run this
+after manual ledger edits or to verify drift:
+    python -m scripts.rebuild_ledger_summary
+
+Partitions archived by scripts.manage_transaction_partitions are counted
+from archived_ledger_totals, written when they were dropped.
+"""
+
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src.db.repositories.ledger_summary_repository import LedgerSummaryRepository
+from src.db.session import async_session_factory
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_ledger_summary() -> int:
+    """Recompute all user ledger summaries in one transaction.
+
+    Returns:
+        Number of summary rows written
+    """
+    logger.info("Rebuilding user_ledger_summary (ledger inserts are blocked meanwhile)")
+
+    async with async_session_factory() as session:
+        count = await LedgerSummaryRepository(session).rebuild()
+        await session.commit()
+
+    logger.info("Rebuilt %d ledger summaries", count)
+    return count
+
+
+async def main() -> None:
+    """Main entry point."""
+    count = await rebuild_ledger_summary()
+    print(f"Rebuilt {count} ledger summaries")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,11 +1,26 @@
 """API module."""
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from src.api.middleware.rate_limit import RateLimitMiddleware
 from src.api.routes import health, legal, tokens, webhook
 from src.core.config import settings
 from src.payments.providers.mock.router import router as mock_payment_router
+from src.services.audit_writer import audit_log_writer
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Run the buffered audit log writer for the lifetime of the app."""
+    await audit_log_writer.start()
+    try:
+        yield
+    finally:
+        # Flush remaining entries on shutdown
+        await audit_log_writer.stop()
 
 
 def create_api() -> FastAPI:
@@ -14,6 +29,7 @@ def create_api() -> FastAPI:
         title="Telegram Billing API",
         description="Webhook handlers and Token API for payment processing",
         version="1.0.0",
+        lifespan=lifespan,
     )
 
     # Add rate limiting middleware
@@ -21,6 +37,7 @@ def create_api() -> FastAPI:
         RateLimitMiddleware,
         calls=settings.rate_limit_calls,
         period=settings.rate_limit_period,
+        max_clients=settings.rate_limit_max_clients,
     )
 
     # Include routers
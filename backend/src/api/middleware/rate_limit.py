@@ -1,33 +1,33 @@
 """Rate limiting middleware."""
 
-import asyncio
-from collections import defaultdict
-from datetime import datetime, timedelta
+import math
 
 from fastapi import HTTPException, Request, status
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 
+from src.core.rate_limiter import GCRARateLimiter
+
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple in-memory rate limiter.
+    """In-memory per-client rate limiter (GCRA, O(1) per request).
 
-    For production, consider using Redis-based solution.
+    Limits are per process. For production, consider using Redis-based solution.
     """
 
-    def __init__(self, app, calls: int = 100, period: int = 60) -> None:
+    def __init__(self, app, calls: int = 100, period: int = 60, max_clients: int = 100_000) -> None:
         """Initialize rate limiter.
 
         Args:
             app: FastAPI/Starlette application
             calls: Max calls per period
             period: Period in seconds
+            max_clients: Max clients tracked at once (least recently seen are dropped)
         """
         super().__init__(app)
         self.calls = calls
         self.period = period
-        self.requests: dict[str, list[datetime]] = defaultdict(list)
-        self._lock = asyncio.Lock()
+        self.limiter = GCRARateLimiter(calls, period, max_keys=max_clients)
 
     async def dispatch(self, request: Request, call_next) -> Response:
         """Process request with rate limiting."""
@@ -38,20 +38,19 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         # Get client identifier
         client_id = self._get_client_id(request)
 
-        # Check rate limit
-        async with self._lock:
-            if not self._is_allowed(client_id):
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail={
-                        "error": "rate_limited",
-                        "message": f"Too many requests. Limit: {self.calls} per {self.period}s",
-                        "retry_after": self.period,
-                    },
-                    headers={"Retry-After": str(self.period)},
-                )
-
-            self._record_request(client_id)
+        # Check rate limit (synchronous, so atomic within the event loop)
+        wait = self.limiter.acquire(client_id)
+        if wait > 0:
+            retry_after = max(1, math.ceil(wait))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={
+                    "error": "rate_limited",
+                    "message": f"Too many requests. Limit: {self.calls} per {self.period}s",
+                    "retry_after": retry_after,
+                },
+                headers={"Retry-After": str(retry_after)},
+            )
 
         return await call_next(request)
 
@@ -77,22 +76,6 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         client_host = request.client.host if request.client else "unknown"
         return f"ip:{client_host}"
 
-    def _is_allowed(self, client_id: str) -> bool:
-        """Check if request is within rate limit."""
-        now = datetime.utcnow()
-        cutoff = now - timedelta(seconds=self.period)
-
-        # Clean old requests
-        self.requests[client_id] = [
-            t for t in self.requests[client_id] if t > cutoff
-        ]
-
-        return len(self.requests[client_id]) < self.calls
-
-    def _record_request(self, client_id: str) -> None:
-        """Record new request."""
-        self.requests[client_id].append(datetime.utcnow())
-
     def reset(self) -> None:
         """Clear all rate limit data. Useful for testing."""
-        self.requests.clear()
+        self.limiter.reset()
@@ -20,6 +20,7 @@ from src.core.exceptions import (
     SubscriptionExpiredError,
     UserBlockedError,
 )
+from src.db.replica import get_read_session
 from src.db.session import get_session
 from src.services.token_service import TokenService
 
@@ -50,7 +51,7 @@ async def get_balance(
     Returns:
         Current balance and subscription info
     """
-    async with get_session() as session:
+    async with get_read_session(user_id) as session:
         service = TokenService(session)
 
         try:
@@ -7,16 +7,17 @@ from uuid import UUID
 from fastapi import APIRouter, Form, HTTPException
 from fastapi.responses import PlainTextResponse
 
-from src.db.session import get_session
+from src.core.exceptions import NotFoundError, ValidationError
 from src.db.models.invoice import InvoiceStatus
 from src.db.repositories.invoice_repository import InvoiceRepository
-from src.db.repositories.tariff_repository import TariffRepository
+from src.db.repositories.outbox_repository import OutboxRepository
+from src.db.session import get_session
 from src.payments.providers import get_payment_provider
 from src.payments.schemas import WebhookData
 from src.services.audit_service import AuditService
 from src.services.billing_service import BillingService
 from src.services.notification_service import NotificationService
-from src.bot import get_bot
+from src.services.payment_dedupe import payment_dedupe
 
 logger = logging.getLogger(__name__)
 
@@ -39,8 +40,10 @@ async def robokassa_result_url(
     Robokassa sends POST request here after successful payment.
 
     1. Verify signature
-    2. Process payment via BillingService
-    3. Return 'OK{InvId}'
+    2. Skip InvIds already paid (in-memory, then invoice status)
+    3. Lock invoice and process payment via BillingService in one transaction
+    4. Enqueue notification in the same transaction (sent by OutboxDispatcher)
+    5. Return 'OK{InvId}'
     """
     logger.info(
         "Webhook received: inv_id=%d, sum=%s, invoice_id=%s, user_id=%d",
@@ -69,70 +72,65 @@ async def robokassa_result_url(
         logger.warning("Invalid signature for inv_id=%d", InvId)
         raise HTTPException(status_code=400, detail="Invalid signature")
 
-    # Process payment with billing service
+    # Fast path: retry of an invoice this process already processed
+    if payment_dedupe.is_paid(InvId):
+        logger.info("Webhook retry for paid inv_id=%d answered from memory", InvId)
+    else:
+        # Concurrent retries of the same InvId share one processing run
+        await payment_dedupe.single_flight(InvId, lambda: _process_payment(webhook_data))
+        payment_dedupe.mark_paid(InvId)
+
+    # Return success response
+    response = provider.format_success_response(InvId)
+    return PlainTextResponse(content=response)
+
+
+async def _process_payment(webhook_data: WebhookData) -> None:
+    """Process payment in one transaction; no-op if the invoice is already paid."""
     async with get_session() as session:
+        # DB fast path: paid invoices are answered without locking anything
+        invoice_repo = InvoiceRepository(session)
+        status = await invoice_repo.get_status(webhook_data.shp_invoice_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail="Invoice not found")
+        if status == InvoiceStatus.PAID:
+            logger.info("Webhook retry for paid inv_id=%d", webhook_data.inv_id)
+            return
+
         billing_service = BillingService(session)
 
         # Set up audit service
         audit_service = AuditService(session)
         billing_service.set_audit_service(audit_service)
 
-        # Set up notification service
-        try:
-            bot = get_bot()
-            notification_service = NotificationService(bot)
-            billing_service.set_notification_service(notification_service)
-        except Exception as e:
-            logger.warning("Could not initialize notification service: %s", e)
+        # Notifications go to the outbox and commit together with the payment
+        notification_service = NotificationService(outbox=OutboxRepository(session))
+        billing_service.set_notification_service(notification_service)
 
         try:
-            # Get invoice and tariff for M11 processing
-            invoice_repo = InvoiceRepository(session)
-            tariff_repo = TariffRepository(session)
-
-            invoice = await invoice_repo.get_by_id(webhook_data.shp_invoice_id)
-            if not invoice:
-                raise HTTPException(status_code=404, detail="Invoice not found")
-
-            tariff = await tariff_repo.get_by_id(invoice.tariff_id)
-            if not tariff:
-                raise HTTPException(status_code=404, detail="Tariff not found")
-
-            # Use M11 payment processing logic
-            result = await billing_service.process_m11_payment(
+            # Locks the invoice, credits the user and marks the invoice paid
+            result = await billing_service.process_m11_invoice_payment(
+                invoice_id=webhook_data.shp_invoice_id,
+                inv_id=webhook_data.inv_id,
                 user_id=webhook_data.shp_user_id,
                 amount=webhook_data.out_sum,
-                tariff=tariff,
-                invoice_id=webhook_data.shp_invoice_id,
-            )
-
-            # Update invoice status
-            await invoice_repo.update_status(
-                invoice_id=invoice.id,
-                status=InvoiceStatus.PAID,
-            )
-
-            logger.info(
-                "M11 Payment processed: inv_id=%d, tokens=%d, fee=%d, activated=%s",
-                InvId,
-                result.tokens_credited,
-                result.subscription_fee_charged,
-                result.subscription_activated,
             )
-
-            # Send notification
-            if billing_service._notification_service:
-                await billing_service._notification_service.notify_m11_payment_success(
-                    user_id=webhook_data.shp_user_id,
-                    result=result,
-                    amount=webhook_data.out_sum,
-                )
-        except HTTPException:
-            raise
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=e.message) from e
+        except ValidationError as e:
+            logger.warning("Webhook rejected: %s", e.message)
+            raise HTTPException(status_code=400, detail="Invoice mismatch") from e
         except Exception as e:
             logger.error("Payment processing failed: %s", e)
-            raise HTTPException(status_code=500, detail="Payment processing failed")
-
-    # Return success response
-    response = provider.format_success_response(InvId)
-    return PlainTextResponse(content=response)
+            raise HTTPException(status_code=500, detail="Payment processing failed") from e
+
+        if result is None:
+            return
+
+        logger.info(
+            "M11 Payment processed: inv_id=%d, tokens=%d, fee=%d, activated=%s",
+            webhook_data.inv_id,
+            result.tokens_credited,
+            result.subscription_fee_charged,
+            result.subscription_activated,
+        )
@@ -4,6 +4,7 @@ from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
+from src.bot.send_scheduler import RateLimitMiddleware, get_send_scheduler
 from src.core.config import settings
 
 # Global bot instance for use in webhooks
@@ -11,11 +12,18 @@ _bot_instance: Bot | None = None
 
 
 def create_bot(token: str) -> Bot:
-    """Create Bot instance with default properties."""
-    return Bot(
+    """Create Bot instance with default properties.
+
+    All outgoing messages go through the process-wide send scheduler.
+    """
+    bot = Bot(
         token=token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
+    bot.session.middleware(
+        RateLimitMiddleware(get_send_scheduler(), max_retries=settings.telegram_retry_after_max_retries)
+    )
+    return bot
 
 
 def create_dispatcher() -> Dispatcher:
@@ -4,6 +4,7 @@ from src.bot.callbacks.feedback import FeedbackCallback
 from src.bot.callbacks.invoice import InvoiceCallback
 from src.bot.callbacks.pagination import PaginationCallback
 from src.bot.callbacks.promo import PromoCallback
+from src.bot.callbacks.regenerate import RegenerateCallback
 from src.bot.callbacks.tariff import TariffCallback
 
 __all__ = [
@@ -11,5 +12,6 @@ __all__ = [
     "InvoiceCallback",
     "PaginationCallback",
     "PromoCallback",
+    "RegenerateCallback",
     "TariffCallback",
 ]
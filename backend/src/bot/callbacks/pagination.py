@@ -8,3 +8,5 @@ class PaginationCallback(CallbackData, prefix="page"):
 
     prefix: str  # "history", "invoices", etc.
     page: int
+    total: int = 0  # Item count from the first page, reused instead of recounting
+    cursor: str = ""  # Keyset page token for cursor-paginated lists
@@ -0,0 +1,14 @@
+"""Callback data for regenerating a cached result."""
+
+from aiogram.filters.callback_data import CallbackData
+
+
+class RegenerateCallback(CallbackData, prefix="regen"):
+    """Callback data for the "regenerate" button.
+
+    Examples:
+        regen:apply
+        regen:cv
+    """
+
+    kind: str  # "apply", "cv"
@@ -10,13 +10,17 @@ from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.callbacks.feedback import FeedbackCallback
-from src.bot.keyboards import get_back_keyboard, get_feedback_keyboard
+from src.bot.callbacks.regenerate import RegenerateCallback
+from src.bot.keyboards import (
+    get_back_keyboard,
+    get_feedback_keyboard,
+    get_regenerate_keyboard,
+)
 from src.bot.states.apply import ApplyStates
 from src.core.logging import get_logger
 from src.db.models import ApplyFeedback, FeedbackRating
 from src.services.apply_service import ApplyService
-from src.services.runner import ApplyAnalyzer, get_runner_client
-from src.services.token_service import TokenService
+from src.services.runner import get_apply_analyzer
 
 logger = get_logger(__name__)
 
@@ -53,19 +57,17 @@ HH_URL_PATTERN = re.compile(
 )
 
 
-def _get_apply_service(session: AsyncSession, bot) -> ApplyService:
+def _get_apply_service(bot) -> ApplyService:
     """Factory для ApplyService с DI."""
-    runner_client = get_runner_client()
     return ApplyService(
-        token_service=TokenService(session),
-        apply_analyzer=ApplyAnalyzer(runner_client),
+        apply_analyzer=get_apply_analyzer(),
         bot=bot,
     )
 
 
-async def _start_apply_flow(message: Message, state: FSMContext, session: AsyncSession) -> None:
+async def _start_apply_flow(message: Message, state: FSMContext) -> None:
     """Общая логика запуска создания отклика."""
-    apply_service = _get_apply_service(session, message.bot)
+    apply_service = _get_apply_service(message.bot)
 
     # Отменяем предыдущий отклик
     await apply_service.cancel(message.from_user.id)
@@ -91,15 +93,15 @@ async def _start_apply_flow(message: Message, state: FSMContext, session: AsyncS
 
 
 @router.message(Command("apply"))
-async def cmd_apply(message: Message, state: FSMContext, session: AsyncSession) -> None:
+async def cmd_apply(message: Message, state: FSMContext) -> None:
     """Запуск команды создания отклика на вакансию."""
-    await _start_apply_flow(message, state, session)
+    await _start_apply_flow(message, state)
 
 
 @router.message(F.text == "💼 Создать отклик")
-async def btn_apply(message: Message, state: FSMContext, session: AsyncSession) -> None:
+async def btn_apply(message: Message, state: FSMContext) -> None:
     """Обработка кнопки 'Создать отклик'."""
-    await _start_apply_flow(message, state, session)
+    await _start_apply_flow(message, state)
 
 
 @router.message(ApplyStates.waiting_for_url, F.text)
@@ -112,26 +114,55 @@ async def handle_vacancy_url(message: Message, state: FSMContext, session: Async
         await message.answer(ERROR_INVALID_URL)
         return
 
+    await _run_apply(message, message.from_user.id, vacancy_url, state, session)
+
+
+async def _run_apply(
+    message: Message,
+    user_id: int,
+    vacancy_url: str,
+    state: FSMContext,
+    session: AsyncSession,
+    use_cache: bool = True,
+) -> None:
+    """Создать отклик и показать итог в чате message.
+
+    user_id передаётся явно: при повторе по кнопке message — сообщение бота.
+    """
     # Переходим в состояние обработки
     await state.set_state(ApplyStates.processing)
     await message.answer("🔄 Создаю отклик на вакансию")
 
+    # Возвращаем соединение в пул на время стрима Runner:
+    # сервис сам берёт короткие сессии для проверки и списания
+    await session.commit()
+
     # Запускаем создание отклика через сервис
-    apply_service = _get_apply_service(session, message.bot)
+    apply_service = _get_apply_service(message.bot)
     result = await apply_service.apply_to_vacancy(
         vacancy_url=vacancy_url,
-        user_id=message.from_user.id,
+        user_id=user_id,
         chat_id=message.chat.id,
+        use_cache=use_cache,
     )
 
     # Завершаем
     if result.success:
         # Store apply data for feedback
-        _last_apply_data[message.from_user.id] = {
+        _last_apply_data[user_id] = {
             "vacancy_url": vacancy_url,
             "task_id": result.task_id,
         }
 
+        if result.cached:
+            await message.answer(
+                "♻️ Отклик на эту вакансию уже создавался — показан сохранённый результат, "
+                "токены не списаны.",
+                reply_markup=get_regenerate_keyboard("apply"),
+            )
+            await state.clear()
+            return
+
         # Show success message with feedback keyboard
         if result.tokens_spent > 0:
             success_text = f"✅ Отклик создан! Списано: {result.tokens_spent} токен\n\nКак вам генерация?"
@@ -157,6 +188,21 @@ async def handle_vacancy_url(message: Message, state: FSMContext, session: Async
     await state.clear()
 
 
+@router.callback_query(RegenerateCallback.filter(F.kind == "apply"))
+async def handle_regenerate(callback: CallbackQuery, state: FSMContext, session: AsyncSession) -> None:
+    """Создать отклик заново, минуя кэш результатов."""
+    user_id = callback.from_user.id
+    message = callback.message
+    vacancy_url = _last_apply_data.get(user_id, {}).get("vacancy_url")
+    if not vacancy_url or not isinstance(message, Message):
+        await callback.answer("Отправьте ссылку на вакансию заново: /apply", show_alert=True)
+        return
+
+    await callback.answer()
+    await message.edit_reply_markup(reply_markup=None)
+    await _run_apply(message, user_id, vacancy_url, state, session, use_cache=False)
+
+
 @router.message(ApplyStates.waiting_for_url)
 async def handle_invalid_input(message: Message) -> None:
     """Обработка невалидного ввода (не текст)."""
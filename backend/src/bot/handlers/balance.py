@@ -15,10 +15,11 @@ from src.bot.keyboards.balance import (
     get_payment_keyboard,
 )
 from src.bot.states.payment import PaymentStates
-from src.db.models.user import User
 from src.db.repositories.tariff_repository import TariffRepository
+from src.db.repositories.user_repository import UserSnapshot
 from src.services.invoice_service import InvoiceService
 from src.services.payment_service import PaymentService
+from src.services.user_service import UserService
 
 router = Router()
 
@@ -72,7 +73,7 @@ PAYMENT_READY_TEMPLATE = """
 # ========== Helpers ==========
 
 
-async def _get_balance_text(user: User, session: AsyncSession) -> tuple[str, Decimal]:
+async def _get_balance_text(user: UserSnapshot, session: AsyncSession) -> tuple[str, Decimal]:
     """Get formatted balance text and min_payment.
 
     Returns:
@@ -127,19 +128,23 @@ async def _get_balance_text(user: User, session: AsyncSession) -> tuple[str, Dec
 @router.message(F.text == "💰 Баланс")
 async def cmd_balance(
     message: Message,
-    user: User,
-    session: AsyncSession,
+    user: UserSnapshot,
+    user_service: UserService,
+    read_session: AsyncSession,
 ) -> None:
     """Show balance screen."""
-    text, min_payment = await _get_balance_text(user, session)
+    # Balance may have changed in the API process (payment, token spend)
+    user = await user_service.get_fresh_snapshot(user.id) or user
+    text, min_payment = await _get_balance_text(user, read_session)
     await message.answer(text, reply_markup=get_balance_keyboard(min_payment))
 
 
 @router.callback_query(F.data == "balance")
 async def on_balance_callback(
     callback: CallbackQuery,
-    user: User,
-    session: AsyncSession,
+    user: UserSnapshot,
+    user_service: UserService,
+    read_session: AsyncSession,
     state: FSMContext,
 ) -> None:
     """Show balance screen (callback)."""
@@ -151,7 +156,8 @@ async def on_balance_callback(
         return
 
     try:
-        text, min_payment = await _get_balance_text(user, session)
+        user = await user_service.get_fresh_snapshot(user.id) or user
+        text, min_payment = await _get_balance_text(user, read_session)
         await callback.message.edit_text(text, reply_markup=get_balance_keyboard(min_payment))
         await callback.answer()
     except Exception:
@@ -163,7 +169,7 @@ async def on_balance_callback(
 @router.callback_query(F.data.startswith("pay:"))
 async def on_pay_callback(
     callback: CallbackQuery,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
     state: FSMContext,
 ) -> None:
@@ -196,7 +202,7 @@ async def on_pay_callback(
 
 async def _create_payment(
     callback: CallbackQuery,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
     amount: int,
 ) -> None:
@@ -243,7 +249,7 @@ async def _create_payment(
 @router.message(PaymentStates.waiting_for_amount)
 async def on_amount_input(
     message: Message,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
     state: FSMContext,
 ) -> None:
@@ -11,7 +11,7 @@ from src.bot.callbacks.tariff import TariffCallback
 from src.bot.keyboards.main_menu import get_start_menu_inline
 from src.bot.keyboards.payment import get_payment_keyboard
 from src.core.exceptions import NotFoundError, ValidationError
-from src.db.models.user import User
+from src.db.repositories.user_repository import UserSnapshot
 from src.services.invoice_service import InvoiceService
 from src.services.payment_service import PaymentService
 from src.services.tariff_service import TariffService
@@ -25,7 +25,7 @@ router = Router(name="buy")
 async def process_tariff_selection(
     callback: CallbackQuery,
     callback_data: TariffCallback,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
 ) -> None:
     """Process tariff selection callback.
@@ -100,7 +100,7 @@ async def process_tariff_selection(
 async def cancel_invoice_callback(
     callback: CallbackQuery,
     callback_data: InvoiceCallback,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
 ) -> None:
     """Handle invoice cancellation."""
@@ -150,7 +150,7 @@ async def cancel_invoice_callback(
 async def check_invoice_status_callback(
     callback: CallbackQuery,
     callback_data: InvoiceCallback,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
 ) -> None:
     """Handle invoice status check."""
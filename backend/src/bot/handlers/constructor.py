@@ -1,6 +1,9 @@
 """Constructor upload command handler."""
 
+from typing import Any
+
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import BufferedInputFile, Document, Message
@@ -8,7 +11,7 @@ from aiogram.types import BufferedInputFile, Document, Message
 from src.bot.keyboards import get_back_keyboard
 from src.bot.states.constructor import ConstructorStates
 from src.core.logging import get_logger
-from src.services.runner import get_runner_client
+from src.services.runner import get_result_cache, get_runner_client
 
 logger = get_logger(__name__)
 
@@ -41,6 +44,41 @@ UPDATE_PROMPT = """
 """.strip()
 
 
+async def _send_constructor(message: Message, result: dict[str, Any]) -> None:
+    """Отправить конструктор документом.
+
+    Неизменившийся конструктор пересылается по сохранённому file_id,
+    без повторной загрузки файла в Telegram.
+    """
+    content = result.get("content", "")
+    constructor_type = result.get("constructor_type", "auto")
+    filename = result.get("filename", "constructor.txt")
+    version = result.get("version")
+    file_id = result.get("file_id")
+
+    type_label = "пользовательский" if constructor_type == "user" else "автоматический"
+    caption = f"Текущий конструктор ({type_label})"
+
+    if file_id:
+        try:
+            await message.answer_document(document=file_id, caption=caption)
+            return
+        except TelegramBadRequest as e:
+            logger.warning(f"Cached constructor file_id rejected, re-uploading: {e}")
+
+    sent = await message.answer_document(
+        document=BufferedInputFile(
+            content.encode("utf-8"),
+            filename=filename,
+        ),
+        caption=caption,
+    )
+    if version and sent.document and message.from_user:
+        get_runner_client().remember_constructor_file_id(
+            message.from_user.id, version, sent.document.file_id
+        )
+
+
 @router.message(Command("constructor"))
 async def cmd_constructor(message: Message, state: FSMContext) -> None:
     """Команда обновления конструктора - скачать текущий и загрузить новый."""
@@ -58,20 +96,8 @@ async def cmd_constructor(message: Message, state: FSMContext) -> None:
             await message.answer(f"Ошибка: {result}")
         return
 
-    content = result.get("content", "")
-    constructor_type = result.get("constructor_type", "auto")
-    filename = result.get("filename", "constructor.txt")
-
-    type_label = "пользовательский" if constructor_type == "user" else "автоматический"
-
     # Отправляем текущий конструктор
-    await message.answer_document(
-        document=BufferedInputFile(
-            content.encode("utf-8"),
-            filename=filename,
-        ),
-        caption=f"Текущий конструктор ({type_label})"
-    )
+    await _send_constructor(message, result)
 
     # Переходим в режим ожидания файла
     await state.set_state(ConstructorStates.waiting_for_file)
@@ -111,9 +137,10 @@ async def handle_constructor_file(message: Message, state: FSMContext) -> None:
     await message.answer("Загружаю конструктор...")
 
     # Upload to Runner
+    telegram_id = message.from_user.id
     runner = get_runner_client()
     result = await runner.upload_constructor(
-        telegram_id=message.from_user.id,
+        telegram_id=telegram_id,
         content=content,
         filename=filename,
     )
@@ -134,6 +161,7 @@ async def handle_constructor_file(message: Message, state: FSMContext) -> None:
         await state.clear()
         return
 
+    get_result_cache().note_constructor_change(telegram_id)
     await state.clear()
     await message.answer(
         "<b>Конструктор обновлён!</b>\n\n"
@@ -167,26 +195,15 @@ async def cmd_get_constructor(message: Message) -> None:
             await message.answer(f"Ошибка: {result}")
         return
 
-    content = result.get("content", "")
-    constructor_type = result.get("constructor_type", "auto")
-    filename = result.get("filename", "constructor.txt")
-
-    type_label = "пользовательский" if constructor_type == "user" else "автоматический"
-
-    await message.answer_document(
-        document=BufferedInputFile(
-            content.encode("utf-8"),
-            filename=filename,
-        ),
-        caption=f"Текущий конструктор ({type_label})"
-    )
+    await _send_constructor(message, result)
 
 
 @router.message(Command("reset_constructor"))
 async def cmd_reset_constructor(message: Message) -> None:
     """Удалить пользовательский конструктор."""
+    telegram_id = message.from_user.id
     runner = get_runner_client()
-    result = await runner.reset_constructor(telegram_id=message.from_user.id)
+    result = await runner.reset_constructor(telegram_id=telegram_id)
 
     if isinstance(result, str):
         if "USER_CONSTRUCTOR_NOT_FOUND" in result:
@@ -198,6 +215,7 @@ async def cmd_reset_constructor(message: Message) -> None:
             await message.answer(f"Ошибка: {result}")
         return
 
+    get_result_cache().note_constructor_change(telegram_id)
     await message.answer(
         "<b>Пользовательский конструктор удалён</b>\n\n"
         "Теперь используется автоматически сгенерированный конструктор.",
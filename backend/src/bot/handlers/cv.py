@@ -1,19 +1,20 @@
 """CV analysis command handler."""
 
+from collections import OrderedDict
 from pathlib import Path
 
 from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
-from aiogram.types import Document, FSInputFile, Message
+from aiogram.types import CallbackQuery, Document, FSInputFile, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.bot.keyboards import get_back_keyboard
+from src.bot.callbacks.regenerate import RegenerateCallback
+from src.bot.keyboards import get_back_keyboard, get_regenerate_keyboard
 from src.bot.states.cv import CVStates
 from src.core.logging import get_logger
 from src.services.cv_service import CVService
 from src.services.runner import CVFile, FileValidationError, get_cv_analyzer
-from src.services.token_service import TokenService
 
 logger = get_logger(__name__)
 
@@ -32,6 +33,11 @@ UPLOAD_PROMPT = """
 Отправьте файл прямо в этот чат.
 """.strip()
 
+# Последний загруженный CV (user_id -> (file_id, filename, mime_type)) для "Сгенерировать заново".
+# LRU: вытесненному пользователю кнопка предложит загрузить CV заново
+_MAX_LAST_CV_UPLOADS = 10000
+_last_cv_uploads: OrderedDict[int, tuple[str, str, str]] = OrderedDict()
+
 ERROR_MESSAGES = {
     FileValidationError.INVALID_FORMAT: "❌ Неверный формат файла. Поддерживаются только PDF, DOCX и TXT.",
     FileValidationError.FILE_TOO_LARGE: "❌ Файл слишком большой. Максимум 1 МБ.",
@@ -39,18 +45,17 @@ ERROR_MESSAGES = {
 }
 
 
-def _get_cv_service(session: AsyncSession, bot) -> CVService:
+def _get_cv_service(bot) -> CVService:
     """Factory для CVService с DI."""
     return CVService(
-        token_service=TokenService(session),
         cv_analyzer=get_cv_analyzer(),
         bot=bot,
     )
 
 
-async def _start_cv_flow(message: Message, state: FSMContext, session: AsyncSession) -> None:
+async def _start_cv_flow(message: Message, state: FSMContext) -> None:
     """Общая логика запуска анализа CV."""
-    cv_service = _get_cv_service(session, message.bot)
+    cv_service = _get_cv_service(message.bot)
 
     # Отменяем предыдущий анализ
     await cv_service.cancel(message.from_user.id)
@@ -80,15 +85,15 @@ async def _start_cv_flow(message: Message, state: FSMContext, session: AsyncSess
 
 
 @router.message(Command("cv"))
-async def cmd_cv(message: Message, state: FSMContext, session: AsyncSession) -> None:
+async def cmd_cv(message: Message, state: FSMContext) -> None:
     """Запуск команды анализа CV."""
-    await _start_cv_flow(message, state, session)
+    await _start_cv_flow(message, state)
 
 
 @router.message(F.text == "📄 Анализ резюме")
-async def btn_cv(message: Message, state: FSMContext, session: AsyncSession) -> None:
+async def btn_cv(message: Message, state: FSMContext) -> None:
     """Обработка кнопки 'Анализ резюме'."""
-    await _start_cv_flow(message, state, session)
+    await _start_cv_flow(message, state)
 
 
 @router.message(CVStates.waiting_for_file, F.document)
@@ -108,21 +113,58 @@ async def handle_cv_file(message: Message, state: FSMContext, session: AsyncSess
         return
 
     cv_file: CVFile = result
+    user_id = message.from_user.id
+    _remember_cv_upload(
+        user_id,
+        (document.file_id, document.file_name or "file", document.mime_type or ""),
+    )
+
+    await _run_cv_analysis(message, user_id, cv_file, state, session)
+
+
+def _remember_cv_upload(user_id: int, upload: tuple[str, str, str]) -> None:
+    _last_cv_uploads[user_id] = upload
+    _last_cv_uploads.move_to_end(user_id)
+    while len(_last_cv_uploads) > _MAX_LAST_CV_UPLOADS:
+        _last_cv_uploads.popitem(last=False)
 
+
+async def _run_cv_analysis(
+    message: Message,
+    user_id: int,
+    cv_file: CVFile,
+    state: FSMContext,
+    session: AsyncSession,
+    use_cache: bool = True,
+) -> None:
+    """Проанализировать CV и показать итог в чате message.
+
+    user_id передаётся явно: при повторе по кнопке message — сообщение бота.
+    """
     # Переходим в состояние обработки
     await state.set_state(CVStates.processing)
     await message.answer("🔄 Анализирую ваше резюме")
 
+    # Возвращаем соединение в пул на время стрима Runner:
+    # сервис сам берёт короткие сессии для проверки и списания
+    await session.commit()
+
     # Запускаем анализ через сервис
-    cv_service = _get_cv_service(session, message.bot)
+    cv_service = _get_cv_service(message.bot)
     analysis_result = await cv_service.analyze_cv(
         cv_file=cv_file,
-        user_id=message.from_user.id,
+        user_id=user_id,
         chat_id=message.chat.id,
+        use_cache=use_cache,
     )
 
     # Завершаем
-    if analysis_result.success:
+    if analysis_result.cached:
+        await message.answer(
+            "♻️ Это резюме уже анализировалось — показан сохранённый результат, токены не списаны.",
+            reply_markup=get_regenerate_keyboard("cv"),
+        )
+    elif analysis_result.success:
         next_steps = (
             "\n\n<b>Что дальше?</b>\n"
             "• /apply — сформировать отклик на вакансию\n"
@@ -144,6 +186,32 @@ async def handle_cv_file(message: Message, state: FSMContext, session: AsyncSess
     await state.clear()
 
 
+@router.callback_query(RegenerateCallback.filter(F.kind == "cv"))
+async def handle_regenerate(callback: CallbackQuery, state: FSMContext, session: AsyncSession) -> None:
+    """Проанализировать последнее загруженное CV заново, минуя кэш результатов."""
+    user_id = callback.from_user.id
+    message = callback.message
+    upload = _last_cv_uploads.get(user_id)
+    if upload is None or not isinstance(message, Message) or message.bot is None:
+        await callback.answer("Загрузите резюме заново: /cv", show_alert=True)
+        return
+
+    file_id, filename, mime_type = upload
+    file = await message.bot.get_file(file_id)
+    file_content = await message.bot.download_file(file.file_path) if file.file_path else None
+    if file_content is None:
+        await callback.answer("Загрузите резюме заново: /cv", show_alert=True)
+        return
+    result = CVFile.validate(file_content.read(), filename, mime_type)
+    if isinstance(result, FileValidationError):
+        await callback.answer(ERROR_MESSAGES[result], show_alert=True)
+        return
+
+    await callback.answer()
+    await message.edit_reply_markup(reply_markup=None)
+    await _run_cv_analysis(message, user_id, result, state, session, use_cache=False)
+
+
 @router.message(CVStates.waiting_for_file)
 async def handle_invalid_input(message: Message) -> None:
     """Обработка невалидного ввода (текст вместо файла)."""
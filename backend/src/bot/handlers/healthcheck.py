@@ -13,10 +13,15 @@ router = Router(name="healthcheck")
 async def check_runner_health() -> tuple[bool, str]:
     """Check external runner service health.
 
+    Uses the background prober's last result when it is fresh.
+
     Returns:
         Tuple of (is_healthy, status_message)
     """
     runner = get_runner_client()
+    cached = runner.cached_health()
+    if cached is not None:
+        return cached
     return await runner.health_check()
 
 
@@ -56,6 +61,17 @@ async def cmd_healthcheck(message: Message) -> None:
                         for key, value in queue.items():
                             text += f"\n• {key}: {value}"
 
+                    # Per-node breaker state and load
+                    nodes = getattr(runner, "nodes", [])
+                    if nodes:
+                        text += "\n\n<b>Узлы:</b>"
+                        for node in nodes:
+                            state = node.breaker.state.value if node.breaker is not None else "-"
+                            text += (
+                                f"\n• {node.base_url}: {state}, в работе {node.outstanding}, "
+                                f"{node.latency * 1000:.0f} мс"
+                            )
+
                     await message.answer(text)
                 else:
                     await message.answer(
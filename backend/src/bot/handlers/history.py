@@ -7,8 +7,8 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.callbacks.pagination import PaginationCallback
-from src.db.models.user import User
-from src.services.dto.transaction import TransactionDTO
+from src.db.repositories.user_repository import UserSnapshot
+from src.services.dto.transaction import TransactionDTO, TransactionPageDTO
 from src.services.transaction_service import TransactionService
 
 router = Router()
@@ -20,22 +20,20 @@ ITEMS_PER_PAGE = 10
 @router.message(F.text == "📜 История")
 async def cmd_history(
     message: Message,
-    user: User,
-    session: AsyncSession,
+    user: UserSnapshot,
+    read_session: AsyncSession,
 ) -> None:
     """Show transaction history."""
-    service = TransactionService(session)
-    result = await service.get_user_transactions(
+    service = TransactionService(read_session)
+    result = await service.get_user_transactions_page(
         user_id=user.id,
         limit=ITEMS_PER_PAGE,
-        offset=0,
     )
 
     text = format_history_message(result.items, result.total, 1)
     keyboard = get_pagination_keyboard(
         current_page=1,
-        total_items=result.total,
-        items_per_page=ITEMS_PER_PAGE,
+        page=result,
         callback_prefix="history",
     )
 
@@ -45,8 +43,8 @@ async def cmd_history(
 @router.callback_query(F.data == "show_history")
 async def show_history_callback(
     callback: CallbackQuery,
-    user: User,
-    session: AsyncSession,
+    user: UserSnapshot,
+    read_session: AsyncSession,
 ) -> None:
     """Show history from inline button."""
     if callback.message is None:
@@ -54,18 +52,14 @@ async def show_history_callback(
         return
 
     try:
-        service = TransactionService(session)
-        result = await service.get_user_transactions(
+        service = TransactionService(read_session)
+        result = await service.get_user_transactions_page(
             user_id=user.id,
             limit=ITEMS_PER_PAGE,
-            offset=0,
         )
 
         text = format_history_message(result.items, result.total, 1)
-        keyboard = get_history_keyboard(
-            current_page=1,
-            total_items=result.total,
-        )
+        keyboard = get_history_keyboard(current_page=1, page=result)
 
         await callback.message.edit_text(text, reply_markup=keyboard)
         await callback.answer()
@@ -77,8 +71,8 @@ async def show_history_callback(
 async def history_pagination(
     callback: CallbackQuery,
     callback_data: PaginationCallback,
-    user: User,
-    session: AsyncSession,
+    user: UserSnapshot,
+    read_session: AsyncSession,
 ) -> None:
     """Handle history pagination."""
     if callback.message is None:
@@ -86,20 +80,19 @@ async def history_pagination(
         return
 
     try:
-        service = TransactionService(session)
+        service = TransactionService(read_session)
 
-        offset = (callback_data.page - 1) * ITEMS_PER_PAGE
-        result = await service.get_user_transactions(
+        # Total is counted on the first page and carried in callback data
+        result = await service.get_user_transactions_page(
             user_id=user.id,
             limit=ITEMS_PER_PAGE,
-            offset=offset,
+            cursor=callback_data.cursor or None,
+            total=callback_data.total if callback_data.cursor else None,
         )
 
-        text = format_history_message(result.items, result.total, callback_data.page)
-        keyboard = get_history_keyboard(
-            current_page=callback_data.page,
-            total_items=result.total,
-        )
+        page = callback_data.page if callback_data.cursor else 1
+        text = format_history_message(result.items, result.total, page)
+        keyboard = get_history_keyboard(current_page=page, page=result)
 
         await callback.message.edit_text(text, reply_markup=keyboard)
         await callback.answer()
@@ -130,37 +123,55 @@ def format_history_message(
             f"  {tx.created_at_display}\n"
         )
 
-    total_pages = (total + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
+    # Total may be stale by a few rows while paging; keep the page in range
+    total_pages = max((total + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE, page)
     lines.append(f"\nСтраница {page} из {total_pages}")
 
     return "\n".join(lines)
 
 
-def get_history_keyboard(current_page: int, total_items: int):
-    """Create history keyboard with pagination and back button."""
-    total_pages = (total_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
+def _page_button_data(
+    callback_prefix: str,
+    page_number: int,
+    page: TransactionPageDTO,
+    cursor: str,
+) -> PaginationCallback:
+    return PaginationCallback(
+        prefix=callback_prefix,
+        page=page_number,
+        total=page.total,
+        cursor=cursor,
+    )
 
+
+def get_history_keyboard(current_page: int, page: TransactionPageDTO):
+    """Create history keyboard with pagination and back button."""
     builder = InlineKeyboardBuilder()
 
     # Pagination buttons
-    if current_page > 1:
+    if page.prev_cursor is not None:
         builder.button(
             text="◀️ Назад",
-            callback_data=PaginationCallback(prefix="history", page=current_page - 1),
+            callback_data=_page_button_data(
+                "history", max(current_page - 1, 1), page, page.prev_cursor
+            ),
         )
 
-    if current_page < total_pages:
+    if page.next_cursor is not None:
         builder.button(
             text="Вперёд ▶️",
-            callback_data=PaginationCallback(prefix="history", page=current_page + 1),
+            callback_data=_page_button_data(
+                "history", current_page + 1, page, page.next_cursor
+            ),
         )
 
     # Back to balance button
     builder.button(text="◀️ К балансу", callback_data="balance")
 
     # Layout: pagination in one row, back button in another
-    if total_pages > 1:
-        builder.adjust(2, 1)
+    nav_count = (page.prev_cursor is not None) + (page.next_cursor is not None)
+    if nav_count:
+        builder.adjust(nav_count, 1)
     else:
         builder.adjust(1)
 
@@ -169,33 +180,28 @@ def get_history_keyboard(current_page: int, total_items: int):
 
 def get_pagination_keyboard(
     current_page: int,
-    total_items: int,
-    items_per_page: int,
+    page: TransactionPageDTO,
     callback_prefix: str,
 ):
     """Create pagination keyboard."""
-    total_pages = (total_items + items_per_page - 1) // items_per_page
-
-    if total_pages <= 1:
+    if page.prev_cursor is None and page.next_cursor is None:
         return None
 
     builder = InlineKeyboardBuilder()
 
-    if current_page > 1:
+    if page.prev_cursor is not None:
         builder.button(
             text="< Назад",
-            callback_data=PaginationCallback(
-                prefix=callback_prefix,
-                page=current_page - 1,
+            callback_data=_page_button_data(
+                callback_prefix, max(current_page - 1, 1), page, page.prev_cursor
             ),
         )
 
-    if current_page < total_pages:
+    if page.next_cursor is not None:
         builder.button(
             text="Вперед >",
-            callback_data=PaginationCallback(
-                prefix=callback_prefix,
-                page=current_page + 1,
+            callback_data=_page_button_data(
+                callback_prefix, current_page + 1, page, page.next_cursor
             ),
         )
 
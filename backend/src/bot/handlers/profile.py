@@ -4,14 +4,14 @@ from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.types import Message
 
-from src.db.models.user import User
+from src.db.repositories.user_repository import UserSnapshot
 from src.services.user_service import UserService
 
 router = Router(name="profile")
 
 
 @router.message(Command("profile", "me"))
-async def cmd_profile(message: Message, user: User, user_service: UserService) -> None:
+async def cmd_profile(message: Message, user: UserSnapshot, user_service: UserService) -> None:
     """Handle /profile and /me commands."""
     profile = await user_service.get_user_profile(user.id)
     if profile is None:
@@ -36,6 +36,6 @@ async def cmd_profile(message: Message, user: User, user_service: UserService) -
 
 
 @router.message(F.text == "👤 Профиль")
-async def btn_profile(message: Message, user: User, user_service: UserService) -> None:
+async def btn_profile(message: Message, user: UserSnapshot, user_service: UserService) -> None:
     """Handle profile button press."""
     await cmd_profile(message, user, user_service)
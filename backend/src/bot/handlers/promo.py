@@ -18,7 +18,7 @@ from src.bot.keyboards.promo import (
 )
 from src.bot.states.promo import PromoStates
 from src.core.exceptions import NotFoundError, ValidationError
-from src.db.models.user import User
+from src.db.repositories.user_repository import UserSnapshot
 from src.services.dto.invoice import InvoicePreviewDTO
 from src.services.invoice_service import InvoiceService
 from src.services.payment_service import PaymentService
@@ -90,7 +90,7 @@ async def process_promo_code(
     message: Message,
     state: FSMContext,
     session: AsyncSession,
-    user: User,
+    user: UserSnapshot,
 ) -> None:
     """Process entered promo code."""
     if message.text is None:
@@ -187,7 +187,7 @@ async def skip_promo(
     callback_data: PromoCallback,
     state: FSMContext,
     session: AsyncSession,
-    user: User,
+    user: UserSnapshot,
 ) -> None:
     """Continue without promo code - go directly to payment."""
     message = callback.message
@@ -248,7 +248,7 @@ async def remove_promo(
     callback_data: PromoCallback,
     state: FSMContext,
     session: AsyncSession,
-    user: User,
+    user: UserSnapshot,
 ) -> None:
     """Remove applied promo code."""
     message = callback.message
@@ -297,7 +297,7 @@ async def confirm_promo_purchase(
     callback_data: PromoCallback,
     state: FSMContext,
     session: AsyncSession,
-    user: User,
+    user: UserSnapshot,
 ) -> None:
     """Confirm purchase with promo code."""
     message = callback.message
@@ -11,8 +11,7 @@ from src.bot.keyboards import get_back_keyboard
 from src.bot.states.skills import SkillsStates
 from src.core.logging import get_logger
 from src.services.skills_service import SKILLS_COST, SkillsService
-from src.services.runner import SkillsAnalyzer, get_runner_client
-from src.services.token_service import TokenService
+from src.services.runner import get_skills_analyzer
 
 logger = get_logger(__name__)
 
@@ -59,12 +58,10 @@ HH_URL_PATTERN = re.compile(
 )
 
 
-def _get_skills_service(session: AsyncSession, bot) -> SkillsService:
+def _get_skills_service(bot) -> SkillsService:
     """Factory для SkillsService с DI."""
-    runner_client = get_runner_client()
     return SkillsService(
-        token_service=TokenService(session),
-        skills_analyzer=SkillsAnalyzer(runner_client),
+        skills_analyzer=get_skills_analyzer(),
         bot=bot,
     )
 
@@ -84,9 +81,9 @@ def _extract_hh_urls(text: str) -> list[str]:
 
 @router.message(Command("skills"))
 @router.message(F.text == "💪 Усилить резюме")
-async def cmd_skills(message: Message, state: FSMContext, session: AsyncSession) -> None:
+async def cmd_skills(message: Message, state: FSMContext) -> None:
     """Запуск команды анализа навыков."""
-    skills_service = _get_skills_service(session, message.bot)
+    skills_service = _get_skills_service(message.bot)
 
     # Отменяем предыдущий анализ
     await skills_service.cancel(message.from_user.id)
@@ -129,8 +126,12 @@ async def handle_vacancy_urls(message: Message, state: FSMContext, session: Asyn
     await state.set_state(SkillsStates.processing)
     await message.answer(f"🔄 Анализирую {len(urls)} вакансий...")
 
+    # Возвращаем соединение в пул на время стрима Runner:
+    # сервис сам берёт короткие сессии для проверки и списания
+    await session.commit()
+
     # Запускаем анализ через сервис
-    skills_service = _get_skills_service(session, message.bot)
+    skills_service = _get_skills_service(message.bot)
     result = await skills_service.analyze_skills(
         vacancy_urls=urls,
         user_id=message.from_user.id,
@@ -15,7 +15,7 @@ from src.bot.states.cv import CVStates
 from src.bot.states.skills import SkillsStates
 from src.bot.states.apply import ApplyStates
 from src.core.config import settings
-from src.db.models.user import User
+from src.db.repositories.user_repository import UserSnapshot
 from src.services.skills_service import SKILLS_COST
 from src.services.token_service import TokenService
 
@@ -31,7 +31,7 @@ PRIVACY_URL = f"{settings.webhook_base_url}/legal/privacy"
 
 
 @router.message(CommandStart())
-async def cmd_start(message: Message, user: User) -> None:
+async def cmd_start(message: Message, user: UserSnapshot) -> None:
     """Handle /start command."""
     first_name = user.first_name or "друг"
 
@@ -156,7 +156,7 @@ async def on_cmd_cv(
     callback: CallbackQuery,
     state: FSMContext,
     session: AsyncSession,
-    user: User,
+    user: UserSnapshot,
 ) -> None:
     """Handle CV button - start CV analysis flow."""
     token_service = TokenService(session)
@@ -183,7 +183,7 @@ async def on_cmd_skills(
     callback: CallbackQuery,
     state: FSMContext,
     session: AsyncSession,
-    user: User,
+    user: UserSnapshot,
 ) -> None:
     """Handle Skills button - start skills analysis flow."""
     token_service = TokenService(session)
@@ -210,7 +210,7 @@ async def on_cmd_apply(
     callback: CallbackQuery,
     state: FSMContext,
     session: AsyncSession,
-    user: User,
+    user: UserSnapshot,
 ) -> None:
     """Handle Apply button - start apply flow."""
     token_service = TokenService(session)
@@ -7,9 +7,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot import get_bot
 from src.core.config import settings
-from src.db.models.user import User
+from src.db.repositories.user_repository import UserSnapshot
 from src.services.notification_service import NotificationService
 from src.services.subscription_service import SubscriptionService
+from src.services.user_service import UserService
 
 router = Router(name="subscription")
 
@@ -59,7 +60,7 @@ def get_subscription_keyboard(sub_status: dict) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def format_subscription_message(user: User, sub_status: dict) -> str:
+def format_subscription_message(user: UserSnapshot, sub_status: dict) -> str:
     """Format subscription status message."""
     lines = ["<b>Upravlenie podpiskoj</b>\n"]
 
@@ -113,10 +114,13 @@ def format_subscription_message(user: User, sub_status: dict) -> str:
 @router.message(Command("subscription", "sub"))
 async def cmd_subscription(
     message: Message,
-    user: User,
+    user: UserSnapshot,
+    user_service: UserService,
     session: AsyncSession,
 ) -> None:
     """Show subscription details and management options."""
+    # Subscription may have been activated by a payment in the API process
+    user = await user_service.get_fresh_snapshot(user.id) or user
     notification_service = NotificationService(get_bot())
     subscription_service = SubscriptionService(session, notification_service)
 
@@ -131,7 +135,8 @@ async def cmd_subscription(
 @router.callback_query(F.data == "subscription:refresh")
 async def on_refresh_subscription(
     callback: CallbackQuery,
-    user: User,
+    user: UserSnapshot,
+    user_service: UserService,
     session: AsyncSession,
 ) -> None:
     """Refresh subscription status."""
@@ -143,10 +148,8 @@ async def on_refresh_subscription(
         notification_service = NotificationService(get_bot())
         subscription_service = SubscriptionService(session, notification_service)
 
-        # Refresh user from DB
-        from src.db.repositories.user_repository import UserRepository
-        user_repo = UserRepository(session)
-        fresh_user = await user_repo.get_by_id(user.id)
+        # Refresh user from DB (and the snapshot cache)
+        fresh_user = await user_service.get_fresh_snapshot(user.id)
 
         if fresh_user is None:
             await callback.answer("Ошибка: пользователь не найден")
@@ -166,7 +169,7 @@ async def on_refresh_subscription(
 @router.callback_query(F.data == "subscription:toggle_auto")
 async def on_toggle_auto_renew(
     callback: CallbackQuery,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
 ) -> None:
     """Toggle auto-renewal setting."""
@@ -188,7 +191,7 @@ async def on_toggle_auto_renew(
         # Refresh the message
         from src.db.repositories.user_repository import UserRepository
         user_repo = UserRepository(session)
-        fresh_user = await user_repo.get_by_id(user.id)
+        fresh_user = await user_repo.get_snapshot(user.id)
 
         if fresh_user:
             sub_status = await subscription_service.get_subscription_status(fresh_user)
@@ -203,7 +206,8 @@ async def on_toggle_auto_renew(
 @router.callback_query(F.data == "subscription:renew")
 async def on_renew_subscription(
     callback: CallbackQuery,
-    user: User,
+    user: UserSnapshot,
+    user_service: UserService,
     session: AsyncSession,
 ) -> None:
     """Manually renew subscription."""
@@ -216,6 +220,7 @@ async def on_renew_subscription(
         subscription_service = SubscriptionService(session, notification_service)
 
         renewal_price = settings.subscription_renewal_price
+        user = await user_service.get_fresh_snapshot(user.id) or user
 
         # Check balance first
         if user.token_balance < renewal_price:
@@ -237,7 +242,7 @@ async def on_renew_subscription(
             # Refresh the message
             from src.db.repositories.user_repository import UserRepository
             user_repo = UserRepository(session)
-            fresh_user = await user_repo.get_by_id(user.id)
+            fresh_user = await user_repo.get_snapshot(user.id)
 
             if fresh_user:
                 sub_status = await subscription_service.get_subscription_status(fresh_user)
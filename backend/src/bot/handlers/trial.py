@@ -10,8 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.bot.keyboards.balance import get_balance_keyboard, get_trial_promo_keyboard
 from src.bot.states.trial import TrialStates
 from src.core.exceptions import ValidationError
-from src.db.models.user import User
 from src.db.repositories.tariff_repository import TariffRepository
+from src.db.repositories.user_repository import UserSnapshot
 from src.services.trial_service import TrialService
 
 logger = logging.getLogger(__name__)
@@ -56,7 +56,7 @@ async def on_promo_trial_button(
 @router.message(TrialStates.waiting_for_code)
 async def on_promo_code_input(
     message: Message,
-    user: User,
+    user: UserSnapshot,
     session: AsyncSession,
     state: FSMContext,
 ) -> None:
@@ -12,6 +12,7 @@ from src.bot.keyboards.promo import (
     get_promo_result_keyboard,
     get_tariff_with_promo_keyboard,
 )
+from src.bot.keyboards.regenerate import get_regenerate_keyboard
 
 __all__ = [
     "get_back_keyboard",
@@ -24,4 +25,5 @@ __all__ = [
     "get_promo_input_keyboard",
     "get_promo_result_keyboard",
     "get_tariff_with_promo_keyboard",
+    "get_regenerate_keyboard",
 ]
@@ -0,0 +1,23 @@
+"""Regenerate inline keyboard."""
+
+from aiogram.types import InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from src.bot.callbacks.regenerate import RegenerateCallback
+
+
+def get_regenerate_keyboard(kind: str) -> InlineKeyboardMarkup:
+    """Create keyboard offering a fresh run instead of the cached result.
+
+    Args:
+        kind: Flow to rerun ("apply" or "cv")
+
+    Returns:
+        InlineKeyboardMarkup with a single button
+    """
+    builder = InlineKeyboardBuilder()
+    builder.button(
+        text="🔄 Сгенерировать заново",
+        callback_data=RegenerateCallback(kind=kind),
+    )
+    return builder.as_markup()
@@ -8,6 +8,7 @@ from aiogram import BaseMiddleware
 from aiogram.types import CallbackQuery, Message, TelegramObject
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.db.user_cache import user_cache
 from src.services.user_service import UserService
 
 logger = logging.getLogger(__name__)
@@ -35,15 +36,26 @@ class AuthMiddleware(BaseMiddleware):
         session: AsyncSession = data["session"]
         user_service = UserService(session)
 
-        user, created = await user_service.get_or_create_user(
-            telegram_id=tg_user.id,
-            username=tg_user.username,
-            first_name=tg_user.first_name,
-            last_name=tg_user.last_name,
-        )
-
-        if created:
-            logger.info("New user registered: %d (@%s)", user.id, user.username)
+        # Cache hit with unchanged profile skips the database entirely
+        user = user_cache.get(tg_user.id)
+        if user is None or (user.username, user.first_name, user.last_name) != (
+            tg_user.username,
+            tg_user.first_name,
+            tg_user.last_name,
+        ):
+            token = user_cache.read_token()
+            user, created = await user_service.get_or_create_snapshot(
+                telegram_id=tg_user.id,
+                username=tg_user.username,
+                first_name=tg_user.first_name,
+                last_name=tg_user.last_name,
+            )
+
+            if created:
+                # Not cached until the INSERT is committed
+                logger.info("New user registered: %d (@%s)", user.id, user.username)
+            else:
+                user_cache.put(user, token)
 
         data["user"] = user
         data["user_service"] = user_service
@@ -6,7 +6,7 @@ from aiogram import BaseMiddleware
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
-from src.services.runner import get_runner_client
+from src.services.runner import get_admission_controller, get_runner_client
 
 
 class CommandResetMiddleware(BaseMiddleware):
@@ -48,6 +48,7 @@ class CommandResetMiddleware(BaseMiddleware):
 
                 # 2. Отмена Runner стриминга
                 try:
+                    get_admission_controller().cancel(event.from_user.id)
                     runner = get_runner_client()
                     await runner.cancel_stream(event.from_user.id)
                 except Exception:
@@ -7,13 +7,20 @@ from typing import Any
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 
+from src.db.replica import open_replica_session
 from src.db.session import async_session_factory
 
 logger = logging.getLogger(__name__)
 
 
 class DbSessionMiddleware(BaseMiddleware):
-    """Middleware that provides database session to handlers."""
+    """Middleware that provides database sessions to handlers.
+
+    `session` is bound to the primary. `read_session` is for read-only
+    handlers: a replica session when one is configured and the user has not
+    written recently, otherwise the same object as `session`. Sessions are
+    lazy, so an unused one never checks out a connection.
+    """
 
     async def __call__(
         self,
@@ -21,9 +28,12 @@ class DbSessionMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
-        """Inject database session into handler data."""
+        """Inject database sessions into handler data."""
         session = async_session_factory()
+        tg_user = data.get("event_from_user")
+        read_session = open_replica_session(tg_user.id if tg_user else None)
         data["session"] = session
+        data["read_session"] = read_session or session
         try:
             result = await handler(event, data)
             await session.commit()
@@ -33,3 +43,5 @@ class DbSessionMiddleware(BaseMiddleware):
             raise
         finally:
             await session.close()
+            if read_session is not None:
+                await read_session.close()
@@ -0,0 +1,227 @@
+"""Outbound Telegram rate scheduler.
+
+Все исходящие сообщения бота (send*/edit*/copy*/forward*) проходят через
+SendScheduler: глобальный token bucket (~30 сообщений/с на бота) и
+bucket на каждый чат (~1 сообщение/с). Интерактивные ответы имеют
+приоритет над массовыми уведомлениями. При 429 запрос ждёт retry_after
+и повторяется, чат (или весь бот) ставится на паузу.
+
+Планировщик подключается к Bot как request middleware в create_bot(),
+поэтому обходить его не нужно ни хендлерам, ни сервисам. Лимиты
+действуют в пределах процесса.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+logger = get_logger(__name__)
+
+# Методы Bot API, на которые распространяются лимиты сообщений
+_LIMITED_PREFIXES = ("Send", "Edit", "Copy", "Forward")
+_UNLIMITED_METHODS = frozenset({"SendChatAction"})
+
+# Сколько чатов держать в памяти (вытесненный чат начинает с полного bucket)
+_MAX_CHAT_BUCKETS = 10000
+
+
+class SendPriority(StrEnum):
+    """Полоса приоритета исходящих сообщений."""
+
+    INTERACTIVE = "interactive"  # ответы пользователю
+    BULK = "bulk"  # рассылки и плановые уведомления
+
+
+_priority: ContextVar[SendPriority] = ContextVar("telegram_send_priority", default=SendPriority.INTERACTIVE)
+
+
+@contextmanager
+def send_priority(priority: SendPriority) -> Iterator[None]:
+    """Отправлять сообщения внутри блока с указанным приоритетом.
+
+    Usage:
+        with send_priority(SendPriority.BULK):
+            await bot.send_message(chat_id, text)
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше capacity."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def wait_time(self, now: float, reserve: float = 0.0) -> float:
+        """Сколько ждать, пока можно взять токен, оставив reserve токенов."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        need = 1.0 + reserve
+        if self.tokens >= need:
+            return 0.0
+        return (need - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1.0
+
+    def pause(self, seconds: float) -> None:
+        """Не выдавать токены seconds секунд (ответ 429 retry_after)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        # После паузы доступен ровно один токен
+        self.tokens = 1.0
+        self.updated = self.paused_until
+
+
+class SendScheduler:
+    """Выдача разрешений на отправку с учётом глобального и чатовых лимитов.
+
+    BULK-сообщения не берут последние bulk_reserve доли глобального bucket
+    и ждут, пока интерактивные сообщения ждут глобальный токен.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        bulk_reserve: float = 0.2,
+    ) -> None:
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.bulk_reserve = bulk_reserve * global_rate
+        self._chats: OrderedDict[Hashable, TokenBucket] = OrderedDict()
+        self._interactive_starved = 0  # интерактивные, ждущие глобальный токен
+        self.granted = {SendPriority.INTERACTIVE: 0, SendPriority.BULK: 0}
+        self.waited_seconds = {SendPriority.INTERACTIVE: 0.0, SendPriority.BULK: 0.0}
+        self.retry_after_hits = 0
+
+    async def acquire(self, chat_id: Hashable | None, priority: SendPriority = SendPriority.INTERACTIVE) -> None:
+        """Дождаться разрешения на отправку одного сообщения в chat_id."""
+        bulk = priority == SendPriority.BULK
+        started = time.monotonic()
+        starved = False
+        try:
+            while True:
+                now = time.monotonic()
+                wait = self.global_bucket.wait_time(now, self.bulk_reserve if bulk else 0.0)
+                if not bulk and starved != (wait > 0):
+                    starved = wait > 0
+                    self._interactive_starved += 1 if starved else -1
+
+                chat = self._chat_bucket(chat_id) if chat_id is not None else None
+                if chat is not None:
+                    wait = max(wait, chat.wait_time(now))
+                if bulk and self._interactive_starved:
+                    # Уступаем глобальные токены интерактивным сообщениям
+                    wait = max(wait, 1.0 / self.global_bucket.rate)
+
+                if wait <= 0:
+                    self.global_bucket.consume()
+                    if chat is not None:
+                        chat.consume()
+                    self.granted[priority] += 1
+                    self.waited_seconds[priority] += now - started
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            if starved:
+                self._interactive_starved -= 1
+
+    def pause(self, chat_id: Hashable | None, seconds: float) -> None:
+        """Учесть 429: остановить отправку в чат (или всем, если чат неизвестен)."""
+        self.retry_after_hits += 1
+        if chat_id is None:
+            self.global_bucket.pause(seconds)
+        else:
+            self._chat_bucket(chat_id).pause(seconds)
+
+    def _chat_bucket(self, chat_id: Hashable) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+            while len(self._chats) > _MAX_CHAT_BUCKETS:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """Request middleware Bot: лимиты отправки и обработка retry_after."""
+
+    def __init__(self, scheduler: SendScheduler, max_retries: int = 3) -> None:
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = type(method).__name__
+        if not name.startswith(_LIMITED_PREFIXES) or name in _UNLIMITED_METHODS:
+            return await make_request(bot, method)
+
+        chat_id: Any = getattr(method, "chat_id", None)
+        priority = _priority.get()
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(chat_id, priority)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                attempt += 1
+                self.scheduler.pause(chat_id, e.retry_after)
+                if attempt > self.max_retries:
+                    raise
+                logger.warning(
+                    f"Telegram 429 on {name} to {chat_id}: retry after {e.retry_after}s "
+                    f"(attempt {attempt}/{self.max_retries})"
+                )
+
+
+_scheduler: SendScheduler | None = None
+
+
+def get_send_scheduler() -> SendScheduler:
+    """Получить планировщик отправки процесса (singleton)."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SendScheduler(
+            global_rate=settings.telegram_global_rate,
+            chat_rate=settings.telegram_chat_rate,
+            chat_burst=settings.telegram_chat_burst,
+            bulk_reserve=settings.telegram_bulk_reserve,
+        )
+    return _scheduler
@@ -19,6 +19,14 @@ class Settings(BaseSettings):
         ...,
         description="PostgreSQL connection string",
     )
+    database_replica_url: PostgresDsn | None = Field(
+        default=None,
+        description="Read replica connection string for read-only paths (optional)",
+    )
+    replica_read_after_write_seconds: float = Field(
+        default=10.0,
+        description="Seconds after a user's write during which their reads use the primary",
+    )
 
     # Telegram
     telegram_bot_token: str = Field(
@@ -26,6 +34,26 @@ class Settings(BaseSettings):
         min_length=1,
         description="Telegram Bot API token",
     )
+    telegram_global_rate: float = Field(
+        default=30.0,
+        description="Max outgoing Telegram messages per second for the whole bot",
+    )
+    telegram_chat_rate: float = Field(
+        default=1.0,
+        description="Max outgoing Telegram messages per second to one chat",
+    )
+    telegram_chat_burst: float = Field(
+        default=3.0,
+        description="Messages one chat may receive in a burst before chat_rate applies",
+    )
+    telegram_bulk_reserve: float = Field(
+        default=0.2,
+        description="Share of the global rate kept for interactive replies over bulk notifications",
+    )
+    telegram_retry_after_max_retries: int = Field(
+        default=3,
+        description="How many times a send is retried after Telegram 429 retry_after",
+    )
 
     # Payment provider selection
     payment_provider: Literal["mock", "robokassa"] = Field(
@@ -81,6 +109,12 @@ class Settings(BaseSettings):
         description="Telegram support username (without @)",
     )
 
+    # Payment webhook
+    payment_dedupe_max_size: int = Field(
+        default=10000,
+        description="Paid InvIds remembered in memory to answer webhook retries without a DB lock (0 disables)",
+    )
+
     # Invoice settings
     invoice_ttl_hours: int = Field(
         default=24,
@@ -102,6 +136,70 @@ class Settings(BaseSettings):
         default=60,
         description="Rate limit period in seconds",
     )
+    rate_limit_max_clients: int = Field(
+        default=100000,
+        description="Max API clients tracked by the rate limiter (least recently seen are dropped)",
+    )
+
+    # User snapshot cache (bot process)
+    user_cache_ttl_seconds: float = Field(
+        default=30.0,
+        description="TTL of cached user snapshots in seconds (0 disables cache)",
+    )
+    user_cache_max_size: int = Field(
+        default=10000,
+        description="Max number of cached user snapshots",
+    )
+
+    # Audit log writer
+    audit_batch_size: int = Field(
+        default=200,
+        description="Max audit log entries per multi-row INSERT",
+    )
+    audit_flush_interval_seconds: float = Field(
+        default=1.0,
+        description="Interval between buffered audit log flushes in seconds",
+    )
+    audit_max_buffer: int = Field(
+        default=10000,
+        description="Max buffered audit log entries before the oldest are dropped",
+    )
+    audit_max_attempts: int = Field(
+        default=5,
+        description="Failed writes of an audit log entry before it is logged and dropped",
+    )
+
+    # Transactions partitioning
+    transaction_partitions_ahead: int = Field(
+        default=3,
+        description="Monthly transactions partitions to keep created ahead of the current one",
+    )
+
+    # Notification outbox
+    outbox_poll_interval_seconds: float = Field(
+        default=2.0,
+        description="Seconds between notification outbox polls",
+    )
+    outbox_batch_size: int = Field(
+        default=50,
+        description="Max outbox notifications claimed per dispatch",
+    )
+    outbox_max_attempts: int = Field(
+        default=8,
+        description="Delivery attempts before an outbox notification is marked failed",
+    )
+    outbox_retry_base_seconds: float = Field(
+        default=5.0,
+        description="Delay before the first outbox retry (seconds), doubles per attempt",
+    )
+    outbox_retry_max_seconds: float = Field(
+        default=600.0,
+        description="Max delay between outbox retries (seconds)",
+    )
+    outbox_retention_days: int = Field(
+        default=7,
+        description="Days to keep sent and failed outbox notifications",
+    )
 
     # Logging
     log_level: str = Field(
@@ -136,10 +234,110 @@ class Settings(BaseSettings):
         default="http://155.212.245.141:8000",
         description="Base URL for HHH Runner API",
     )
+    runner_endpoints: list[str] = Field(
+        default=[],
+        description="Runner base URLs to load-balance between (empty: use runner_base_url)",
+    )
+    runner_balance_strategy: str = Field(
+        default="p2c",
+        description="Runner node selection: p2c (power of two choices) or least_outstanding",
+    )
     runner_api_key: str = Field(
         default="runner-health-secret-key-2024",
         description="API key for Runner authentication",
     )
+    runner_pool_limit: int = Field(
+        default=100,
+        description="Max open connections in Runner HTTP pool",
+    )
+    runner_pool_limit_per_host: int = Field(
+        default=30,
+        description="Max open connections to one Runner host",
+    )
+    runner_keepalive_timeout: float = Field(
+        default=30.0,
+        description="Seconds to keep idle Runner connections open",
+    )
+    runner_dns_cache_ttl: int = Field(
+        default=300,
+        description="Seconds to cache Runner DNS lookups",
+    )
+    cv_presence_positive_ttl_seconds: float = Field(
+        default=3600.0,
+        description="TTL for cached 'user has a CV' answers (0 disables)",
+    )
+    cv_presence_negative_ttl_seconds: float = Field(
+        default=300.0,
+        description="TTL for cached 'user has no CV' answers (0 disables)",
+    )
+    cv_presence_cache_max_size: int = Field(
+        default=10000,
+        description="Max users in CV presence cache",
+    )
+    constructor_cache_max_size: int = Field(
+        default=500,
+        description="Max users in constructor cache (0 disables)",
+    )
+    result_cache_ttl_seconds: float = Field(
+        default=0.0,
+        description="TTL for replaying cached /apply and /cv results (0 disables)",
+    )
+    result_cache_max_size: int = Field(
+        default=1000,
+        description="Max cached /apply and /cv results",
+    )
+    runner_max_concurrent_tracks: int = Field(
+        default=8,
+        description="Max Runner tracks (/cv, /apply, /skills) running at once per bot process",
+    )
+    runner_max_queued_tracks: int = Field(
+        default=50,
+        description="Max tracks waiting for a slot; further requests are refused",
+    )
+    runner_stream_max_reconnects: int = Field(
+        default=5,
+        description="Reconnect attempts for a dropped Runner SSE stream",
+    )
+    runner_stream_backoff_base: float = Field(
+        default=1.0,
+        description="Initial delay before SSE reconnect (seconds), doubles per attempt",
+    )
+    runner_stream_backoff_max: float = Field(
+        default=30.0,
+        description="Max delay between SSE reconnects (seconds)",
+    )
+    runner_result_poll_timeout: float = Field(
+        default=300.0,
+        description="How long to poll task result after the stream is lost (seconds)",
+    )
+    runner_health_probe_interval: float = Field(
+        default=15.0,
+        description="Seconds between background Runner health probes (0 disables)",
+    )
+    runner_breaker_window: int = Field(
+        default=20,
+        description="Number of recent Runner calls the circuit breaker evaluates",
+    )
+    runner_breaker_min_calls: int = Field(
+        default=5,
+        description="Minimum calls in the window before the breaker can open",
+    )
+    runner_breaker_failure_rate: float = Field(
+        default=0.5,
+        description="Share of failed calls (network errors, timeouts, 5xx) that opens the breaker",
+    )
+    runner_breaker_slow_call_seconds: float = Field(
+        default=10.0,
+        description="Calls slower than this (time to response headers) count as slow",
+    )
+    runner_breaker_slow_call_rate: float = Field(
+        default=0.8,
+        description="Share of slow calls that opens the breaker",
+    )
+    runner_breaker_open_seconds: float = Field(
+        default=30.0,
+        description="Seconds the breaker stays open before letting a probe call through",
+    )
 
     # Token spending
     cost_multiplier: float = Field(
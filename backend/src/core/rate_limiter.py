@@ -0,0 +1,76 @@
+"""GCRA rate limiter with bounded per-client state.
+
+Generic Cell Rate Algorithm: each key stores a single integer, its
+theoretical arrival time (TAT) in monotonic nanoseconds. A request is
+allowed if it does not move the TAT more than one period ahead of now;
+this admits bursts of up to `calls` and then `calls` per `period` on
+average, like a sliding window, in O(1) time and memory per key.
+
+acquire() never awaits, so under asyncio it runs atomically and needs no
+lock. Keys are kept in LRU order: idle keys (TAT in the past carry no
+state) are evicted a few at a time on each call, and the least recently
+used keys are dropped when max_keys is exceeded.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+# Max idle keys evicted per acquire() (amortized cleanup)
+_EVICT_PER_CALL = 4
+
+
+class GCRARateLimiter:
+    """In-process GCRA limiter: `calls` per `period` seconds per key."""
+
+    def __init__(self, calls: int, period: float, max_keys: int = 100_000) -> None:
+        if calls <= 0 or period <= 0:
+            raise ValueError("calls and period must be positive")
+        self.calls = calls
+        self.period = period
+        self.max_keys = max_keys
+        # Interval between requests at the sustained rate and the burst window
+        self._interval_ns = int(period * 1e9 / calls)
+        self._window_ns = int(period * 1e9)
+        self._tat: OrderedDict[Hashable, int] = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    def acquire(self, key: Hashable, now_ns: int | None = None) -> float:
+        """Try to take one request slot for key.
+
+        Returns:
+            0.0 if allowed, otherwise seconds until the next request is allowed
+        """
+        now = time.monotonic_ns() if now_ns is None else now_ns
+        self._evict_idle(now)
+
+        tat = self._tat.get(key, now)
+        new_tat = max(tat, now) + self._interval_ns
+        allow_at = new_tat - self._window_ns
+        if now < allow_at:
+            return (allow_at - now) / 1e9
+
+        self._tat[key] = new_tat
+        self._tat.move_to_end(key)
+        if len(self._tat) > self.max_keys:
+            # Forgetting a key only makes its limit more permissive
+            self._tat.popitem(last=False)
+            self.evicted += 1
+        return 0.0
+
+    def reset(self) -> None:
+        """Forget all keys."""
+        self._tat.clear()
+
+    def _evict_idle(self, now: int) -> None:
+        for _ in range(_EVICT_PER_CALL):
+            if not self._tat:
+                return
+            key, tat = next(iter(self._tat.items()))
+            if tat > now:
+                return
+            del self._tat[key]
+            self.evicted += 1
@@ -1,6 +1,8 @@
 from src.db.models.apply_feedback import ApplyFeedback, FeedbackRating
 from src.db.models.audit_log import AuditLog
 from src.db.models.invoice import Invoice, InvoiceStatus
+from src.db.models.ledger_summary import ArchivedLedgerTotals, UserLedgerSummary
+from src.db.models.notification_outbox import NotificationOutbox, OutboxStatus
 from src.db.models.promo_activation import PromoActivation
 from src.db.models.promo_code import DiscountType, PromoCode
 from src.db.models.tariff import PeriodUnit, Tariff
@@ -9,11 +11,14 @@ from src.db.models.user import User
 
 __all__ = [
     "ApplyFeedback",
+    "ArchivedLedgerTotals",
     "AuditLog",
     "DiscountType",
     "FeedbackRating",
     "Invoice",
     "InvoiceStatus",
+    "NotificationOutbox",
+    "OutboxStatus",
     "PeriodUnit",
     "PromoActivation",
     "PromoCode",
@@ -21,4 +26,5 @@ __all__ = [
     "Transaction",
     "TransactionType",
     "User",
+    "UserLedgerSummary",
 ]
@@ -11,6 +11,7 @@ from sqlalchemy import (
     Index,
     Integer,
     Numeric,
+    Sequence,
     String,
     Text,
 )
@@ -19,6 +20,9 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.session import Base
 
+# Source of Robokassa InvIds, seeded from MAX(inv_id) by migration 011
+invoice_inv_id_seq = Sequence("invoices_inv_id_seq", metadata=Base.metadata)
+
 
 class InvoiceStatus(enum.Enum):
     """Invoice payment status."""
@@ -0,0 +1,144 @@
+"""Per-user ledger summary model.
+
+Maintained by the transactions AFTER INSERT trigger
+(apply_transaction_to_ledger_summary, see migration 010), so it is updated
+in the same database transaction as every ledger insert.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, Float, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.session import Base
+
+# Number of daily spend buckets kept in daily_spend (today included).
+# Must match the trigger function in the migration.
+DAILY_SPEND_RETENTION_DAYS = 30
+
+
+class UserLedgerSummary(Base):
+    """Running totals of a user's token transactions."""
+
+    __tablename__ = "user_ledger_summary"
+
+    user_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="User Telegram ID",
+    )
+    total_topup: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0,
+        comment="Sum of tokens_delta for topup transactions",
+    )
+    total_spent: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0,
+        comment="Sum of tokens_delta for spend transactions",
+    )
+    total_refund: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0,
+        comment="Sum of tokens_delta for refund transactions",
+    )
+    total_adjustment: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0,
+        comment="Sum of tokens_delta for adjustment transactions",
+    )
+    total_subscription: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0,
+        comment="Sum of tokens_delta for subscription transactions",
+    )
+    transaction_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Number of transactions",
+    )
+    daily_spend: Mapped[dict[str, Any]] = mapped_column(
+        JSONB,
+        nullable=False,
+        default=dict,
+        comment="Spend tokens_delta per UTC day (YYYY-MM-DD), recent days only",
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow,
+        nullable=False,
+        comment="Last update time",
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"UserLedgerSummary(user_id={self.user_id}, "
+            f"count={self.transaction_count})"
+        )
+
+
+class ArchivedLedgerTotals(Base):
+    """Totals of a user's transactions in archived (dropped) partitions.
+
+    Written when TransactionPartitionRepository drops a partition, so
+    LedgerSummaryRepository.rebuild can add back what is no longer in
+    the transactions table.
+    """
+
+    __tablename__ = "archived_ledger_totals"
+
+    user_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="User Telegram ID",
+    )
+    total_topup: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0,
+        comment="Sum of archived topup tokens_delta",
+    )
+    total_spent: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0,
+        comment="Sum of archived spend tokens_delta",
+    )
+    total_refund: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0,
+        comment="Sum of archived refund tokens_delta",
+    )
+    total_adjustment: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0,
+        comment="Sum of archived adjustment tokens_delta",
+    )
+    total_subscription: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0,
+        comment="Sum of archived subscription tokens_delta",
+    )
+    transaction_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Number of archived transactions",
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow,
+        nullable=False,
+        comment="Last archive time",
+    )
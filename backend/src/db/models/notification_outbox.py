@@ -0,0 +1,98 @@
+"""Transactional outbox for Telegram notifications."""
+
+import enum
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Enum, Index, Integer, Text
+from sqlalchemy import text as sql_text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.session import Base
+
+
+class OutboxStatus(enum.StrEnum):
+    """Delivery status of an outbox notification."""
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class NotificationOutbox(Base):
+    """Notification written in the same transaction as the change it reports.
+
+    Rows are delivered to Telegram by OutboxDispatcher after commit.
+    """
+
+    __tablename__ = "notification_outbox"
+
+    id: Mapped[int] = mapped_column(
+        BigInteger,
+        primary_key=True,
+        autoincrement=True,
+        comment="Outbox entry ID",
+    )
+    chat_id: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        comment="Telegram chat to deliver to (no FK for independence)",
+    )
+    text: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+        comment="Message text (bot default parse mode)",
+    )
+    dedupe_key: Mapped[str | None] = mapped_column(
+        Text,
+        unique=True,
+        nullable=True,
+        comment="Idempotency key: a second enqueue with the same key is ignored",
+    )
+    status: Mapped[OutboxStatus] = mapped_column(
+        Enum(
+            OutboxStatus,
+            name="outbox_status",
+            create_constraint=True,
+            values_callable=lambda x: [e.value for e in x],
+        ),
+        default=OutboxStatus.PENDING,
+        nullable=False,
+        comment="Delivery status (pending/sent/failed)",
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+        comment="Delivery attempts made",
+    )
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow,
+        nullable=False,
+        comment="Earliest time of the next delivery attempt",
+    )
+    last_error: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+        comment="Error of the last failed attempt",
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow,
+        nullable=False,
+        comment="Enqueue time",
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(
+        nullable=True,
+        comment="Delivery time",
+    )
+
+    __table_args__ = (
+        Index(
+            "idx_notification_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=sql_text("status = 'pending'"),
+        ),
+        Index("idx_notification_outbox_created_at", "created_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"NotificationOutbox(id={self.id}, chat_id={self.chat_id}, status={self.status.value})"
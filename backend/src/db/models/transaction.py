@@ -4,7 +4,7 @@ from datetime import datetime
 
 from typing import Any
 
-from sqlalchemy import BigInteger, Enum, Float, ForeignKey, Index, Integer, Text
+from sqlalchemy import BigInteger, Enum, Float, ForeignKey, Index, Integer, Text, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -75,7 +75,9 @@ class Transaction(Base):
         nullable=True,
         comment="Additional transaction data",
     )
+    # Part of the primary key: the table is range-partitioned by month on it
     created_at: Mapped[datetime] = mapped_column(
+        primary_key=True,
         default=datetime.utcnow,
         nullable=False,
         comment="Transaction time",
@@ -91,9 +93,16 @@ class Transaction(Base):
     )
 
     __table_args__ = (
-        Index("idx_transactions_user_id", "user_id"),
+        # Keyset pagination of user history: (user_id, created_at DESC, id DESC)
+        Index(
+            "idx_transactions_user_created_at_id",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
         Index("idx_transactions_created_at", "created_at"),
         Index("idx_transactions_type", "type"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
     def __repr__(self) -> str:
@@ -89,13 +89,15 @@ class User(Base):
     )
 
     # Relationships
+    # Loaded only on explicit request (selectinload), never implicitly:
+    # the user row is read on every update and must not drag the ledger along.
     invoices: Mapped[list["Invoice"]] = relationship(
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
     )
     transactions: Mapped[list["Transaction"]] = relationship(
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
     )
 
     __table_args__ = (
@@ -0,0 +1,128 @@
+"""Optional read replica routing for read-only paths.
+
+When DATABASE_REPLICA_URL is set, read-only sessions go to a second engine.
+A user's reads stay on the primary for REPLICA_READ_AFTER_WRITE_SECONDS after
+their own writes in this process, so they never see the replica lag behind
+what they just did.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from src.core.config import settings
+from src.db.session import async_session_factory
+
+# Key in Session.info marking a session as read-only
+READ_ONLY_KEY = "read_only"
+
+replica_engine: AsyncEngine | None = None
+replica_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+if settings.database_replica_url is not None:
+    replica_engine = create_async_engine(
+        str(settings.database_replica_url),
+        pool_size=5,
+        max_overflow=10,
+        pool_timeout=30,
+        pool_pre_ping=True,
+        echo=False,
+    )
+    replica_session_factory = async_sessionmaker(
+        bind=replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+        info={READ_ONLY_KEY: True},
+    )
+
+
+class RecentWrites:
+    """Bounded map of users who wrote within the last `window` seconds."""
+
+    def __init__(self, window: float, max_size: int = 10000) -> None:
+        self.window = window
+        self.max_size = max_size
+        self._deadlines: OrderedDict[int, float] = OrderedDict()
+
+    def mark(self, user_id: int) -> None:
+        """Record a write by user now."""
+        self._deadlines[user_id] = time.monotonic() + self.window
+        self._deadlines.move_to_end(user_id)
+        while len(self._deadlines) > self.max_size:
+            self._deadlines.popitem(last=False)
+
+    def is_recent(self, user_id: int) -> bool:
+        """Check if user wrote within the window."""
+        deadline = self._deadlines.get(user_id)
+        if deadline is None:
+            return False
+        if deadline <= time.monotonic():
+            del self._deadlines[user_id]
+            return False
+        return True
+
+
+recent_writes = RecentWrites(window=settings.replica_read_after_write_seconds)
+
+
+def note_user_write(user_id: int) -> None:
+    """Keep user's reads on the primary for the read-after-write window."""
+    recent_writes.mark(user_id)
+
+
+def open_replica_session(user_id: int | None = None) -> AsyncSession | None:
+    """Open a read-only replica session.
+
+    Returns:
+        Session bound to the replica, or None if no replica is configured
+        or user_id wrote recently (use a primary session then)
+    """
+    if replica_session_factory is None:
+        return None
+    if user_id is not None and recent_writes.is_recent(user_id):
+        return None
+    return replica_session_factory()
+
+
+@asynccontextmanager
+async def get_read_session(user_id: int | None = None) -> AsyncGenerator[AsyncSession, None]:
+    """Async context manager for read-only sessions.
+
+    Uses the replica when possible, the primary otherwise. The session is
+    marked read-only either way, and any write through it raises.
+    """
+    session = open_replica_session(user_id)
+    if session is None:
+        session = async_session_factory(info={READ_ONLY_KEY: True})
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def _reject_orm_writes(session: Session, _flush_context: object, _instances: object) -> None:
+    if session.info.get(READ_ONLY_KEY) and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("Attempted to flush changes in a read-only session")
+
+
+def _reject_dml(state: ORMExecuteState) -> None:
+    if state.session.info.get(READ_ONLY_KEY) and (
+        state.is_insert or state.is_update or state.is_delete
+    ):
+        raise RuntimeError("Attempted to execute DML in a read-only session")
+
+
+event.listen(Session, "before_flush", _reject_orm_writes)
+event.listen(Session, "do_orm_execute", _reject_dml)
+
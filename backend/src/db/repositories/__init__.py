@@ -1,4 +1,6 @@
 from src.db.repositories.invoice_repository import InvoiceRepository
+from src.db.repositories.ledger_summary_repository import LedgerSummaryRepository
+from src.db.repositories.outbox_repository import OutboxRepository
 from src.db.repositories.promo_code_repository import PromoCodeRepository
 from src.db.repositories.tariff_repository import TariffRepository
 from src.db.repositories.transaction_repository import TransactionRepository
@@ -6,6 +8,8 @@ from src.db.repositories.user_repository import UserRepository
 
 __all__ = [
     "InvoiceRepository",
+    "LedgerSummaryRepository",
+    "OutboxRepository",
     "PromoCodeRepository",
     "TariffRepository",
     "TransactionRepository",
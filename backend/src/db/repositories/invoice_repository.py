@@ -3,11 +3,11 @@
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import func, select, update
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.exceptions import NotFoundError
-from src.db.models.invoice import Invoice, InvoiceStatus
+from src.db.models.invoice import Invoice, InvoiceStatus, invoice_inv_id_seq
 
 
 class InvoiceRepository:
@@ -30,6 +30,16 @@ class InvoiceRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_status(self, invoice_id: UUID) -> InvoiceStatus | None:
+        """Get invoice status only (no lock, no ORM entity).
+
+        Cheap pre-check for webhook retries of already paid invoices.
+        """
+        result = await self.session.execute(
+            select(Invoice.status).where(Invoice.id == invoice_id)
+        )
+        return result.scalar_one_or_none()
+
     async def get_by_inv_id(self, inv_id: int) -> Invoice | None:
         """Get invoice by Robokassa InvId."""
         result = await self.session.execute(
@@ -139,12 +149,11 @@ class InvoiceRepository:
     async def get_next_inv_id(self) -> int:
         """Generate next sequential InvId for Robokassa.
 
-        Uses MAX(inv_id) + 1 approach with a fallback to 1.
-        Thread-safe due to transaction isolation.
+        Allocated from invoices_inv_id_seq: constant time and never handed
+        out twice, even under concurrent invoice creation. Ids taken by
+        rolled back transactions leave gaps, which Robokassa allows.
         """
-        result = await self.session.execute(
-            select(func.coalesce(func.max(Invoice.inv_id), 0) + 1)
-        )
+        result = await self.session.execute(select(invoice_inv_id_seq.next_value()))
         return int(result.scalar_one())
 
     async def expire_old_pending(self, before: datetime) -> int:
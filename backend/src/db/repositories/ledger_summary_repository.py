@@ -0,0 +1,107 @@
+"""Ledger summary repository for database operations."""
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.ledger_summary import DAILY_SPEND_RETENTION_DAYS, UserLedgerSummary
+
+# Recompute every summary row from the ledger in one statement.
+# Same query as BACKFILL in migration 010_user_ledger_summary (frozen there,
+# with the retention inlined): change both together.
+_REBUILD_SQL = text(
+    """
+    INSERT INTO user_ledger_summary (
+        user_id, total_topup, total_spent, total_refund, total_adjustment,
+        total_subscription, transaction_count, daily_spend, updated_at
+    )
+    SELECT
+        t.user_id,
+        COALESCE(SUM(t.tokens_delta) FILTER (WHERE t.type = 'topup'), 0),
+        COALESCE(SUM(t.tokens_delta) FILTER (WHERE t.type = 'spend'), 0),
+        COALESCE(SUM(t.tokens_delta) FILTER (WHERE t.type = 'refund'), 0),
+        COALESCE(SUM(t.tokens_delta) FILTER (WHERE t.type = 'adjustment'), 0),
+        COALESCE(SUM(t.tokens_delta) FILTER (WHERE t.type = 'subscription'), 0),
+        COUNT(*),
+        COALESCE(d.buckets, '{}'::jsonb),
+        now() AT TIME ZONE 'utc'
+    FROM transactions t
+    LEFT JOIN (
+        SELECT user_id, jsonb_object_agg(day_key, spent) AS buckets
+        FROM (
+            SELECT user_id, to_char(created_at, 'YYYY-MM-DD') AS day_key,
+                   SUM(tokens_delta) AS spent
+            FROM transactions
+            WHERE type = 'spend'
+              AND created_at >= date_trunc('day', now() AT TIME ZONE 'utc')
+                  - make_interval(days => :retention_days - 1)
+            GROUP BY 1, 2
+        ) AS daily
+        GROUP BY user_id
+    ) AS d ON d.user_id = t.user_id
+    GROUP BY t.user_id, d.buckets
+    """
+)
+
+# Add totals of archived transactions partitions on top of the rebuilt rows
+_ADD_ARCHIVED_SQL = text(
+    """
+    INSERT INTO user_ledger_summary AS s (
+        user_id, total_topup, total_spent, total_refund, total_adjustment,
+        total_subscription, transaction_count, daily_spend, updated_at
+    )
+    SELECT
+        user_id, total_topup, total_spent, total_refund, total_adjustment,
+        total_subscription, transaction_count, '{}'::jsonb,
+        now() AT TIME ZONE 'utc'
+    FROM archived_ledger_totals
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_topup = s.total_topup + EXCLUDED.total_topup,
+        total_spent = s.total_spent + EXCLUDED.total_spent,
+        total_refund = s.total_refund + EXCLUDED.total_refund,
+        total_adjustment = s.total_adjustment + EXCLUDED.total_adjustment,
+        total_subscription = s.total_subscription + EXCLUDED.total_subscription,
+        transaction_count = s.transaction_count + EXCLUDED.transaction_count
+    """
+)
+
+
+class LedgerSummaryRepository:
+    """Repository for UserLedgerSummary model operations.
+
+    Rows are written by the transactions insert trigger; this repository
+    only reads them and rebuilds them in bulk.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get_by_user(self, user_id: int) -> UserLedgerSummary | None:
+        """Get summary for user."""
+        result = await self.session.execute(
+            select(UserLedgerSummary).where(UserLedgerSummary.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def rebuild(self) -> int:
+        """Recompute all summaries from the ledger and archived totals.
+
+        Blocks ledger inserts (reads still pass) until the caller's
+        transaction ends, so no concurrent insert is lost or double counted.
+        Partition archiving takes a stronger lock on transactions, so
+        archived_ledger_totals cannot change meanwhile either.
+
+        Returns:
+            Number of summary rows written
+        """
+        await self.session.execute(
+            text("LOCK TABLE transactions IN SHARE ROW EXCLUSIVE MODE")
+        )
+        await self.session.execute(delete(UserLedgerSummary))
+        await self.session.execute(
+            _REBUILD_SQL, {"retention_days": DAILY_SPEND_RETENTION_DAYS}
+        )
+        await self.session.execute(_ADD_ARCHIVED_SQL)
+        result = await self.session.execute(
+            select(func.count()).select_from(UserLedgerSummary)
+        )
+        return int(result.scalar_one())
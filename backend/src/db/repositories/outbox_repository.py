@@ -0,0 +1,143 @@
+"""Notification outbox repository for database operations."""
+
+from datetime import datetime, timedelta
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.notification_outbox import NotificationOutbox, OutboxStatus
+
+# Key in Session.info marking that the transaction enqueued notifications
+# (OutboxDispatcher wakes up when such a transaction commits)
+ENQUEUED_KEY = "notification_outbox_enqueued"
+
+
+class OutboxRepository:
+    """Repository for NotificationOutbox model operations.
+
+    enqueue() is called inside the business transaction; the dispatcher
+    claims, delivers and marks rows in its own short transactions.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def enqueue(
+        self,
+        chat_id: int,
+        text: str,
+        dedupe_key: str | None = None,
+    ) -> int | None:
+        """Add notification to the outbox.
+
+        Args:
+            chat_id: Telegram chat ID
+            text: Message text
+            dedupe_key: Idempotency key; repeated keys are ignored
+
+        Returns:
+            Outbox entry ID, or None if dedupe_key was already enqueued
+        """
+        stmt = (
+            insert(NotificationOutbox)
+            .values(
+                chat_id=chat_id,
+                text=text,
+                dedupe_key=dedupe_key,
+                status=OutboxStatus.PENDING,
+                attempts=0,
+                next_attempt_at=datetime.utcnow(),
+                created_at=datetime.utcnow(),
+            )
+            .on_conflict_do_nothing(index_elements=["dedupe_key"])
+            .returning(NotificationOutbox.id)
+        )
+        result = await self.session.execute(stmt)
+        self.session.sync_session.info[ENQUEUED_KEY] = True
+        return result.scalar_one_or_none()
+
+    async def claim_batch(self, limit: int, lease_seconds: float) -> list[NotificationOutbox]:
+        """Claim due pending entries for delivery.
+
+        Claimed rows get attempts + 1 and next_attempt_at pushed by the
+        lease, so other dispatchers skip them; if the claimer dies, rows
+        become due again after the lease. Locked rows are skipped.
+
+        Args:
+            limit: Max entries to claim
+            lease_seconds: How long the claim is exclusive
+
+        Returns:
+            Claimed entries, oldest first
+        """
+        now = datetime.utcnow()
+        due = (
+            select(NotificationOutbox.id)
+            .where(
+                NotificationOutbox.status == OutboxStatus.PENDING,
+                NotificationOutbox.next_attempt_at <= now,
+            )
+            .order_by(NotificationOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(due))
+            .values(
+                attempts=NotificationOutbox.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=lease_seconds),
+            )
+            .returning(NotificationOutbox)
+            .execution_options(synchronize_session=False)
+        )
+        return sorted(result.scalars().all(), key=lambda entry: entry.id)
+
+    async def mark_sent(self, entry_id: int) -> None:
+        """Mark entry as delivered."""
+        await self.session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id == entry_id)
+            .values(status=OutboxStatus.SENT, sent_at=datetime.utcnow(), last_error=None)
+        )
+
+    async def mark_retry(self, entry_id: int, delay_seconds: float, error: str) -> None:
+        """Schedule another delivery attempt after delay_seconds."""
+        await self.session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id == entry_id)
+            .values(
+                next_attempt_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+                last_error=error,
+            )
+        )
+
+    async def mark_failed(self, entry_id: int, error: str) -> None:
+        """Give up on entry (user blocked the bot, bad request, attempts exhausted)."""
+        await self.session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id == entry_id)
+            .values(status=OutboxStatus.FAILED, last_error=error)
+        )
+
+    async def purge_finished(self, older_than: timedelta) -> int:
+        """Delete sent and failed entries older than older_than.
+
+        Pending entries are kept whatever their age.
+
+        Returns:
+            Number of deleted entries
+        """
+        result = cast(
+            CursorResult[Any],
+            await self.session.execute(
+                delete(NotificationOutbox).where(
+                    NotificationOutbox.status.in_((OutboxStatus.SENT, OutboxStatus.FAILED)),
+                    NotificationOutbox.created_at < datetime.utcnow() - older_than,
+                )
+            ),
+        )
+        return result.rowcount or 0
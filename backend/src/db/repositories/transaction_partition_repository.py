@@ -0,0 +1,173 @@
+"""Repository for monthly partitions of the transactions table."""
+
+import re
+from datetime import date, datetime
+from typing import BinaryIO
+
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_PARTITION_NAME = re.compile(r"^transactions_p(\d{4})(\d{2})$")
+
+# Add a partition's per-user totals to archived_ledger_totals
+_FOLD_ARCHIVED_TOTALS_SQL = """
+    INSERT INTO archived_ledger_totals AS a (
+        user_id, total_topup, total_spent, total_refund, total_adjustment,
+        total_subscription, transaction_count, updated_at
+    )
+    SELECT
+        user_id,
+        COALESCE(SUM(tokens_delta) FILTER (WHERE type = 'topup'), 0),
+        COALESCE(SUM(tokens_delta) FILTER (WHERE type = 'spend'), 0),
+        COALESCE(SUM(tokens_delta) FILTER (WHERE type = 'refund'), 0),
+        COALESCE(SUM(tokens_delta) FILTER (WHERE type = 'adjustment'), 0),
+        COALESCE(SUM(tokens_delta) FILTER (WHERE type = 'subscription'), 0),
+        COUNT(*),
+        now() AT TIME ZONE 'utc'
+    FROM "{name}"
+    GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_topup = a.total_topup + EXCLUDED.total_topup,
+        total_spent = a.total_spent + EXCLUDED.total_spent,
+        total_refund = a.total_refund + EXCLUDED.total_refund,
+        total_adjustment = a.total_adjustment + EXCLUDED.total_adjustment,
+        total_subscription = a.total_subscription + EXCLUDED.total_subscription,
+        transaction_count = a.transaction_count + EXCLUDED.transaction_count,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def add_months(month: date, months: int) -> date:
+    """Shift first day of month by a number of months."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the partition holding the given month."""
+    return f"transactions_p{month:%Y%m}"
+
+
+class TransactionPartition(BaseModel):
+    """Monthly partition of the transactions table."""
+
+    name: str
+    range_start: date  # Inclusive
+    range_end: date  # Exclusive
+
+
+class TransactionPartitionRepository:
+    """Creates, lists, exports and drops monthly transactions partitions.
+
+    Partitions are named transactions_pYYYYMM and cover one calendar month
+    of created_at (UTC). DDL here takes locks on the parent table, so run it
+    from maintenance jobs rather than request handlers.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def list_partitions(self) -> list[TransactionPartition]:
+        """List attached monthly partitions, oldest first.
+
+        The DEFAULT partition is not included.
+        """
+        result = await self.session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'transactions'::regclass"
+            )
+        )
+
+        partitions = []
+        for (name,) in result.all():
+            match = _PARTITION_NAME.match(name)
+            if match is None:
+                continue
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            partitions.append(
+                TransactionPartition(
+                    name=name,
+                    range_start=month,
+                    range_end=add_months(month, 1),
+                )
+            )
+
+        return sorted(partitions, key=lambda p: p.range_start)
+
+    async def create_partition(self, month: date) -> TransactionPartition:
+        """Create partition for month if it does not exist."""
+        month = month.replace(day=1)
+        partition = TransactionPartition(
+            name=partition_name(month),
+            range_start=month,
+            range_end=add_months(month, 1),
+        )
+        await self.session.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS "{partition.name}" '
+                f"PARTITION OF transactions FOR VALUES "
+                f"FROM ('{partition.range_start.isoformat()}') "
+                f"TO ('{partition.range_end.isoformat()}')"
+            )
+        )
+        return partition
+
+    async def ensure_partitions(self, months_ahead: int) -> list[str]:
+        """Make sure partitions exist from this month to months_ahead ahead.
+
+        Returns:
+            Names of created partitions
+        """
+        existing = {p.name for p in await self.list_partitions()}
+        current = datetime.utcnow().date().replace(day=1)
+
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if partition_name(month) in existing:
+                continue
+            partition = await self.create_partition(month)
+            created.append(partition.name)
+
+        return created
+
+    async def count_rows(self, name: str) -> int:
+        """Count rows in a partition."""
+        result = await self.session.execute(text(f'SELECT count(*) FROM "{name}"'))
+        return int(result.scalar_one())
+
+    async def export_csv(self, name: str, output: BinaryIO) -> int:
+        """Stream partition rows as CSV with header into output.
+
+        Returns:
+            Number of exported rows
+        """
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        driver = raw.driver_connection
+        if driver is None:
+            raise RuntimeError("Raw connection has no driver connection")
+        status = await driver.copy_from_table(
+            name,
+            output=output,
+            format="csv",
+            header=True,
+        )
+        # asyncpg returns the command tag, e.g. "COPY 123"
+        return int(status.split()[-1])
+
+    async def detach_and_drop(self, name: str) -> None:
+        """Detach partition from transactions and drop it.
+
+        The partition's per-user totals are first added to
+        archived_ledger_totals, so a ledger summary rebuild still counts them.
+        """
+        await self.session.execute(text(_FOLD_ARCHIVED_TOTALS_SQL.format(name=name)))
+        await self.session.execute(
+            text(f'ALTER TABLE transactions DETACH PARTITION "{name}"')
+        )
+        await self.session.execute(text(f'DROP TABLE "{name}"'))
+
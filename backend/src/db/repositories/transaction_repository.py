@@ -1,13 +1,16 @@
 """Transaction repository for database operations."""
 
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from uuid import UUID
 
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
+from src.db.models.ledger_summary import DAILY_SPEND_RETENTION_DAYS, UserLedgerSummary
 from src.db.models.transaction import Transaction, TransactionType
+from src.db.repositories.ledger_summary_repository import LedgerSummaryRepository
 
 
 class TransactionStats(BaseModel):
@@ -71,6 +74,67 @@ class TransactionRepository:
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
+    async def get_page_by_user(
+        self,
+        user_id: int,
+        limit: int = 20,
+        cursor: tuple[datetime, UUID] | None = None,
+        backward: bool = False,
+        type_filter: TransactionType | None = None,
+    ) -> tuple[list[Transaction], bool]:
+        """Get a page of user's transactions using keyset pagination.
+
+        Served by idx_transactions_user_created_at_id, so the cost does not
+        grow with the page depth.
+
+        Args:
+            user_id: User's Telegram ID
+            limit: Page size
+            cursor: (created_at, id) of the edge row of the adjacent page;
+                None for the first (newest) page
+            backward: Fetch rows newer than cursor instead of older
+            type_filter: Filter by transaction type
+
+        Returns:
+            Tuple of (transactions ordered by created_at desc, id desc;
+            whether more rows exist beyond the page in the fetch direction)
+        """
+        key = tuple_(Transaction.created_at, Transaction.id)
+        query = (
+            select(Transaction)
+            .where(Transaction.user_id == user_id)
+            .options(raiseload(Transaction.user), raiseload(Transaction.invoice))
+        )
+
+        if type_filter is not None:
+            query = query.where(Transaction.type == type_filter)
+
+        # The plain created_at bound duplicates the row comparison so the
+        # planner can prune monthly partitions outside the page
+        if backward:
+            if cursor is not None:
+                query = query.where(
+                    Transaction.created_at >= cursor[0], key > tuple_(*cursor)
+                )
+            query = query.order_by(Transaction.created_at.asc(), Transaction.id.asc())
+        else:
+            if cursor is not None:
+                query = query.where(
+                    Transaction.created_at <= cursor[0], key < tuple_(*cursor)
+                )
+            query = query.order_by(Transaction.created_at.desc(), Transaction.id.desc())
+
+        # One extra row tells whether there is another page
+        result = await self.session.execute(query.limit(limit + 1))
+        transactions = list(result.scalars().all())
+
+        has_more = len(transactions) > limit
+        transactions = transactions[:limit]
+        if backward:
+            transactions.reverse()
+
+        return transactions, has_more
+
     async def get_by_invoice(self, invoice_id: UUID) -> list[Transaction]:
         """Get transactions for specific invoice."""
         result = await self.session.execute(
@@ -107,49 +171,33 @@ class TransactionRepository:
     async def get_user_stats(self, user_id: int) -> TransactionStats:
         """Get aggregated stats: total_topup, total_spent, etc.
 
-        Uses SQL aggregation for efficiency.
+        Reads the user_ledger_summary row maintained on every ledger insert.
         """
-        # Get totals by type
-        result = await self.session.execute(
-            select(
-                Transaction.type,
-                func.sum(Transaction.tokens_delta).label("total"),
-                func.count().label("count"),
+        summary = await LedgerSummaryRepository(self.session).get_by_user(user_id)
+
+        if summary is None:
+            return TransactionStats(
+                total_topup=0,
+                total_spent=0,
+                total_refund=0,
+                transaction_count=0,
             )
-            .where(Transaction.user_id == user_id)
-            .group_by(Transaction.type)
-        )
-
-        rows = result.all()
-
-        # Initialize stats
-        total_topup = 0
-        total_spent = 0
-        total_refund = 0
-        transaction_count = 0
-
-        for row in rows:
-            tx_type, total, count = row
-            transaction_count += count
-
-            if tx_type == TransactionType.TOPUP:
-                total_topup = abs(int(total or 0))
-            elif tx_type == TransactionType.SPEND:
-                total_spent = abs(int(total or 0))
-            elif tx_type == TransactionType.REFUND:
-                total_refund = abs(int(total or 0))
-            # ADJUSTMENT is not included in stats
 
+        # ADJUSTMENT and SUBSCRIPTION are not included in stats
         return TransactionStats(
-            total_topup=total_topup,
-            total_spent=total_spent,
-            total_refund=total_refund,
-            transaction_count=transaction_count,
+            total_topup=abs(int(summary.total_topup)),
+            total_spent=abs(int(summary.total_spent)),
+            total_refund=abs(int(summary.total_refund)),
+            transaction_count=summary.transaction_count,
         )
 
     async def get_recent_spending(self, user_id: int, days: int = 7) -> int:
         """Get total spending for recent days.
 
+        The window is day-granular: it starts at UTC midnight `days` days
+        ago, on both the daily spend buckets of user_ledger_summary and the
+        ledger fallback used for windows longer than the bucket retention.
+
         Args:
             user_id: User's Telegram ID
             days: Number of days to look back
@@ -157,14 +205,25 @@ class TransactionRepository:
         Returns:
             Total tokens spent (absolute value)
         """
-        cutoff = datetime.utcnow() - timedelta(days=days)
+        cutoff = (datetime.utcnow() - timedelta(days=days)).date()
+
+        if days >= DAILY_SPEND_RETENTION_DAYS:
+            result = await self.session.execute(
+                select(func.sum(Transaction.tokens_delta))
+                .where(Transaction.user_id == user_id)
+                .where(Transaction.type == TransactionType.SPEND)
+                .where(Transaction.created_at >= datetime.combine(cutoff, time.min))
+            )
+            total = result.scalar_one_or_none()
+            return abs(int(total or 0))
 
-        result = await self.session.execute(
-            select(func.sum(Transaction.tokens_delta))
-            .where(Transaction.user_id == user_id)
-            .where(Transaction.type == TransactionType.SPEND)
-            .where(Transaction.created_at >= cutoff)
+        summary = await self.session.execute(
+            select(UserLedgerSummary.daily_spend).where(
+                UserLedgerSummary.user_id == user_id
+            )
         )
+        buckets: dict[str, float] = summary.scalar_one_or_none() or {}
 
-        total = result.scalar_one_or_none()
-        return abs(int(total or 0))
+        cutoff_key = cutoff.isoformat()
+        total = sum(spent for day, spent in buckets.items() if day >= cutoff_key)
+        return abs(int(total))
@@ -1,11 +1,70 @@
+import uuid
 from datetime import datetime, timedelta
+from typing import Any
+from typing import cast as type_cast
 
-from sqlalchemy import and_, select, update
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import CursorResult, and_, cast, literal, or_, select, true, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.exceptions import NotFoundError, OptimisticLockError
+from src.db.models.transaction import Transaction, TransactionType
 from src.db.models.user import User
+from src.db.user_cache import mark_user_dirty, user_cache
+
+
+class UserSnapshot(BaseModel):
+    """Slim read-only projection of a user row.
+
+    Used on the per-update path (AuthMiddleware) instead of the ORM entity,
+    so the cost of loading a user does not depend on their ledger size.
+    """
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    username: str | None
+    first_name: str | None
+    last_name: str | None
+    token_balance: float
+    balance_version: int
+    subscription_end: datetime | None
+    is_blocked: bool
+    auto_renew: bool
+
+
+# Columns selected for UserSnapshot (order matches the model fields)
+SNAPSHOT_COLUMNS = (
+    User.id,
+    User.username,
+    User.first_name,
+    User.last_name,
+    User.token_balance,
+    User.balance_version,
+    User.subscription_end,
+    User.is_blocked,
+    User.auto_renew,
+)
+
+
+class SpendRecord(BaseModel):
+    """Outcome of UserRepository.spend_with_ledger.
+
+    is_blocked and subscription_end are the values before the statement;
+    balance_after, balance_version and transaction_id are None when the
+    debit was refused.
+    """
+
+    is_blocked: bool
+    subscription_end: datetime | None
+    balance_after: float | None
+    balance_version: int | None
+    transaction_id: uuid.UUID | None
+
+    @property
+    def debited(self) -> bool:
+        return self.transaction_id is not None
 
 
 class UserRepository:
@@ -19,7 +78,95 @@ class UserRepository:
         result = await self.session.execute(
             select(User).where(User.id == user_id)
         )
-        return result.scalar_one_or_none()
+        user = result.scalar_one_or_none()
+        if user is not None:
+            user_cache.observe(user.id, user.balance_version)
+        return user
+
+    async def get_snapshot(self, user_id: int) -> UserSnapshot | None:
+        """Get slim user projection by Telegram ID (no relationships)."""
+        result = await self.session.execute(
+            select(*SNAPSHOT_COLUMNS).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        return UserSnapshot.model_validate(row) if row else None
+
+    async def get_or_create_snapshot(
+        self,
+        user_id: int,
+        username: str | None = None,
+        first_name: str | None = None,
+        last_name: str | None = None,
+    ) -> tuple[UserSnapshot, bool]:
+        """Get or create user, returning a slim projection.
+
+        Same upsert semantics as get_or_create, but only the snapshot
+        columns are read back, so no ORM entity or relationship is loaded.
+
+        Returns:
+            Tuple of (snapshot, created) where created is True for a new user.
+        """
+        stmt = (
+            insert(User)
+            .values(
+                id=user_id,
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+            )
+            .on_conflict_do_nothing(index_elements=["id"])
+            .returning(*SNAPSHOT_COLUMNS)
+        )
+
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+
+        if row is not None:
+            return UserSnapshot.model_validate(row), True
+
+        existing = await self.get_snapshot(user_id)
+        if existing is None:
+            # Should not happen in normal flow
+            raise NotFoundError(
+                message=f"User {user_id} not found after upsert",
+                details={"user_id": user_id},
+            )
+        return existing, False
+
+    async def update_profile(
+        self,
+        user_id: int,
+        username: str | None,
+        first_name: str | None,
+        last_name: str | None,
+    ) -> bool:
+        """Update Telegram profile fields if any of them changed.
+
+        Returns:
+            True if the row was updated
+        """
+        stmt = (
+            update(User)
+            .where(User.id == user_id)
+            .where(
+                or_(
+                    User.username.is_distinct_from(username),
+                    User.first_name.is_distinct_from(first_name),
+                    User.last_name.is_distinct_from(last_name),
+                )
+            )
+            .values(
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+                updated_at=datetime.utcnow(),
+            )
+        )
+        result = type_cast(CursorResult[Any], await self.session.execute(stmt))
+        if result.rowcount > 0:
+            mark_user_dirty(self.session, user_id)
+            return True
+        return False
 
     async def get_or_create(
         self,
@@ -118,8 +265,105 @@ class UserRepository:
                 },
             )
 
+        mark_user_dirty(self.session, user_id)
+
         return user
 
+    async def spend_with_ledger(
+        self,
+        user_id: int,
+        amount: float,
+        description: str,
+        metadata: dict[str, Any] | None = None,
+    ) -> SpendRecord | None:
+        """Debit balance and write the SPEND ledger row in one statement.
+
+        A data-modifying CTE updates the user only if not blocked and the
+        subscription is active, inserts the transaction from the UPDATE's
+        RETURNING, and reads back the pre-statement flags for diagnostics.
+        The UPDATE takes the row lock, so no optimistic retry is needed.
+
+        Args:
+            user_id: User's Telegram ID
+            amount: Amount to debit (positive)
+            description: Transaction description
+            metadata: Transaction metadata
+
+        Returns:
+            SpendRecord, or None if user not found
+        """
+        now = datetime.utcnow()
+
+        def bind(value: Any, column: Any) -> Any:
+            # Explicit casts: untyped params in INSERT ... SELECT resolve to text
+            return cast(literal(value, column.type), column.type)
+
+        debited = (
+            update(User)
+            .where(User.id == user_id)
+            .where(User.is_blocked == False)  # noqa: E712
+            .where(User.subscription_end > now)
+            .values(
+                token_balance=User.token_balance - amount,
+                balance_version=User.balance_version + 1,
+                updated_at=now,
+            )
+            .returning(User.id, User.token_balance, User.balance_version)
+            .cte("debited")
+        )
+
+        ledger = (
+            insert(Transaction)
+            .from_select(
+                [
+                    Transaction.id,
+                    Transaction.user_id,
+                    Transaction.type,
+                    Transaction.tokens_delta,
+                    Transaction.balance_after,
+                    Transaction.description,
+                    Transaction.metadata_,
+                    Transaction.created_at,
+                ],
+                select(
+                    bind(uuid.uuid4(), Transaction.id),
+                    debited.c.id,
+                    bind(TransactionType.SPEND, Transaction.type),
+                    bind(-amount, Transaction.tokens_delta),
+                    debited.c.token_balance,
+                    bind(description, Transaction.description),
+                    bind(metadata or {}, Transaction.metadata_),
+                    bind(now, Transaction.created_at),
+                ),
+            )
+            .returning(Transaction.id)
+            .cte("ledger")
+        )
+
+        stmt = (
+            select(
+                User.is_blocked,
+                User.subscription_end,
+                debited.c.token_balance.label("balance_after"),
+                debited.c.balance_version,
+                ledger.c.id.label("transaction_id"),
+            )
+            .select_from(User)
+            .outerjoin(debited, debited.c.id == User.id)
+            .outerjoin(ledger, true())
+            .where(User.id == user_id)
+        )
+
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
+            return None
+
+        record = SpendRecord.model_validate(row, from_attributes=True)
+        if record.debited:
+            mark_user_dirty(self.session, user_id)
+        return record
+
     async def update_subscription(
         self,
         user_id: int,
@@ -156,6 +400,8 @@ class UserRepository:
                 details={"user_id": user_id},
             )
 
+        mark_user_dirty(self.session, user_id)
+
         return user
 
     async def update(self, user: User) -> User:
@@ -170,6 +416,7 @@ class UserRepository:
         user.updated_at = datetime.utcnow()
         await self.session.flush()
         await self.session.refresh(user)
+        mark_user_dirty(self.session, user.id)
         return user
 
     async def update_last_balance_notification(
@@ -309,6 +556,8 @@ class UserRepository:
                 details={"user_id": user_id},
             )
 
+        mark_user_dirty(self.session, user_id)
+
         return user
 
     async def update_subscription_notification(
@@ -358,4 +607,7 @@ class UserRepository:
         result = await self.session.execute(
             select(User).where(User.id == user_id).with_for_update()
         )
-        return result.scalar_one_or_none()
+        user = result.scalar_one_or_none()
+        if user is not None:
+            user_cache.observe(user.id, user.balance_version)
+        return user
@@ -0,0 +1,139 @@
+"""In-process LRU + TTL cache of user snapshots.
+
+Sits in front of the per-update user lookup in AuthMiddleware. Entries are
+dropped when a repository writes to the user row (immediately and again after
+the owning session commits or rolls back), when a read observes a different
+balance_version, or when the TTL expires.
+"""
+
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.db.replica import note_user_write
+
+if TYPE_CHECKING:
+    from src.db.repositories.user_repository import UserSnapshot
+
+# Key in Session.info holding user IDs written in the current transaction
+_DIRTY_KEY = "user_cache_dirty"
+
+
+class UserSnapshotCache:
+    """Bounded LRU cache with per-entry TTL.
+
+    Puts are guarded by a read token: a snapshot read before the user was
+    invalidated is rejected, so a slow reader cannot re-insert stale data
+    after a concurrent write has committed.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[int, tuple[float, UserSnapshot]] = OrderedDict()
+        self._generation = 0
+        self._invalidated: dict[int, int] = {}
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: int) -> "UserSnapshot | None":
+        """Get cached snapshot if present and not expired."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, snapshot = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return snapshot
+
+    def read_token(self) -> int:
+        """Token to take before reading a user from the database."""
+        return self._generation
+
+    def put(self, snapshot: "UserSnapshot", token: int) -> bool:
+        """Store snapshot unless the user was invalidated after `token`.
+
+        Returns:
+            True if the snapshot was stored
+        """
+        if not self.enabled:
+            return False
+        if token < self._floor or self._invalidated.get(snapshot.id, 0) > token:
+            return False
+
+        self._entries[snapshot.id] = (time.monotonic() + self.ttl_seconds, snapshot)
+        self._entries.move_to_end(snapshot.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop cached snapshot and reject in-flight reads for this user."""
+        self._entries.pop(user_id, None)
+        self._generation += 1
+        self._invalidated[user_id] = self._generation
+
+        # Bound tombstones: forget them all and reject every read
+        # that started before this point instead
+        if len(self._invalidated) > max(self.max_size, 1):
+            self._invalidated.clear()
+            self._floor = self._generation
+
+    def observe(self, user_id: int, balance_version: int) -> None:
+        """Invalidate if a fresh read shows balance_version has moved."""
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[1].balance_version != balance_version:
+            self.invalidate(user_id)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._invalidated.clear()
+        self._floor = self._generation
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+user_cache = UserSnapshotCache(
+    max_size=settings.user_cache_max_size,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+)
+
+
+def mark_user_dirty(session: AsyncSession, user_id: int) -> None:
+    """Invalidate user now and again when the session's transaction ends.
+
+    Call from repository methods that modify cached user fields. Also keeps
+    the user's reads off the replica until the write has replicated.
+    """
+    user_cache.invalidate(user_id)
+    note_user_write(user_id)
+    session.sync_session.info.setdefault(_DIRTY_KEY, set()).add(user_id)
+
+
+def _invalidate_dirty(session: Session) -> None:
+    for user_id in session.info.pop(_DIRTY_KEY, ()):
+        user_cache.invalidate(user_id)
+        note_user_write(user_id)
+
+
+event.listen(Session, "after_commit", _invalidate_dirty)
+event.listen(Session, "after_rollback", _invalidate_dirty)
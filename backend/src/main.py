@@ -10,6 +10,9 @@ from src.bot.handlers import apply, balance, buy, constructor, cv, healthcheck,
 from src.bot.middlewares import AuthMiddleware, CommandResetMiddleware, DbSessionMiddleware
 from src.core.config import settings
 from src.core.logging import get_logger, setup_logging
+from src.services.outbox_dispatcher import get_outbox_dispatcher
+from src.services.runner import get_runner_client
+from src.tasks.partition_tasks import run_ensure_partitions_task
 
 # Setup logging
 setup_logging()
@@ -54,11 +57,19 @@ async def on_startup(bot: Bot) -> None:
         await set_bot_description(bot)
     except Exception as e:
         logger.warning(f"Failed to set bot config: {e}")
+    try:
+        await run_ensure_partitions_task()
+    except Exception as e:
+        logger.warning(f"Failed to ensure transactions partitions: {e}")
+    await get_runner_client().start()
+    await get_outbox_dispatcher(bot).start()
     logger.info("Bot started")
 
 
 async def on_shutdown(bot: Bot) -> None:
     """Shutdown hook."""
+    await get_outbox_dispatcher(bot).stop()
+    await get_runner_client().close()
     logger.info("Bot stopped")
 
 
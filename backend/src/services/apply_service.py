@@ -1,18 +1,25 @@
 """Apply service with billing integration."""
 
 import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, aclosing
 from dataclasses import dataclass
+from typing import Any
 
 from aiogram import Bot
-from aiogram.exceptions import TelegramNetworkError
+from aiogram.exceptions import TelegramAPIError, TelegramNetworkError
 from aiogram.types import BufferedInputFile
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.exceptions import (
     InsufficientBalanceError,
     SubscriptionExpiredError,
 )
 from src.core.logging import get_logger
+from src.db.session import get_session
 from src.services.runner import ApplyAnalyzer, BotOutputType, StreamMessage
+from src.services.stream_pipeline import pipelined
+from src.services.stream_renderer import StreamingTextRenderer
 from src.services.token_service import TokenService
 
 logger = get_logger(__name__)
@@ -20,9 +27,6 @@ logger = get_logger(__name__)
 # Стоимость создания отклика в токенах (fallback если Runner не отправил track_cost)
 APPLY_FALLBACK_COST = 1
 
-# Лимит длины сообщения Telegram
-MAX_MESSAGE_LENGTH = 4096
-
 # Retry настройки
 MAX_RETRIES = 3
 RETRY_DELAY = 1.0  # секунд
@@ -36,6 +40,7 @@ class ApplyResult:
     error: str | None = None
     tokens_spent: float = 0.0
     task_id: str | None = None
+    cached: bool = False  # результат повторён из кэша, без списания
 
 
 class ApplyService:
@@ -47,18 +52,22 @@ class ApplyService:
     - Координация ApplyAnalyzer
     - Обработка bot_output событий
     - Списание токенов после успешного создания отклика
+
+    Соединение с БД не удерживается во время стрима Runner: проверка
+    доступа и списание идут через короткие сессии session_factory.
     """
 
     def __init__(
         self,
-        token_service: TokenService,
         apply_analyzer: ApplyAnalyzer,
         bot: Bot,
+        session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]] = get_session,
     ):
-        self.token_service = token_service
+        self.session_factory = session_factory
         self.apply_analyzer = apply_analyzer
         self.bot = bot
         self._track_cost: float | None = None  # Стоимость текущего трека
+        self._queue_message_id: int | None = None  # Сообщение с позицией в очереди
 
     async def check_access(self, user_id: int) -> tuple[bool, str | None]:
         """Проверить доступ пользователя к созданию отклика.
@@ -67,7 +76,8 @@ class ApplyService:
             (can_access, error_message)
         """
         # Проверяем только подписку и блокировку, не баланс
-        balance = await self.token_service.check_balance(user_id)
+        async with self.session_factory() as session:
+            balance = await TokenService(session).check_balance(user_id)
         return balance.can_spend, balance.reason
 
     async def check_cv_exists(self, user_id: int) -> bool:
@@ -83,6 +93,7 @@ class ApplyService:
         vacancy_url: str,
         user_id: int,
         chat_id: int,
+        use_cache: bool = True,
     ) -> ApplyResult:
         """Запустить создание отклика на вакансию с биллингом.
 
@@ -96,6 +107,7 @@ class ApplyService:
             vacancy_url: URL вакансии на hh.ru
             user_id: Telegram user ID
             chat_id: Telegram chat ID для отправки сообщений
+            use_cache: False — не брать результат из кэша ("Сгенерировать заново")
 
         Returns:
             ApplyResult с результатом операции
@@ -109,22 +121,35 @@ class ApplyService:
         success = False
         task_id: str | None = None
 
+        renderer = StreamingTextRenderer(self.bot, chat_id, call=self._send_with_retry)
         try:
-            async for message in self.apply_analyzer.apply(vacancy_url, user_id):
-                result = await self._handle_stream_message(message, chat_id)
-
-                if result == "error":
-                    return ApplyResult(success=False, error=message.content)
-                elif result == "cancelled":
-                    return ApplyResult(success=False, error="Отменено")
-                elif result == "complete":
-                    success = True
-                    task_id = message.task_id
-                    break
+            async with aclosing(pipelined(self.apply_analyzer.apply(vacancy_url, user_id, use_cache=use_cache))) as messages:
+                async for message in messages:
+                    if message.type in ("error", "cancelled", "done", "complete"):
+                        # Дописать накопленный текст до сообщений об итоге трека
+                        await renderer.finish()
+                    result = await self._handle_stream_message(message, chat_id, renderer)
+
+                    if result == "error":
+                        return ApplyResult(success=False, error=message.content)
+                    elif result == "cancelled":
+                        return ApplyResult(success=False, error="Отменено")
+                    elif result == "complete":
+                        success = True
+                        task_id = message.task_id
+                        if message.metadata and message.metadata.get("cached"):
+                            # Повтор сохранённого результата: трек не запускался, не списываем
+                            return ApplyResult(success=True, cached=True)
+                        break
+
+            # Стрим закончился без complete
+            await renderer.finish()
 
         except Exception as e:
             logger.exception(f"Apply failed: {e}")
             return ApplyResult(success=False, error=str(e))
+        finally:
+            renderer.close()
 
         # 3. Списание токенов при успехе
         if success:
@@ -154,18 +179,20 @@ class ApplyService:
             )
 
             try:
-                await self.token_service.spend_tokens(
-                    user_id=user_id,
-                    amount=final_cost,
-                    description="Отклик на вакансию",
-                    metadata={
-                        "task_id": task_id,
-                        "vacancy_url": vacancy_url,
-                        "cost_raw": self._track_cost,
-                        "cost_multiplier": settings.cost_multiplier,
-                        "cost_final": final_cost,
-                    },
-                )
+                # Короткая сессия только на списание
+                async with self.session_factory() as session:
+                    await TokenService(session).spend_tokens(
+                        user_id=user_id,
+                        amount=final_cost,
+                        description="Отклик на вакансию",
+                        metadata={
+                            "task_id": task_id,
+                            "vacancy_url": vacancy_url,
+                            "cost_raw": self._track_cost,
+                            "cost_multiplier": settings.cost_multiplier,
+                            "cost_final": final_cost,
+                        },
+                    )
 
                 # Сбросить стоимость для следующего запуска
                 self._track_cost = None
@@ -188,6 +215,7 @@ class ApplyService:
         self,
         message: StreamMessage,
         chat_id: int,
+        renderer: StreamingTextRenderer,
     ) -> str:
         """Обработать сообщение из стрима.
 
@@ -220,6 +248,10 @@ class ApplyService:
         if message.type in ("done", "complete"):
             return "complete"
 
+        if message.type == "queue":
+            await self._show_queue_position(chat_id, message.content)
+            return "continue"
+
         if message.type == "progress":
             # Пропускаем технические прогресс-сообщения
             return "continue"
@@ -233,20 +265,32 @@ class ApplyService:
                     logger.info(f"Track cost received (via bot_output): {self._track_cost} {currency}")
                 return "continue"
 
-            await self._handle_bot_output(message, chat_id)
+            await self._handle_bot_output(message, chat_id, renderer)
             return "continue"
 
         if message.type == "result" and message.content:
             # Legacy: текстовый результат
-            await self._send_text_safe(chat_id, message.content)
+            await renderer.append(message.content)
             return "continue"
 
         return "continue"
 
+    async def _show_queue_position(self, chat_id: int, text: str) -> None:
+        """Показать позицию в очереди admission, обновляя одно сообщение."""
+        try:
+            if self._queue_message_id is None:
+                sent = await self.bot.send_message(chat_id, text)
+                self._queue_message_id = sent.message_id
+            else:
+                await self.bot.edit_message_text(text, chat_id=chat_id, message_id=self._queue_message_id)
+        except TelegramAPIError as e:
+            logger.warning(f"Failed to show queue position: {e}")
+
     async def _handle_bot_output(
         self,
         message: StreamMessage,
         chat_id: int,
+        renderer: StreamingTextRenderer,
     ) -> None:
         """Обработать bot_output событие.
 
@@ -267,9 +311,11 @@ class ApplyService:
             if output.content:
                 # Конвертируем format от Runner в parse_mode для Telegram
                 parse_mode = "Markdown" if output.format == "markdown" else None
-                await self._send_text_safe(chat_id, output.content, parse_mode=parse_mode)
+                await renderer.append(output.content, parse_mode=parse_mode)
 
         elif output.output_type == BotOutputType.FILE and output.content and output.filename:
+            # Документ идёт после уже выведенного текста, следующий текст — новым сообщением
+            await renderer.break_message()
             await self._send_document_safe(
                 chat_id=chat_id,
                 content=output.content,
@@ -277,30 +323,6 @@ class ApplyService:
                 caption=output.caption,
             )
 
-    async def _send_text_safe(
-        self,
-        chat_id: int,
-        text: str,
-        parse_mode: str | None = None,
-    ) -> None:
-        """Отправить текст, разбивая на части если нужно. С retry.
-
-        Args:
-            chat_id: ID чата
-            text: Текст сообщения
-            parse_mode: Режим парсинга ("Markdown", "MarkdownV2", "HTML" или None)
-        """
-        if len(text) <= MAX_MESSAGE_LENGTH:
-            await self._send_with_retry(
-                self.bot.send_message, chat_id, text, parse_mode=parse_mode
-            )
-        else:
-            for i in range(0, len(text), MAX_MESSAGE_LENGTH):
-                chunk = text[i : i + MAX_MESSAGE_LENGTH]
-                await self._send_with_retry(
-                    self.bot.send_message, chat_id, chunk, parse_mode=parse_mode
-                )
-
     async def _send_document_safe(
         self,
         chat_id: int,
@@ -317,13 +339,16 @@ class ApplyService:
             caption=caption,
         )
 
-    async def _send_with_retry(self, method, *args, **kwargs) -> None:
-        """Выполнить метод с retry при сетевых ошибках."""
+    async def _send_with_retry(self, method: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Выполнить метод с retry при сетевых ошибках.
+
+        Returns:
+            Результат метода Bot API
+        """
         last_error = None
         for attempt in range(MAX_RETRIES):
             try:
-                await method(*args, **kwargs)
-                return
+                return await method(*args, **kwargs)
             except TelegramNetworkError as e:
                 last_error = e
                 if attempt < MAX_RETRIES - 1:
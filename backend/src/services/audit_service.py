@@ -1,6 +1,7 @@
 """Audit service for logging system events."""
 
 import logging
+import uuid
 from datetime import datetime
 from typing import Any
 from uuid import UUID
@@ -8,15 +9,27 @@ from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.models.audit_log import AuditLog
+from src.services.audit_writer import (
+    AuditLogWriter,
+    audit_log_writer,
+    queue_after_commit,
+)
 
 logger = logging.getLogger(__name__)
 
 
 class AuditService:
-    """Service for audit logging."""
+    """Service for audit logging.
 
-    def __init__(self, session: AsyncSession) -> None:
+    Entries go to the buffered writer after the session commits, keeping the
+    INSERT off the business transaction. If the writer is not running (CLI
+    scripts) or transactional=True is passed, the entry is written in the
+    caller's transaction instead.
+    """
+
+    def __init__(self, session: AsyncSession, writer: AuditLogWriter | None = None) -> None:
         self.session = session
+        self.writer = writer or audit_log_writer
 
     async def log_action(
         self,
@@ -27,6 +40,7 @@ class AuditService:
         old_value: dict | None = None,
         new_value: dict | None = None,
         metadata: dict[str, Any] | None = None,
+        transactional: bool = False,
     ) -> AuditLog:
         """Create audit log entry.
 
@@ -38,11 +52,14 @@ class AuditService:
             old_value: State before change (as dict)
             new_value: State after change (as dict)
             metadata: Additional context
+            transactional: Write in the caller's transaction instead of
+                the buffered writer
 
         Returns:
             Created audit log entry
         """
         audit_log = AuditLog(
+            id=uuid.uuid4(),
             user_id=user_id,
             action=action,
             entity_type=entity_type,
@@ -50,16 +67,20 @@ class AuditService:
             old_value=old_value,
             new_value=new_value,
             metadata_=metadata or {},
+            created_at=datetime.utcnow(),
         )
 
-        self.session.add(audit_log)
-        await self.session.flush()
+        if transactional or not self.writer.running:
+            self.session.add(audit_log)
+        else:
+            queue_after_commit(self.session, audit_log)
 
         logger.debug(
-            "Audit log created: action=%s, entity_type=%s, entity_id=%s",
+            "Audit log created: action=%s, entity_type=%s, entity_id=%s, buffered=%s",
             action,
             entity_type,
             entity_id,
+            not transactional and self.writer.running,
         )
 
         return audit_log
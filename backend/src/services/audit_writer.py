@@ -0,0 +1,246 @@
+"""Buffered background writer for audit log entries.
+
+AuditService queues entries on the caller's session; they are handed to the
+writer only after that session commits (and discarded on rollback), then
+written in batches with a multi-row INSERT outside the business transaction.
+"""
+
+import asyncio
+import contextlib
+import logging
+from typing import Any, cast
+
+from sqlalchemy import Table, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.db.models.audit_log import AuditLog
+from src.db.session import async_session_factory
+
+logger = logging.getLogger(__name__)
+
+# Key in Session.info holding audit rows waiting for the transaction to commit
+_PENDING_KEY = "audit_log_pending"
+
+_AUDIT_TABLE = cast(Table, AuditLog.__table__)
+
+
+class AuditLogWriter:
+    """In-process audit sink flushed on size, on interval and on stop.
+
+    When a batch INSERT fails, its rows are retried one by one so a single
+    bad row does not block the rest. Rows that fail are kept and retried on
+    the next flush; after max_attempts failures a row is logged in full
+    (dead letter) and dropped. The buffer is bounded by max_buffer; on
+    overflow the oldest rows are dropped. Both cases are counted in `dropped`.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_buffer: int,
+        max_attempts: int,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_attempts = max_attempts
+        self._buffer: list[dict[str, Any]] = []
+        # Failed write attempts per row id (only rows that have failed)
+        self._attempts: dict[Any, int] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def enqueue(self, rows: list[dict[str, Any]]) -> None:
+        """Add rows to the buffer; wakes the writer when a batch is full."""
+        self._buffer.extend(rows)
+
+        overflow = len(self._buffer) - self.max_buffer
+        if overflow > 0:
+            for row in self._buffer[:overflow]:
+                self._attempts.pop(row["id"], None)
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            logger.error("Audit log buffer full, dropped %d oldest entries", overflow)
+
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        """Start the background flush loop."""
+        if self.running:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="audit-log-writer")
+        logger.info("Audit log writer started")
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write everything still buffered."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final audit log flush failed, %d entries lost", len(self._buffer))
+        logger.info("Audit log writer stopped")
+
+    async def flush(self) -> int:
+        """Write buffered rows in batches.
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            Exception: Database error; unwritten rows stay buffered
+        """
+        written = 0
+        try:
+            async with self._flush_lock:
+                while self._buffer:
+                    batch = self._buffer[: self.batch_size]
+                    del self._buffer[: len(batch)]
+                    try:
+                        async with async_session_factory() as session:
+                            await session.execute(insert(_AUDIT_TABLE).values(batch))
+                            await session.commit()
+                    except Exception:
+                        logger.warning(
+                            "Audit log batch of %d failed, writing rows one by one",
+                            len(batch),
+                            exc_info=True,
+                        )
+                    else:
+                        if self._attempts:
+                            for row in batch:
+                                self._attempts.pop(row["id"], None)
+                        written += len(batch)
+                        continue
+
+                    rows_written, error = await self._write_rows(batch)
+                    written += rows_written
+                    if error is not None:
+                        raise error
+        finally:
+            self.written += written
+        return written
+
+    async def _write_rows(
+        self, batch: list[dict[str, Any]]
+    ) -> tuple[int, Exception | None]:
+        """Write batch row by row, each in its own savepoint.
+
+        Failed rows go back to the buffer, or are dropped once they reach
+        max_attempts.
+
+        Returns:
+            Number of rows written and the last row error if any row was put
+            back (the flush stops there)
+        """
+        failed: list[tuple[dict[str, Any], Exception]] = []
+        try:
+            async with async_session_factory() as session:
+                for row in batch:
+                    try:
+                        async with session.begin_nested():
+                            await session.execute(insert(_AUDIT_TABLE).values(row))
+                    except Exception as e:
+                        failed.append((row, e))
+                await session.commit()
+        except Exception:
+            # Nothing was committed (e.g. database unavailable): keep the batch
+            self._buffer[:0] = batch
+            raise
+
+        failed_ids = {row["id"] for row, _ in failed}
+        for row in batch:
+            if row["id"] not in failed_ids:
+                self._attempts.pop(row["id"], None)
+
+        retry = [row for row, e in failed if not self._give_up(row, e)]
+        written = len(batch) - len(failed)
+        if retry:
+            self._buffer[:0] = retry
+            return written, failed[-1][1]
+        return written, None
+
+    def _give_up(self, row: dict[str, Any], error: Exception) -> bool:
+        """Count a failed attempt for row; dead-letter it after max_attempts."""
+        attempts = self._attempts.get(row["id"], 0) + 1
+        if attempts < self.max_attempts:
+            self._attempts[row["id"]] = attempts
+            return False
+        self._attempts.pop(row["id"], None)
+        self.dropped += 1
+        logger.error(
+            "Dropping audit log entry after %d failed attempts (%s): %r",
+            attempts,
+            error,
+            row,
+        )
+        return True
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Audit log flush failed, %d entries buffered", len(self._buffer))
+
+
+audit_log_writer = AuditLogWriter(
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval_seconds,
+    max_buffer=settings.audit_max_buffer,
+    max_attempts=settings.audit_max_attempts,
+)
+
+
+def queue_after_commit(session: AsyncSession, audit_log: AuditLog) -> None:
+    """Hand audit_log to the writer once the session's transaction commits."""
+    row = {
+        "id": audit_log.id,
+        "user_id": audit_log.user_id,
+        "action": audit_log.action,
+        "entity_type": audit_log.entity_type,
+        "entity_id": audit_log.entity_id,
+        "old_value": audit_log.old_value,
+        "new_value": audit_log.new_value,
+        "metadata": audit_log.metadata_,
+        "created_at": audit_log.created_at,
+    }
+    session.sync_session.info.setdefault(_PENDING_KEY, []).append(row)
+
+
+def _enqueue_pending(session: Session) -> None:
+    rows = session.info.pop(_PENDING_KEY, None)
+    if rows:
+        audit_log_writer.enqueue(rows)
+
+
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(Session, "after_commit", _enqueue_pending)
+event.listen(Session, "after_rollback", _discard_pending)
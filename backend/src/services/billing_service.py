@@ -9,7 +9,7 @@ from uuid import UUID
 from dateutil.relativedelta import relativedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.exceptions import NotFoundError
+from src.core.exceptions import NotFoundError, ValidationError
 from src.db.models.invoice import Invoice, InvoiceStatus
 from src.db.models.tariff import PeriodUnit, Tariff
 from src.db.models.transaction import Transaction, TransactionType
@@ -174,6 +174,7 @@ class BillingService:
                 user_id=invoice.user_id,
                 invoice=invoice,
                 new_balance=user.token_balance if user else None,
+                dedupe_key=f"payment:{invoice.id}",
             )
 
         logger.info(
@@ -316,6 +317,89 @@ class BillingService:
             return False
         return user.subscription_end > datetime.utcnow()
 
+    async def process_m11_invoice_payment(
+        self,
+        invoice_id: UUID,
+        inv_id: int,
+        user_id: int,
+        amount: Decimal,
+    ) -> PaymentResult | None:
+        """Process a paid Robokassa invoice exactly once.
+
+        Runs in the caller's transaction: the invoice row is locked
+        (FOR UPDATE) before anything else, so concurrent webhook retries
+        for the same invoice wait here and then see PAID. Crediting, the
+        status change and the notification commit together.
+
+        Args:
+            invoice_id: Invoice UUID (Shp_invoice_id)
+            inv_id: Robokassa InvId
+            user_id: Telegram user ID (Shp_user_id)
+            amount: Payment amount in RUB
+
+        Returns:
+            PaymentResult, or None if the invoice was already paid
+
+        Raises:
+            NotFoundError: Invoice or tariff not found
+            ValidationError: InvId or user does not match the invoice
+        """
+        invoice = await self.invoice_repo.get_for_update(invoice_id)
+        if not invoice:
+            raise NotFoundError(
+                message=f"Invoice {invoice_id} not found",
+                details={"invoice_id": str(invoice_id)},
+            )
+
+        if invoice.inv_id != inv_id or invoice.user_id != user_id:
+            raise ValidationError(
+                message=f"Invoice {invoice_id} does not match InvId {inv_id} / user {user_id}",
+                details={"invoice_id": str(invoice_id), "inv_id": inv_id, "user_id": user_id},
+            )
+
+        # Idempotency: retries of a paid invoice do not touch the user row
+        if invoice.status == InvoiceStatus.PAID:
+            logger.info("Invoice %s already paid, inv_id=%d", invoice_id, inv_id)
+            return None
+
+        if invoice.status != InvoiceStatus.PENDING:
+            # Money arrived after expiry/cancellation: still credit it
+            logger.warning(
+                "Payment for invoice %s in status %s, processing anyway",
+                invoice_id,
+                invoice.status.value,
+            )
+
+        tariff = await self.tariff_repo.get_by_id(invoice.tariff_id)
+        if not tariff:
+            raise NotFoundError(
+                message=f"Tariff {invoice.tariff_id} not found",
+                details={"tariff_id": str(invoice.tariff_id)},
+            )
+
+        result = await self.process_m11_payment(
+            user_id=user_id,
+            amount=amount,
+            tariff=tariff,
+            invoice_id=invoice.id,
+        )
+
+        await self.invoice_repo.update_status(
+            invoice_id=invoice.id,
+            status=InvoiceStatus.PAID,
+            paid_at=datetime.utcnow(),
+        )
+
+        if self._notification_service:
+            await self._notification_service.notify_m11_payment_success(
+                user_id=user_id,
+                result=result,
+                amount=amount,
+                dedupe_key=f"payment:{invoice.id}",
+            )
+
+        return result
+
     async def process_m11_payment(
         self,
         user_id: int,
@@ -339,7 +423,8 @@ class BillingService:
         Returns:
             PaymentResult with details of what happened
         """
-        user = await self.user_repo.get_by_id(user_id)
+        # Row lock: the optimistic balance update below cannot lose a race
+        user = await self.user_repo.get_for_update(user_id)
         if not user:
             raise NotFoundError(
                 message=f"User {user_id} not found",
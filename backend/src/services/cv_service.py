@@ -1,18 +1,25 @@
 """CV analysis service with billing integration."""
 
 import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, aclosing
 from dataclasses import dataclass
+from typing import Any
 
 from aiogram import Bot
-from aiogram.exceptions import TelegramNetworkError
+from aiogram.exceptions import TelegramAPIError, TelegramNetworkError
 from aiogram.types import BufferedInputFile
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.exceptions import (
     InsufficientBalanceError,
     SubscriptionExpiredError,
 )
 from src.core.logging import get_logger
+from src.db.session import get_session
 from src.services.runner import BotOutputType, CVAnalyzer, CVFile, StreamMessage
+from src.services.stream_pipeline import pipelined
+from src.services.stream_renderer import StreamingTextRenderer
 from src.services.token_service import TokenService
 
 logger = get_logger(__name__)
@@ -20,9 +27,6 @@ logger = get_logger(__name__)
 # Стоимость анализа CV в токенах (fallback если Runner не отправил track_cost)
 CV_ANALYSIS_FALLBACK_COST = 1
 
-# Лимит длины сообщения Telegram
-MAX_MESSAGE_LENGTH = 4096
-
 # Retry настройки
 MAX_RETRIES = 3
 RETRY_DELAY = 1.0  # секунд
@@ -35,6 +39,7 @@ class CVAnalysisResult:
     success: bool
     error: str | None = None
     tokens_spent: float = 0.0
+    cached: bool = False  # результат повторён из кэша, без списания
 
 
 class CVService:
@@ -45,18 +50,22 @@ class CVService:
     - Координация CVAnalyzer
     - Обработка bot_output событий
     - Списание токенов после успешного анализа
+
+    Соединение с БД не удерживается во время стрима Runner: проверка
+    доступа и списание идут через короткие сессии session_factory.
     """
 
     def __init__(
         self,
-        token_service: TokenService,
         cv_analyzer: CVAnalyzer,
         bot: Bot,
+        session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]] = get_session,
     ):
-        self.token_service = token_service
+        self.session_factory = session_factory
         self.cv_analyzer = cv_analyzer
         self.bot = bot
         self._track_cost: float | None = None  # Стоимость текущего трека
+        self._queue_message_id: int | None = None  # Сообщение с позицией в очереди
 
     async def check_access(self, user_id: int) -> tuple[bool, str | None]:
         """Проверить доступ пользователя к анализу CV.
@@ -65,7 +74,8 @@ class CVService:
             (can_access, error_message)
         """
         # Проверяем только подписку и блокировку, не баланс
-        balance = await self.token_service.check_balance(user_id)
+        async with self.session_factory() as session:
+            balance = await TokenService(session).check_balance(user_id)
         return balance.can_spend, balance.reason
 
     async def analyze_cv(
@@ -73,6 +83,7 @@ class CVService:
         cv_file: CVFile,
         user_id: int,
         chat_id: int,
+        use_cache: bool = True,
     ) -> CVAnalysisResult:
         """Запустить анализ CV с биллингом.
 
@@ -86,6 +97,7 @@ class CVService:
             cv_file: Валидированный файл CV
             user_id: Telegram user ID
             chat_id: Telegram chat ID для отправки сообщений
+            use_cache: False — не брать результат из кэша ("Сгенерировать заново")
 
         Returns:
             CVAnalysisResult с результатом операции
@@ -95,26 +107,41 @@ class CVService:
         if not can_spend:
             return CVAnalysisResult(success=False, error=reason)
 
-        # 2. Запуск анализа
+        # 2. Запуск анализа: Runner получит новое CV, прежний ответ о его наличии неактуален
+        self.cv_analyzer.runner.forget_cv_exists(user_id)
         success = False
         task_id: str | None = None
 
+        renderer = StreamingTextRenderer(self.bot, chat_id, call=self._send_with_retry)
         try:
-            async for message in self.cv_analyzer.analyze(cv_file, user_id):
-                result = await self._handle_stream_message(message, chat_id)
-
-                if result == "error":
-                    return CVAnalysisResult(success=False, error=message.content)
-                elif result == "cancelled":
-                    return CVAnalysisResult(success=False, error="Отменено")
-                elif result == "complete":
-                    success = True
-                    task_id = message.task_id
-                    break
+            async with aclosing(pipelined(self.cv_analyzer.analyze(cv_file, user_id, use_cache=use_cache))) as messages:
+                async for message in messages:
+                    if message.type in ("error", "cancelled", "done", "complete"):
+                        # Дописать накопленный текст до сообщений об итоге трека
+                        await renderer.finish()
+                    result = await self._handle_stream_message(message, chat_id, renderer)
+
+                    if result == "error":
+                        return CVAnalysisResult(success=False, error=message.content)
+                    elif result == "cancelled":
+                        return CVAnalysisResult(success=False, error="Отменено")
+                    elif result == "complete":
+                        success = True
+                        task_id = message.task_id
+                        self.cv_analyzer.runner.remember_cv_exists(user_id, True)
+                        if message.metadata and message.metadata.get("cached"):
+                            # Повтор сохранённого результата: трек не запускался, не списываем
+                            return CVAnalysisResult(success=True, cached=True)
+                        break
+
+            # Стрим закончился без complete
+            await renderer.finish()
 
         except Exception as e:
             logger.exception(f"CV analysis failed: {e}")
             return CVAnalysisResult(success=False, error=str(e))
+        finally:
+            renderer.close()
 
         # 3. Списание токенов при успехе
         if success:
@@ -144,17 +171,19 @@ class CVService:
             )
 
             try:
-                await self.token_service.spend_tokens(
-                    user_id=user_id,
-                    amount=final_cost,
-                    description="Анализ CV",
-                    metadata={
-                        "task_id": task_id,
-                        "cost_raw": self._track_cost,
-                        "cost_multiplier": settings.cost_multiplier,
-                        "cost_final": final_cost,
-                    },
-                )
+                # Короткая сессия только на списание
+                async with self.session_factory() as session:
+                    await TokenService(session).spend_tokens(
+                        user_id=user_id,
+                        amount=final_cost,
+                        description="Анализ CV",
+                        metadata={
+                            "task_id": task_id,
+                            "cost_raw": self._track_cost,
+                            "cost_multiplier": settings.cost_multiplier,
+                            "cost_final": final_cost,
+                        },
+                    )
 
                 # Сбросить стоимость для следующего запуска
                 self._track_cost = None
@@ -176,6 +205,7 @@ class CVService:
         self,
         message: StreamMessage,
         chat_id: int,
+        renderer: StreamingTextRenderer,
     ) -> str:
         """Обработать сообщение из стрима.
 
@@ -199,6 +229,10 @@ class CVService:
         if message.type in ("done", "complete"):
             return "complete"
 
+        if message.type == "queue":
+            await self._show_queue_position(chat_id, message.content)
+            return "continue"
+
         if message.type == "progress":
             # Пропускаем технические прогресс-сообщения
             return "continue"
@@ -212,20 +246,32 @@ class CVService:
                     logger.info(f"Track cost received (via bot_output): {self._track_cost} {currency}")
                 return "continue"
 
-            await self._handle_bot_output(message, chat_id)
+            await self._handle_bot_output(message, chat_id, renderer)
             return "continue"
 
         if message.type == "result" and message.content:
             # Legacy: текстовый результат
-            await self._send_text_safe(chat_id, message.content)
+            await renderer.append(message.content)
             return "continue"
 
         return "continue"
 
+    async def _show_queue_position(self, chat_id: int, text: str) -> None:
+        """Показать позицию в очереди admission, обновляя одно сообщение."""
+        try:
+            if self._queue_message_id is None:
+                sent = await self.bot.send_message(chat_id, text)
+                self._queue_message_id = sent.message_id
+            else:
+                await self.bot.edit_message_text(text, chat_id=chat_id, message_id=self._queue_message_id)
+        except TelegramAPIError as e:
+            logger.warning(f"Failed to show queue position: {e}")
+
     async def _handle_bot_output(
         self,
         message: StreamMessage,
         chat_id: int,
+        renderer: StreamingTextRenderer,
     ) -> None:
         """Обработать bot_output событие.
 
@@ -242,9 +288,11 @@ class CVService:
             if output.content:
                 # Конвертируем format от Runner в parse_mode для Telegram
                 parse_mode = "Markdown" if output.format == "markdown" else None
-                await self._send_text_safe(chat_id, output.content, parse_mode=parse_mode)
+                await renderer.append(output.content, parse_mode=parse_mode)
 
         elif output.output_type == BotOutputType.FILE and output.content and output.filename:
+            # Документ идёт после уже выведенного текста, следующий текст — новым сообщением
+            await renderer.break_message()
             await self._send_document_safe(
                 chat_id=chat_id,
                 content=output.content,
@@ -252,30 +300,6 @@ class CVService:
                 caption=output.caption,
             )
 
-    async def _send_text_safe(
-        self,
-        chat_id: int,
-        text: str,
-        parse_mode: str | None = None,
-    ) -> None:
-        """Отправить текст, разбивая на части если нужно. С retry.
-
-        Args:
-            chat_id: ID чата
-            text: Текст сообщения
-            parse_mode: Режим парсинга ("Markdown", "MarkdownV2", "HTML" или None)
-        """
-        if len(text) <= MAX_MESSAGE_LENGTH:
-            await self._send_with_retry(
-                self.bot.send_message, chat_id, text, parse_mode=parse_mode
-            )
-        else:
-            for i in range(0, len(text), MAX_MESSAGE_LENGTH):
-                chunk = text[i : i + MAX_MESSAGE_LENGTH]
-                await self._send_with_retry(
-                    self.bot.send_message, chat_id, chunk, parse_mode=parse_mode
-                )
-
     async def _send_document_safe(
         self,
         chat_id: int,
@@ -292,13 +316,16 @@ class CVService:
             caption=caption,
         )
 
-    async def _send_with_retry(self, method, *args, **kwargs) -> None:
-        """Выполнить метод с retry при сетевых ошибках."""
+    async def _send_with_retry(self, method: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Выполнить метод с retry при сетевых ошибках.
+
+        Returns:
+            Результат метода Bot API
+        """
         last_error = None
         for attempt in range(MAX_RETRIES):
             try:
-                await method(*args, **kwargs)
-                return
+                return await method(*args, **kwargs)
             except TelegramNetworkError as e:
                 last_error = e
                 if attempt < MAX_RETRIES - 1:
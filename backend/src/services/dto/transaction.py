@@ -33,3 +33,12 @@ class TransactionListDTO(BaseModel):
     limit: int
     offset: int
     has_more: bool
+
+
+class TransactionPageDTO(BaseModel):
+    """Keyset-paginated page of transactions."""
+
+    items: list[TransactionDTO]
+    total: int
+    next_cursor: str | None  # Token for the older page, None on the last page
+    prev_cursor: str | None  # Token for the newer page, None on the first page
@@ -1,4 +1,10 @@
-"""Notification service for sending Telegram messages."""
+"""Notification service for sending Telegram messages.
+
+Notifications about balance and subscription changes are not sent from
+inside the DB transaction: with an OutboxRepository the service writes
+them to notification_outbox in the caller's transaction, and
+OutboxDispatcher delivers them after commit.
+"""
 
 import logging
 from datetime import datetime
@@ -9,22 +15,31 @@ from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
 from decimal import Decimal
 
 from src.db.models.invoice import Invoice
+from src.db.repositories.outbox_repository import OutboxRepository
 from src.services.billing_service import PaymentResult
 
 logger = logging.getLogger(__name__)
 
 
 class NotificationService:
-    """Service for sending Telegram notifications."""
+    """Service for sending Telegram notifications.
+
+    Sends directly via bot, or enqueues to the transactional outbox when
+    created with outbox (then dedupe_key makes repeated calls no-ops).
+    """
 
-    def __init__(self, bot: Bot) -> None:
+    def __init__(self, bot: Bot | None = None, outbox: OutboxRepository | None = None) -> None:
+        if bot is None and outbox is None:
+            raise ValueError("NotificationService needs a bot or an outbox")
         self.bot = bot
+        self.outbox = outbox
 
     async def notify_payment_success(
         self,
         user_id: int,
         invoice: Invoice,
         new_balance: int | None = None,
+        dedupe_key: str | None = None,
     ) -> bool:
         """Send payment success notification.
 
@@ -32,18 +47,20 @@ class NotificationService:
             user_id: Telegram user ID
             invoice: Paid invoice
             new_balance: Current token balance after payment
+            dedupe_key: Outbox idempotency key
 
         Returns:
             True if message sent successfully
         """
         message = self._format_payment_success(invoice, new_balance)
-        return await self._send_message(user_id, message)
+        return await self._send_message(user_id, message, dedupe_key=dedupe_key)
 
     async def notify_m11_payment_success(
         self,
         user_id: int,
         result: PaymentResult,
         amount: Decimal,
+        dedupe_key: str | None = None,
     ) -> bool:
         """Send M11 payment success notification.
 
@@ -53,12 +70,13 @@ class NotificationService:
             user_id: Telegram user ID
             result: PaymentResult from billing service
             amount: Payment amount in RUB
+            dedupe_key: Outbox idempotency key
 
         Returns:
             True if message sent successfully
         """
         message = self._format_m11_payment_success(result, amount)
-        return await self._send_message(user_id, message)
+        return await self._send_message(user_id, message, dedupe_key=dedupe_key)
 
     def _format_m11_payment_success(
         self,
@@ -90,6 +108,7 @@ class NotificationService:
         days_left: int,
         balance: int | None = None,
         subscription_fee: int | None = None,
+        dedupe_key: str | None = None,
     ) -> bool:
         """Send subscription expiring warning.
 
@@ -100,6 +119,7 @@ class NotificationService:
             days_left: Days until subscription expires
             balance: Current token balance (optional)
             subscription_fee: Fee required for renewal (optional)
+            dedupe_key: Outbox idempotency key
 
         Returns:
             True if message sent successfully
@@ -137,13 +157,14 @@ class NotificationService:
                 "Пополните баланс: /balance"
             )
 
-        return await self._send_message(user_id, message)
+        return await self._send_message(user_id, message, dedupe_key=dedupe_key)
 
     async def notify_subscription_expired(
         self,
         user_id: int,
         subscription_fee: int | None = None,
         balance: int | None = None,
+        dedupe_key: str | None = None,
     ) -> bool:
         """Send subscription expired notification.
 
@@ -161,7 +182,7 @@ class NotificationService:
             f"{balance_info}\n\n"
             "Пополните баланс для активации: /balance"
         )
-        return await self._send_message(user_id, message)
+        return await self._send_message(user_id, message, dedupe_key=dedupe_key)
 
     async def notify_renewal_success(
         self,
@@ -169,6 +190,7 @@ class NotificationService:
         new_end_date: datetime,
         tokens_spent: int,
         new_balance: int,
+        dedupe_key: str | None = None,
     ) -> bool:
         """Send auto-renewal success notification.
 
@@ -177,6 +199,7 @@ class NotificationService:
             new_end_date: New subscription end date
             tokens_spent: Tokens spent for renewal
             new_balance: Balance after renewal
+            dedupe_key: Outbox idempotency key
 
         Returns:
             True if message sent successfully
@@ -189,7 +212,7 @@ class NotificationService:
             f"💳 Остаток на балансе: {new_balance}\n\n"
             "Управление подпиской: /subscription"
         )
-        return await self._send_message(user_id, message)
+        return await self._send_message(user_id, message, dedupe_key=dedupe_key)
 
     async def notify_renewal_failed(
         self,
@@ -197,6 +220,7 @@ class NotificationService:
         reason: str,
         required: int,
         available: int,
+        dedupe_key: str | None = None,
     ) -> bool:
         """Send auto-renewal failure notification.
 
@@ -205,6 +229,7 @@ class NotificationService:
             reason: Failure reason
             required: Required tokens
             available: Available tokens
+            dedupe_key: Outbox idempotency key
 
         Returns:
             True if message sent successfully
@@ -222,7 +247,7 @@ class NotificationService:
                 f"Причина: {reason}\n\n"
                 "Обратитесь в поддержку или попробуйте позже."
             )
-        return await self._send_message(user_id, message)
+        return await self._send_message(user_id, message, dedupe_key=dedupe_key)
 
     async def notify_low_balance(
         self,
@@ -309,12 +334,29 @@ class NotificationService:
         user_id: int,
         text: str,
         reply_markup=None,
+        dedupe_key: str | None = None,
     ) -> bool:
         """Send message to user with error handling.
 
+        In outbox mode the message is only enqueued; database errors
+        propagate so the caller's transaction rolls back as a whole.
+
         Returns:
-            True if message sent, False if user blocked bot or error
+            True if message sent (or enqueued), False if user blocked bot or error
         """
+        if self.outbox is not None:
+            if reply_markup is not None:
+                raise ValueError("reply_markup is not supported by the notification outbox")
+            entry_id = await self.outbox.enqueue(user_id, text, dedupe_key=dedupe_key)
+            if entry_id is None:
+                logger.info("Notification %s for user %d already enqueued", dedupe_key, user_id)
+            else:
+                logger.info("Notification %d enqueued for user %d", entry_id, user_id)
+            return True
+
+        if self.bot is None:
+            raise RuntimeError("NotificationService has neither a bot nor an outbox")
+
         try:
             await self.bot.send_message(
                 chat_id=user_id,
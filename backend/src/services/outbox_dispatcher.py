@@ -0,0 +1,225 @@
+"""Background delivery of the notification outbox.
+
+Notifications are enqueued by NotificationService in the same transaction
+as the balance or subscription change, so they exist only if the change
+committed. The dispatcher claims due rows with FOR UPDATE SKIP LOCKED,
+sends them to Telegram in the bulk lane and records the outcome; failed
+sends are retried with exponential backoff. Delivery is at-least-once: a
+crash between send and mark_sent repeats the message after the lease.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.bot.send_scheduler import SendPriority, send_priority
+from src.core.config import settings
+from src.db.models.notification_outbox import NotificationOutbox
+from src.db.replica import note_user_write
+from src.db.repositories.outbox_repository import ENQUEUED_KEY, OutboxRepository
+from src.db.session import async_session_factory
+from src.db.user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+# How often sent and failed entries older than retention are deleted (seconds)
+_PURGE_INTERVAL = 3600.0
+
+
+class OutboxDispatcher:
+    """Polls notification_outbox and delivers due entries.
+
+    Woken immediately when a session in this process commits outbox rows,
+    otherwise polls every poll_interval (e.g. for rows written by the API
+    process).
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        batch_size: int = 50,
+        poll_interval: float = 2.0,
+        max_attempts: int = 8,
+        retry_base: float = 5.0,
+        retry_max: float = 600.0,
+        retention: timedelta = timedelta(days=7),
+    ) -> None:
+        self.bot = bot
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.retention = retention
+        # Claimed rows stay exclusive while a full batch is sent at the bulk rate
+        self.lease_seconds = max(60.0, batch_size * 2.0)
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+        self._last_purge = 0.0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def wake(self) -> None:
+        """Deliver new entries without waiting for the next poll."""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        """Start the background dispatch loop."""
+        if self.running:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="notification-outbox-dispatcher")
+        logger.info("Notification outbox dispatcher started")
+
+    async def stop(self) -> None:
+        """Stop the loop after the current batch; undelivered rows stay pending."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        logger.info("Notification outbox dispatcher stopped")
+
+    async def dispatch_once(self) -> int:
+        """Claim and deliver one batch.
+
+        Returns:
+            Number of claimed entries
+        """
+        async with self.session_factory() as session:
+            entries = await OutboxRepository(session).claim_batch(self.batch_size, self.lease_seconds)
+            await session.commit()
+
+        if not entries:
+            return 0
+
+        for entry in entries:
+            # Payments are committed by the API process, which cannot reach
+            # this process's snapshot cache and replica guard: drop the
+            # user's cached balance before they read the notification
+            user_cache.invalidate(entry.chat_id)
+            note_user_write(entry.chat_id)
+
+        outcomes = [await self._deliver(entry) for entry in entries]
+
+        async with self.session_factory() as session:
+            repo = OutboxRepository(session)
+            for entry, (action, delay, error) in zip(entries, outcomes, strict=True):
+                if action == "sent":
+                    await repo.mark_sent(entry.id)
+                elif action == "retry":
+                    await repo.mark_retry(entry.id, delay, error)
+                else:
+                    await repo.mark_failed(entry.id, error)
+            await session.commit()
+        return len(entries)
+
+    async def _deliver(self, entry: NotificationOutbox) -> tuple[str, float, str]:
+        """Send one entry; returns (action, retry delay, error)."""
+        try:
+            with send_priority(SendPriority.BULK):
+                await self.bot.send_message(chat_id=entry.chat_id, text=entry.text)
+            self.sent += 1
+            return "sent", 0.0, ""
+
+        except TelegramForbiddenError as e:
+            logger.warning("User %d blocked the bot, outbox entry %d dropped", entry.chat_id, entry.id)
+            self.failed += 1
+            return "failed", 0.0, str(e)
+
+        except TelegramBadRequest as e:
+            logger.error("Outbox entry %d rejected by Telegram: %s", entry.id, e)
+            self.failed += 1
+            return "failed", 0.0, str(e)
+
+        except Exception as e:
+            if entry.attempts >= self.max_attempts:
+                logger.error("Outbox entry %d failed after %d attempts: %s", entry.id, entry.attempts, e)
+                self.failed += 1
+                return "failed", 0.0, str(e)
+            if isinstance(e, TelegramRetryAfter):
+                delay = float(e.retry_after)
+            else:
+                delay = min(self.retry_max, self.retry_base * 2 ** (entry.attempts - 1))
+            logger.warning(
+                "Outbox entry %d attempt %d failed, retry in %.0fs: %s", entry.id, entry.attempts, delay, e
+            )
+            self.retried += 1
+            return "retry", delay, str(e) or type(e).__name__
+
+    async def _purge(self) -> None:
+        async with self.session_factory() as session:
+            purged = await OutboxRepository(session).purge_finished(self.retention)
+            await session.commit()
+        if purged:
+            logger.info("Purged %d finished outbox entries", purged)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                # Drain full batches back to back, then wait for new work
+                while not self._stopping and await self.dispatch_once() >= self.batch_size:
+                    pass
+                if time.monotonic() - self._last_purge > _PURGE_INTERVAL:
+                    self._last_purge = time.monotonic()
+                    await self._purge()
+            except Exception:
+                logger.exception("Notification outbox dispatch failed")
+
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            self._wakeup.clear()
+
+
+_dispatcher: OutboxDispatcher | None = None
+
+
+def get_outbox_dispatcher(bot: Bot) -> OutboxDispatcher:
+    """Get the process outbox dispatcher (singleton)."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = OutboxDispatcher(
+            bot,
+            batch_size=settings.outbox_batch_size,
+            poll_interval=settings.outbox_poll_interval_seconds,
+            max_attempts=settings.outbox_max_attempts,
+            retry_base=settings.outbox_retry_base_seconds,
+            retry_max=settings.outbox_retry_max_seconds,
+            retention=timedelta(days=settings.outbox_retention_days),
+        )
+    return _dispatcher
+
+
+def _wake_after_commit(session: Session, *_args: Any) -> None:
+    if session.info.pop(ENQUEUED_KEY, False) and _dispatcher is not None:
+        _dispatcher.wake()
+
+
+def _discard_after_rollback(session: Session, *_args: Any) -> None:
+    session.info.pop(ENQUEUED_KEY, None)
+
+
+event.listen(Session, "after_commit", _wake_after_commit)
+event.listen(Session, "after_rollback", _discard_after_rollback)
@@ -0,0 +1,69 @@
+"""In-process dedupe of payment webhook retries.
+
+Robokassa repeats ResultURL calls until it gets OK{InvId}, sometimes many
+at once. Invoices known to be paid are answered from memory, and concurrent
+deliveries of the same InvId share one processing task instead of queueing
+on the invoice row lock. The database (invoice row lock and status) stays
+the source of truth; this only saves round trips within one process.
+"""
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from src.core.config import settings
+
+T = TypeVar("T")
+
+
+class PaymentDedupe:
+    """Bounded LRU set of paid InvIds plus single-flight processing."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._paid: OrderedDict[int, None] = OrderedDict()
+        self._in_flight: dict[int, asyncio.Task[Any]] = {}
+        self.hits = 0
+        self.coalesced = 0
+
+    def is_paid(self, inv_id: int) -> bool:
+        """Check if inv_id was already processed by this process."""
+        if inv_id in self._paid:
+            self._paid.move_to_end(inv_id)
+            self.hits += 1
+            return True
+        return False
+
+    def mark_paid(self, inv_id: int) -> None:
+        """Remember inv_id as paid (call after the payment committed)."""
+        if self.max_size <= 0:
+            return
+        self._paid[inv_id] = None
+        self._paid.move_to_end(inv_id)
+        while len(self._paid) > self.max_size:
+            self._paid.popitem(last=False)
+
+    async def single_flight(self, inv_id: int, process: Callable[[], Awaitable[T]]) -> T:
+        """Run process() once for concurrent calls with the same inv_id.
+
+        The shared task is shielded: a disconnecting caller does not cancel
+        processing for the others.
+        """
+        task = self._in_flight.get(inv_id)
+        if task is None:
+            task = asyncio.ensure_future(process())
+            self._in_flight[inv_id] = task
+            task.add_done_callback(lambda done: self._finish(inv_id, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, inv_id: int, task: asyncio.Task[Any]) -> None:
+        self._in_flight.pop(inv_id, None)
+        if not task.cancelled():
+            # Retrieved here so an error nobody awaited anymore is not reported as lost
+            task.exception()
+
+
+payment_dedupe = PaymentDedupe(max_size=settings.payment_dedupe_max_size)
@@ -1,14 +1,30 @@
 """Runner service module."""
 
+from functools import partial
+
 from src.core.config import settings
 
+from .admission import AdmissionController, AdmissionRejected
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
 from .apply_analyzer import ApplyAnalyzer
+from .balancer import NodeBalancer, RunnerNode
 from .client import BaseRunnerClient, RunnerClient, TaskResponse
+from .constructor_cache import ConstructorCache
 from .cv_analyzer import CVAnalyzer
+from .cv_presence import CVPresenceCache
 from .models import BotOutput, BotOutputType, CVFile, FileValidationError, StreamMessage, TaskResult, TrackCost
+from .result_cache import ResultCache
 from .skills_analyzer import SkillsAnalyzer
 
 __all__ = [
+    "AdmissionController",
+    "AdmissionRejected",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "CircuitState",
+    "NodeBalancer",
+    "RunnerNode",
+    "ResultCache",
     "BaseRunnerClient",
     "RunnerClient",
     "TaskResponse",
@@ -23,12 +39,16 @@ __all__ = [
     "BotOutputType",
     "TrackCost",
     "get_runner_client",
+    "get_admission_controller",
+    "get_result_cache",
     "get_cv_analyzer",
     "get_apply_analyzer",
     "get_skills_analyzer",
 ]
 
 _runner: BaseRunnerClient | None = None
+_admission: AdmissionController | None = None
+_result_cache: ResultCache | None = None
 _cv_analyzer: CVAnalyzer | None = None
 _apply_analyzer: ApplyAnalyzer | None = None
 _skills_analyzer: SkillsAnalyzer | None = None
@@ -41,15 +61,63 @@ def get_runner_client() -> BaseRunnerClient:
         _runner = RunnerClient(
             base_url=settings.runner_base_url,
             api_key=settings.runner_api_key,
+            pool_limit=settings.runner_pool_limit,
+            pool_limit_per_host=settings.runner_pool_limit_per_host,
+            keepalive_timeout=settings.runner_keepalive_timeout,
+            dns_cache_ttl=settings.runner_dns_cache_ttl,
+            stream_max_reconnects=settings.runner_stream_max_reconnects,
+            stream_backoff_base=settings.runner_stream_backoff_base,
+            stream_backoff_max=settings.runner_stream_backoff_max,
+            result_poll_timeout=settings.runner_result_poll_timeout,
+            cv_presence=CVPresenceCache(
+                positive_ttl=settings.cv_presence_positive_ttl_seconds,
+                negative_ttl=settings.cv_presence_negative_ttl_seconds,
+                max_size=settings.cv_presence_cache_max_size,
+            ),
+            constructor_cache=ConstructorCache(max_size=settings.constructor_cache_max_size),
+            breaker_factory=partial(
+                CircuitBreaker,
+                window_size=settings.runner_breaker_window,
+                min_calls=settings.runner_breaker_min_calls,
+                failure_rate=settings.runner_breaker_failure_rate,
+                slow_call_seconds=settings.runner_breaker_slow_call_seconds,
+                slow_call_rate=settings.runner_breaker_slow_call_rate,
+                open_seconds=settings.runner_breaker_open_seconds,
+            ),
+            health_probe_interval=settings.runner_health_probe_interval,
+            endpoints=settings.runner_endpoints,
+            balance_strategy=settings.runner_balance_strategy,
         )
     return _runner
 
 
+def get_admission_controller() -> AdmissionController:
+    """Получить admission controller треков Runner (singleton)."""
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController(
+            max_concurrent=settings.runner_max_concurrent_tracks,
+            max_queue=settings.runner_max_queued_tracks,
+        )
+    return _admission
+
+
+def get_result_cache() -> ResultCache:
+    """Получить кэш результатов треков (singleton)."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(
+            ttl_seconds=settings.result_cache_ttl_seconds,
+            max_size=settings.result_cache_max_size,
+        )
+    return _result_cache
+
+
 def get_cv_analyzer() -> CVAnalyzer:
     """Получить анализатор CV (singleton)."""
     global _cv_analyzer
     if _cv_analyzer is None:
-        _cv_analyzer = CVAnalyzer(get_runner_client())
+        _cv_analyzer = CVAnalyzer(get_runner_client(), get_admission_controller(), get_result_cache())
     return _cv_analyzer
 
 
@@ -57,7 +125,7 @@ def get_apply_analyzer() -> ApplyAnalyzer:
     """Получить анализатор Apply (singleton)."""
     global _apply_analyzer
     if _apply_analyzer is None:
-        _apply_analyzer = ApplyAnalyzer(get_runner_client())
+        _apply_analyzer = ApplyAnalyzer(get_runner_client(), get_admission_controller(), get_result_cache())
     return _apply_analyzer
 
 
@@ -65,5 +133,5 @@ def get_skills_analyzer() -> SkillsAnalyzer:
     """Получить анализатор Skills (singleton)."""
     global _skills_analyzer
     if _skills_analyzer is None:
-        _skills_analyzer = SkillsAnalyzer(get_runner_client())
+        _skills_analyzer = SkillsAnalyzer(get_runner_client(), get_admission_controller())
     return _skills_analyzer
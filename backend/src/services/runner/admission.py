@@ -0,0 +1,230 @@
+"""Admission control for Runner tracks.
+
+Ограничивает число одновременно выполняемых треков (/cv, /apply, /skills)
+в процессе бота: общий лимит, не больше одного трека на пользователя и
+честная FIFO-очередь ожидания. Когда очередь заполнена, запрос сразу
+отклоняется, а не копится.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import aclosing, asynccontextmanager
+from enum import StrEnum
+
+from src.core.logging import get_logger
+
+from .models import StreamMessage
+
+logger = get_logger(__name__)
+
+# Сообщения стрима, после которых трек завершён
+_TERMINAL_TYPES = frozenset({"done", "complete", "error", "cancelled"})
+
+BUSY_MESSAGE = "Предыдущий запрос ещё выполняется. Дождитесь его завершения."
+OVERLOADED_MESSAGE = "Сервис сейчас перегружен. Попробуйте через пару минут."
+
+
+class AdmissionRejected(Exception):
+    """Запрос не допущен к выполнению."""
+
+    def __init__(self, reason: str, message: str) -> None:
+        super().__init__(message)
+        self.reason = reason  # "busy" | "overloaded"
+        self.message = message
+
+
+class AdmissionCancelled(Exception):
+    """Ожидание в очереди отменено."""
+
+
+class TicketState(StrEnum):
+    """Состояние заявки на выполнение."""
+
+    WAITING = "waiting"
+    ADMITTED = "admitted"
+    CANCELLED = "cancelled"
+
+
+class AdmissionTicket:
+    """Заявка пользователя на выполнение трека."""
+
+    def __init__(self, controller: "AdmissionController", user_id: int) -> None:
+        self.controller = controller
+        self.user_id = user_id
+        self.state = TicketState.WAITING
+        self._changed = asyncio.Event()
+
+    @property
+    def position(self) -> int:
+        """Позиция в очереди (1 — следующий), 0 если уже допущен."""
+        if self.state != TicketState.WAITING:
+            return 0
+        return self.controller._waiters.index(self) + 1
+
+    async def wait(self) -> AsyncIterator[int]:
+        """Ждать допуска, отдавая позицию в очереди при каждом её изменении.
+
+        Raises:
+            AdmissionCancelled: Ожидание отменено через AdmissionController.cancel
+        """
+        last_position = 0
+        while self.state == TicketState.WAITING:
+            position = self.position
+            self._changed.clear()
+            if position != last_position:
+                last_position = position
+                yield position
+            await self._changed.wait()
+
+        if self.state == TicketState.CANCELLED:
+            raise AdmissionCancelled()
+
+    def _notify(self) -> None:
+        self._changed.set()
+
+
+class AdmissionController:
+    """Общий лимит треков, single-flight на пользователя и FIFO-очередь.
+
+    Освободившийся слот передаётся первому в очереди напрямую, поэтому
+    новые запросы не обгоняют ожидающих.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._active = 0
+        self._waiters: deque[AdmissionTicket] = deque()
+        self._tickets: dict[int, AdmissionTicket] = {}
+        self.admitted = 0
+        self.rejected_busy = 0
+        self.rejected_overloaded = 0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def admit(self, user_id: int) -> AsyncIterator[AdmissionTicket]:
+        """Занять слот на время блока.
+
+        Заявка может быть ещё в очереди: дождитесь ticket.wait() перед работой.
+
+        Raises:
+            AdmissionRejected: У пользователя уже есть трек или очередь заполнена
+        """
+        ticket = self._enter(user_id)
+        try:
+            yield ticket
+        finally:
+            self._leave(ticket)
+
+    def cancel(self, user_id: int) -> bool:
+        """Снять пользователя из очереди ожидания.
+
+        Returns:
+            True если заявка ждала в очереди и была отменена
+        """
+        ticket = self._tickets.get(user_id)
+        if ticket is None or ticket.state != TicketState.WAITING:
+            return False
+        self._waiters.remove(ticket)
+        ticket.state = TicketState.CANCELLED
+        ticket._notify()
+        self._notify_waiters()
+        return True
+
+    def _enter(self, user_id: int) -> AdmissionTicket:
+        if user_id in self._tickets:
+            self.rejected_busy += 1
+            raise AdmissionRejected("busy", BUSY_MESSAGE)
+
+        ticket = AdmissionTicket(self, user_id)
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            self.admitted += 1
+            ticket.state = TicketState.ADMITTED
+        elif len(self._waiters) >= self.max_queue:
+            self.rejected_overloaded += 1
+            logger.warning(
+                f"Admission rejected: {self._active} active, {len(self._waiters)} queued"
+            )
+            raise AdmissionRejected("overloaded", OVERLOADED_MESSAGE)
+        else:
+            self._waiters.append(ticket)
+
+        self._tickets[user_id] = ticket
+        return ticket
+
+    def _leave(self, ticket: AdmissionTicket) -> None:
+        self._tickets.pop(ticket.user_id, None)
+
+        if ticket.state == TicketState.WAITING:
+            self._waiters.remove(ticket)
+            ticket.state = TicketState.CANCELLED
+            self._notify_waiters()
+            return
+        if ticket.state != TicketState.ADMITTED:
+            return
+
+        if self._waiters:
+            # Слот переходит первому в очереди, _active не меняется
+            head = self._waiters.popleft()
+            head.state = TicketState.ADMITTED
+            self.admitted += 1
+            head._notify()
+            self._notify_waiters()
+        else:
+            self._active -= 1
+
+    def _notify_waiters(self) -> None:
+        for waiter in self._waiters:
+            waiter._notify()
+
+
+async def admitted_stream(
+    admission: AdmissionController | None,
+    user_id: int,
+    stream: AsyncGenerator[StreamMessage, None],
+) -> AsyncGenerator[StreamMessage, None]:
+    """Выполнить stream трека под контролем admission.
+
+    Пока заявка в очереди, отдаёт сообщения type="queue" с позицией
+    (metadata["position"]). Слот освобождается до передачи финального
+    сообщения, чтобы следующий в очереди не ждал списания токенов.
+    """
+    if admission is None:
+        async for message in stream:
+            yield message
+        return
+
+    final: StreamMessage | None = None
+    try:
+        async with admission.admit(user_id) as ticket:
+            async for position in ticket.wait():
+                yield StreamMessage(
+                    type="queue",
+                    content=f"⏳ Все исполнители заняты. Ваше место в очереди: {position}",
+                    metadata={"position": position},
+                )
+
+            async with aclosing(stream):
+                async for message in stream:
+                    if message.type in _TERMINAL_TYPES:
+                        final = message
+                        break
+                    yield message
+    except AdmissionRejected as e:
+        yield StreamMessage(type="error", content=e.message)
+        return
+    except AdmissionCancelled:
+        yield StreamMessage(type="cancelled", content="")
+        return
+
+    if final is not None:
+        yield final
@@ -1,11 +1,13 @@
 """Apply Analyzer service."""
 
-from typing import AsyncIterator
+from collections.abc import AsyncGenerator
 
 import aiohttp
 
+from .admission import AdmissionController, admitted_stream
 from .client import BaseRunnerClient, TaskResponse
 from .models import StreamMessage
+from .result_cache import ResultCache, recording, replay
 
 
 class ApplyAnalyzer:
@@ -13,19 +15,51 @@ class ApplyAnalyzer:
 
     ENDPOINT = "/api/vacancy/apply"
 
-    def __init__(self, runner: BaseRunnerClient):
+    def __init__(
+        self,
+        runner: BaseRunnerClient,
+        admission: AdmissionController | None = None,
+        result_cache: ResultCache | None = None,
+    ):
         self.runner = runner
+        self.admission = admission
+        self.result_cache = result_cache
 
     async def apply(
         self,
         vacancy_url: str,
         telegram_id: int,
-    ) -> AsyncIterator[StreamMessage]:
+        use_cache: bool = True,
+    ) -> AsyncGenerator[StreamMessage, None]:
         """Запустить создание отклика на вакансию.
 
         1. POST /api/vacancy/apply -> получаем task_id и stream_url
         2. GET stream_url -> SSE стрим результатов
+
+        При занятых слотах admission сначала отдаёт сообщения type="queue"
+        с позицией в очереди. Если включён result_cache и use_cache=True,
+        сохранённый результат для того же входа отдаётся без нового трека.
         """
+        stream = self._run(vacancy_url, telegram_id)
+        cache = self.result_cache
+        if cache is not None and cache.enabled:
+            key = cache.apply_key(telegram_id, vacancy_url)
+            if use_cache:
+                cached = cache.get(key)
+                if cached is not None:
+                    async for message in replay(cached):
+                        yield message
+                    return
+            stream = recording(cache, key, stream)
+
+        async for message in admitted_stream(self.admission, telegram_id, stream):
+            yield message
+
+    async def _run(
+        self,
+        vacancy_url: str,
+        telegram_id: int,
+    ) -> AsyncGenerator[StreamMessage, None]:
         form = aiohttp.FormData()
         form.add_field("vacancy_url", vacancy_url)
         form.add_field("telegram_id", str(telegram_id))
@@ -51,4 +85,5 @@ class ApplyAnalyzer:
 
     async def cancel(self, telegram_id: int) -> bool:
         """Отменить создание отклика."""
-        return await self.runner.cancel_stream(telegram_id)
+        dequeued = self.admission.cancel(telegram_id) if self.admission else False
+        return await self.runner.cancel_stream(telegram_id) or dequeued
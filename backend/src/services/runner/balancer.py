@@ -0,0 +1,81 @@
+"""Балансировка запросов между несколькими узлами Runner.
+
+Каждый узел имеет свой circuit breaker, health-пробер и статистику:
+число запросов в работе (включая открытые SSE-стримы) и EWMA задержки.
+Новые задачи распределяются по доступным узлам стратегией
+power-of-two-choices или least-outstanding-requests; запросы по уже
+созданной задаче (стрим, результат) идут на узел, который её создал.
+"""
+
+import random
+from dataclasses import dataclass, field
+
+from .circuit_breaker import CircuitBreaker, HealthProber
+
+# Вес нового замера в EWMA задержки
+LATENCY_ALPHA = 0.3
+
+STRATEGY_P2C = "p2c"
+STRATEGY_LEAST_OUTSTANDING = "least_outstanding"
+STRATEGIES = (STRATEGY_P2C, STRATEGY_LEAST_OUTSTANDING)
+
+
+@dataclass
+class RunnerNode:
+    """Узел Runner и его статистика."""
+
+    base_url: str
+    breaker: CircuitBreaker | None = None
+    prober: HealthProber | None = field(default=None, repr=False)
+    outstanding: int = 0  # запросы в работе
+    latency: float = 0.0  # EWMA времени до заголовков ответа, секунды
+    requests: int = 0
+    failures: int = 0
+
+    @property
+    def available(self) -> bool:
+        return self.breaker is None or self.breaker.available
+
+    def observe(self, duration: float, success: bool) -> None:
+        """Учесть завершённый запрос."""
+        self.requests += 1
+        if not success:
+            self.failures += 1
+        self.observe_latency(duration)
+
+    def observe_latency(self, duration: float) -> None:
+        """Обновить EWMA задержки (запросы и health-проверки)."""
+        if self.latency == 0.0:
+            self.latency = duration
+        else:
+            self.latency = LATENCY_ALPHA * duration + (1 - LATENCY_ALPHA) * self.latency
+
+    def load(self) -> float:
+        """Оценка нагрузки: запросы в работе, взвешенные задержкой."""
+        return (self.outstanding + 1) * self.latency
+
+
+class NodeBalancer:
+    """Выбор узла Runner для нового запроса."""
+
+    def __init__(self, nodes: list[RunnerNode], strategy: str = STRATEGY_P2C) -> None:
+        if not nodes:
+            raise ValueError("At least one Runner node is required")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown balancing strategy: {strategy!r}, expected one of {STRATEGIES}")
+        self.nodes = nodes
+        self.strategy = strategy
+
+    def pick(self) -> RunnerNode:
+        """Выбрать узел среди доступных.
+
+        Если breaker разомкнут у всех узлов, возвращается любой: его breaker
+        сразу отклонит запрос с понятной ошибкой.
+        """
+        candidates = [node for node in self.nodes if node.available] or self.nodes
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.strategy == STRATEGY_LEAST_OUTSTANDING:
+            return min(candidates, key=lambda node: (node.outstanding, node.latency))
+        first, second = random.sample(candidates, 2)
+        return first if first.load() <= second.load() else second
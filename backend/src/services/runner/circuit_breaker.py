@@ -0,0 +1,220 @@
+"""Circuit breaker and background health prober for Runner.
+
+Пока Runner недоступен, вызовы клиента отклоняются сразу (CircuitOpenError)
+вместо ожидания таймаутов. Breaker размыкается по доле ошибок или медленных
+вызовов в скользящем окне либо по сигналу фонового health-пробера.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from enum import StrEnum
+
+import aiohttp
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+UNAVAILABLE_MESSAGE = "Сервис анализа временно недоступен. Попробуйте через пару минут."
+
+
+class CircuitOpenError(aiohttp.ClientConnectionError):
+    """Вызов отклонён: breaker разомкнут.
+
+    Наследует ClientConnectionError, чтобы существующая обработка сетевых
+    ошибок клиента срабатывала и для отказов breaker.
+    """
+
+    def __init__(self, message: str = UNAVAILABLE_MESSAGE) -> None:
+        super().__init__(message)
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class CircuitState(StrEnum):
+    """Состояние breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Breaker с окном последних window_size вызовов.
+
+    CLOSED -> OPEN: в окне не меньше min_calls вызовов и доля ошибок
+        >= failure_rate или доля медленных (>= slow_call_seconds) >= slow_call_rate;
+        либо health-пробер сообщил о недоступности.
+    OPEN -> HALF_OPEN: через open_seconds или по успешной health-проверке.
+    HALF_OPEN: пропускает до half_open_max_calls пробных вызовов; успех
+        замыкает breaker, ошибка снова размыкает.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CircuitState.CLOSED
+        self._calls: deque[tuple[bool, bool]] = deque(maxlen=window_size)  # (failed, slow)
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(CircuitState.HALF_OPEN, "open timeout elapsed")
+        return self._state
+
+    @property
+    def available(self) -> bool:
+        """Пропустит ли breaker следующий вызов."""
+        state = self.state
+        return state == CircuitState.CLOSED or (
+            state == CircuitState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls
+        )
+
+    def before_call(self) -> None:
+        """Разрешить вызов или отклонить его.
+
+        Raises:
+            CircuitOpenError: Breaker разомкнут или лимит пробных вызовов исчерпан
+        """
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return
+        if state == CircuitState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return
+        self.rejected += 1
+        raise CircuitOpenError()
+
+    def record(self, success: bool, duration: float) -> None:
+        """Учесть результат разрешённого вызова."""
+        if self._state == CircuitState.HALF_OPEN:
+            self._half_open_calls = max(0, self._half_open_calls - 1)
+            if success:
+                self._transition(CircuitState.CLOSED, "probe call succeeded")
+            else:
+                self._transition(CircuitState.OPEN, "probe call failed")
+            return
+
+        self._calls.append((not success, duration >= self.slow_call_seconds))
+        if self._state != CircuitState.CLOSED or len(self._calls) < self.min_calls:
+            return
+
+        total = len(self._calls)
+        failures = sum(1 for failed, _ in self._calls if failed)
+        slow = sum(1 for _, is_slow in self._calls if is_slow)
+        if failures / total >= self.failure_rate:
+            self._transition(CircuitState.OPEN, f"{failures}/{total} calls failed")
+        elif slow / total >= self.slow_call_rate:
+            self._transition(CircuitState.OPEN, f"{slow}/{total} calls slower than {self.slow_call_seconds}s")
+
+    def release(self) -> None:
+        """Вызов прерван без результата (например, отменён)."""
+        if self._state == CircuitState.HALF_OPEN:
+            self._half_open_calls = max(0, self._half_open_calls - 1)
+
+    def on_health(self, healthy: bool) -> None:
+        """Учесть результат фоновой health-проверки."""
+        if not healthy:
+            if self._state != CircuitState.OPEN:
+                self._transition(CircuitState.OPEN, "health check failed")
+            else:
+                self._opened_at = time.monotonic()
+        elif self._state == CircuitState.OPEN:
+            self._transition(CircuitState.HALF_OPEN, "health check passed")
+
+    def _transition(self, state: CircuitState, reason: str) -> None:
+        if state == self._state:
+            return
+        logger.warning(f"Runner circuit {self._state.value} -> {state.value}: {reason}")
+        self._state = state
+        self._half_open_calls = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CircuitState.CLOSED:
+            self._calls.clear()
+
+
+@dataclass
+class RunnerHealth:
+    """Последний результат health-проверки Runner."""
+
+    healthy: bool
+    status: str
+    checked_at: float  # time.monotonic()
+    latency: float  # секунды
+
+
+class HealthProber:
+    """Периодически вызывает health_check и сообщает результат breaker."""
+
+    def __init__(
+        self,
+        check: Callable[[], Awaitable[tuple[bool, str]]],
+        breaker: CircuitBreaker,
+        interval: float,
+    ) -> None:
+        self.check = check
+        self.breaker = breaker
+        self.interval = interval
+        self.health: RunnerHealth | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running or self.interval <= 0:
+            return
+        self._task = asyncio.create_task(self._run(), name="runner-health-prober")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def probe(self) -> RunnerHealth:
+        """Выполнить одну проверку и обновить состояние."""
+        started = time.monotonic()
+        healthy, status = await self.check()
+        self.health = RunnerHealth(
+            healthy=healthy,
+            status=status,
+            checked_at=time.monotonic(),
+            latency=time.monotonic() - started,
+        )
+        self.breaker.on_health(healthy)
+        return self.health
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe()
+            except Exception:
+                logger.exception("Runner health probe failed")
+            await asyncio.sleep(self.interval)
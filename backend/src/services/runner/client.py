@@ -1,18 +1,36 @@
 """Runner API client."""
 
 import asyncio
+import functools
 import json
+import random
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import AsyncIterator
+from typing import Any, AsyncIterator
 
 import aiohttp
 
 from src.core.logging import get_logger
+from .balancer import STRATEGY_P2C, NodeBalancer, RunnerNode
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, HealthProber
+from .constructor_cache import ConstructorCache
+from .cv_presence import CVPresenceCache
 from .models import StreamMessage, TaskResult
+from .sse import SSEDecoder, SSEError, SSEEvent
 
 logger = get_logger(__name__)
 
+# Статусы задачи Runner в ответе /result
+_TASK_DONE_STATUSES = frozenset({"completed", "done", "success"})
+_TASK_FAILED_STATUSES = frozenset({"failed", "error", "cancelled"})
+
+# Сколько последних задач помнить для привязки к узлу Runner
+_TASK_NODES_MAX_SIZE = 10000
+
 
 @dataclass
 class TaskResponse:
@@ -24,12 +42,100 @@ class TaskResponse:
     stream_url: str
 
 
+def _to_stream_message(event: SSEEvent, task_id: str | None) -> StreamMessage:
+    """Преобразовать событие SSE в StreamMessage."""
+    logger.debug(f"SSE event: {event.event} id={event.id!r} size={len(event.data)}")
+
+    try:
+        msg = json.loads(event.data)
+    except json.JSONDecodeError:
+        return StreamMessage(type="result", content=event.data.strip())
+    if not isinstance(msg, dict):
+        return StreamMessage(type="result", content=event.data.strip())
+
+    default_type = event.event if event.event != "message" else "result"
+    msg_type = msg.get("type", default_type)
+    msg_content = msg.get("content", "")
+
+    if msg_type == "error" and not msg_content:
+        msg_content = "Неизвестная ошибка сервера"
+
+    # Обработка bot_output с дополнительными полями
+    if msg_type == "bot_output":
+        return StreamMessage(
+            type="bot_output",
+            content=msg_content,
+            output_type=msg.get("output_type"),
+            filename=msg.get("filename"),
+            caption=msg.get("caption"),
+            format=msg.get("format"),  # "markdown" | None
+            metadata=msg,  # Сохраняем весь JSON для доступа к track_cost полям
+        )
+
+    # Обработка track_cost события
+    if msg_type == "track_cost":
+        return StreamMessage(
+            type="track_cost",
+            content="",
+            track_cost_data=msg,
+        )
+
+    # Передаём task_id в complete/done сообщениях
+    return StreamMessage(
+        type=msg_type,
+        content=msg_content,
+        metadata=msg.get("metadata"),
+        task_id=task_id if msg_type in ("done", "complete") else None,
+    )
+
+
+async def _iter_sse(response: aiohttp.ClientResponse, decoder: SSEDecoder) -> AsyncIterator[SSEEvent]:
+    """События SSE из тела ответа."""
+    async for chunk in response.content.iter_any():
+        for event in decoder.feed(chunk):
+            yield event
+    for event in decoder.flush():
+        yield event
+
+
+async def _wait_cancelled(cancel: asyncio.Event, delay: float) -> bool:
+    """Подождать delay секунд. Returns: True если за это время пришла отмена."""
+    try:
+        await asyncio.wait_for(cancel.wait(), timeout=delay)
+        return True
+    except TimeoutError:
+        return False
+
+
 class BaseRunnerClient(ABC):
     """Абстрактный клиент для Runner API.
 
     Позволяет заменить реализацию без изменения бизнес-логики.
     """
 
+    # Хуки жизненного цикла необязательны: по умолчанию ничего не делают
+    async def start(self) -> None:  # noqa: B027
+        """Подготовить клиент к работе (вызывается при старте бота)."""
+
+    async def close(self) -> None:  # noqa: B027
+        """Освободить ресурсы клиента (вызывается при остановке бота)."""
+
+    # Кэш наличия CV есть не у всех клиентов: по умолчанию хуки ничего не делают
+    def remember_cv_exists(self, user_id: int, exists: bool) -> None:  # noqa: B027
+        """Запомнить известное боту наличие CV (например, после анализа /cv)."""
+
+    def forget_cv_exists(self, user_id: int) -> None:  # noqa: B027
+        """Сбросить закэшированное наличие CV (например, при загрузке нового)."""
+
+    def remember_constructor_file_id(  # noqa: B027
+        self, telegram_id: int, version: str, file_id: str
+    ) -> None:
+        """Запомнить Telegram file_id отправленного конструктора версии version."""
+
+    def cached_health(self) -> tuple[bool, str] | None:
+        """Последний результат фоновой health-проверки, если он свежий."""
+        return None
+
     @abstractmethod
     async def health_check(self) -> tuple[bool, str]:
         """Проверка доступности Runner."""
@@ -79,29 +185,201 @@ class BaseRunnerClient(ABC):
 
 
 class RunnerClient(BaseRunnerClient):
-    """HTTP клиент для HHH Runner API."""
+    """HTTP клиент для HHH Runner API.
+
+    Все запросы идут через одну долгоживущую aiohttp-сессию: соединения
+    с Runner переиспользуются (keep-alive), DNS кэшируется на dns_cache_ttl
+    секунд. Сессия создаётся в start() или лениво при первом запросе
+    и закрывается в close().
+
+    Запросы (кроме health_check) проходят через circuit breaker: пока Runner
+    недоступен, методы сразу возвращают ошибку вместо ожидания таймаутов.
+    Фоновый health-пробер (запускается в start()) размыкает и восстанавливает
+    breaker и хранит последний статус Runner.
+
+    Если задано несколько endpoints, у каждого узла свой breaker и пробер,
+    а новые задачи распределяются NodeBalancer. Стрим и результат задачи
+    запрашиваются у узла, который её создал. Данные пользователя (CV,
+    конструктор) узлы должны хранить в общем хранилище.
+    """
 
-    def __init__(self, base_url: str, api_key: str):
-        self.base_url = base_url
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        pool_limit: int = 100,
+        pool_limit_per_host: int = 30,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        stream_max_reconnects: int = 5,
+        stream_backoff_base: float = 1.0,
+        stream_backoff_max: float = 30.0,
+        result_poll_timeout: float = 300.0,
+        cv_presence: CVPresenceCache | None = None,
+        constructor_cache: ConstructorCache | None = None,
+        breaker_factory: Callable[[], CircuitBreaker] | None = None,
+        health_probe_interval: float = 15.0,
+        endpoints: list[str] | None = None,
+        balance_strategy: str = STRATEGY_P2C,
+    ):
+        urls = list(dict.fromkeys(url.rstrip("/") for url in (endpoints or [base_url])))
+        self.base_url = urls[0]
         self.api_key = api_key
+        self.pool_limit = pool_limit
+        self.pool_limit_per_host = pool_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.stream_max_reconnects = stream_max_reconnects
+        self.stream_backoff_base = stream_backoff_base
+        self.stream_backoff_max = stream_backoff_max
+        self.result_poll_timeout = result_poll_timeout
+        self.cv_presence = cv_presence
+        self.constructor_cache = constructor_cache if constructor_cache is not None else ConstructorCache(max_size=0)
+        self.nodes = [
+            RunnerNode(url, breaker=breaker_factory() if breaker_factory is not None else None) for url in urls
+        ]
+        for node in self.nodes:
+            if node.breaker is not None:
+                node.prober = HealthProber(
+                    functools.partial(self._check_node, node), node.breaker, health_probe_interval
+                )
+        self.balancer = NodeBalancer(self.nodes, balance_strategy)
+        self._task_nodes: OrderedDict[str, RunnerNode] = OrderedDict()
+        self._cv_refreshes: dict[int, asyncio.Task[None]] = {}
+        self._session: aiohttp.ClientSession | None = None
         self._cancel_flags: dict[int, asyncio.Event] = {}
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Общая сессия с пулом соединений (создаётся при первом обращении)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    @asynccontextmanager
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        node: RunnerNode | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Запрос к узлу Runner через его circuit breaker.
+
+        Args:
+            path: Путь относительно base_url узла
+            node: Узел; None — выбрать балансировщиком
+
+        Ошибкой для breaker считаются сетевые ошибки, таймауты и HTTP 5xx;
+        длительность — время до получения заголовков ответа.
+
+        Raises:
+            CircuitOpenError: Breaker разомкнут (запрос не отправлялся)
+        """
+        node = node or self.balancer.pick()
+        breaker = node.breaker
+        if breaker is not None:
+            breaker.before_call()
+        started = time.monotonic()
+        recorded = False
+
+        def record(success: bool) -> None:
+            nonlocal recorded
+            recorded = True
+            duration = time.monotonic() - started
+            node.observe(duration, success)
+            if breaker is not None:
+                breaker.record(success, duration)
+
+        node.outstanding += 1
+        try:
+            async with self._get_session().request(method, f"{node.base_url}{path}", **kwargs) as response:
+                record(response.status < 500)
+                yield response
+        except (aiohttp.ClientError, TimeoutError):
+            if not recorded:
+                record(False)
+            raise
+        finally:
+            node.outstanding -= 1
+            if not recorded and breaker is not None:
+                breaker.release()
+
+    def _remember_task_node(self, task_id: str, node: RunnerNode) -> None:
+        self._task_nodes[task_id] = node
+        self._task_nodes.move_to_end(task_id)
+        while len(self._task_nodes) > _TASK_NODES_MAX_SIZE:
+            self._task_nodes.popitem(last=False)
+
+    def _task_node(self, task_id: str | None) -> RunnerNode | None:
+        """Узел, создавший задачу (None — неизвестен, выберет балансировщик)."""
+        if task_id is None:
+            return None
+        node = self._task_nodes.get(task_id)
+        if node is None and len(self.nodes) > 1:
+            logger.warning(f"Unknown Runner node for task {task_id}, routing via balancer")
+        return node
+
+    async def start(self) -> None:
+        """Открыть пул соединений заранее и запустить health-пробер."""
+        self._get_session()
+        logger.info(f"Runner client session opened for {', '.join(node.base_url for node in self.nodes)}")
+        for node in self.nodes:
+            if node.prober is not None:
+                node.prober.start()
+
+    async def close(self) -> None:
+        """Остановить health-пробер и закрыть пул соединений."""
+        for node in self.nodes:
+            if node.prober is not None:
+                await node.prober.stop()
+        for task in list(self._cv_refreshes.values()):
+            task.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Runner client session closed")
+        self._session = None
+
     async def health_check(self) -> tuple[bool, str]:
-        """Проверка health endpoint."""
+        """Проверка health endpoint: Runner доступен, если здоров хотя бы один узел."""
+        if len(self.nodes) == 1:
+            return await self._check_node(self.nodes[0])
+
+        results = await asyncio.gather(*(self._check_node(node) for node in self.nodes))
+        for healthy, status in results:
+            if healthy:
+                return True, status
+        return False, "; ".join(f"{node.base_url}: {status}" for node, (_, status) in zip(self.nodes, results, strict=True))
+
+    async def _check_node(self, node: RunnerNode) -> tuple[bool, str]:
+        """Проверка health endpoint узла (в обход breaker)."""
+        started = time.monotonic()
+        healthy, status = await self._fetch_health(node)
+        if healthy:
+            node.observe_latency(time.monotonic() - started)
+        return healthy, status
+
+    async def _fetch_health(self, node: RunnerNode) -> tuple[bool, str]:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/health",
-                    headers={"X-API-Key": self.api_key},
-                    timeout=aiohttp.ClientTimeout(total=10),
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        status = data.get("status", "unknown")
-                        if status == "healthy":
-                            return True, "healthy"
-                        return False, f"status: {status}"
-                    return False, f"HTTP {response.status}"
+            session = self._get_session()
+            async with session.get(
+                f"{node.base_url}/health",
+                headers={"X-API-Key": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=10),
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    status = data.get("status", "unknown")
+                    if status == "healthy":
+                        return True, "healthy"
+                    return False, f"status: {status}"
+                return False, f"HTTP {response.status}"
         except aiohttp.ClientError as e:
             return False, f"{type(e).__name__}"
         except TimeoutError:
@@ -114,32 +392,37 @@ class RunnerClient(BaseRunnerClient):
         endpoint: str,
         data: aiohttp.FormData,
     ) -> TaskResponse | str:
-        """Создать задачу на Runner."""
+        """Создать задачу на Runner (узел выбирает балансировщик)."""
+        node = self.balancer.pick()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}{endpoint}",
-                    data=data,
-                    headers={"X-API-Key": self.api_key},
-                    timeout=aiohttp.ClientTimeout(total=30),
-                ) as response:
-                    if response.status != 200:
-                        # Попытаемся получить detail из JSON для более понятной ошибки
-                        try:
-                            error_data = await response.json()
-                            error_msg = error_data.get("detail", f"HTTP {response.status}")
-                        except Exception:
-                            error_msg = f"HTTP {response.status}"
-                        logger.error(f"Runner API error: {error_msg}")
-                        return error_msg
-
-                    resp_data = await response.json()
-                    return TaskResponse(
-                        task_id=resp_data["task_id"],
-                        status=resp_data["status"],
-                        queue_position=resp_data.get("queue_position", 0),
-                        stream_url=resp_data["stream_url"],
-                    )
+            async with self._request(
+                "POST",
+                endpoint,
+                node,
+                data=data,
+                headers={"X-API-Key": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=30),
+            ) as response:
+                if response.status != 200:
+                    # Попытаемся получить detail из JSON для более понятной ошибки
+                    try:
+                        error_data = await response.json()
+                        error_msg = error_data.get("detail", f"HTTP {response.status}")
+                    except Exception:
+                        error_msg = f"HTTP {response.status}"
+                    logger.error(f"Runner API error: {error_msg}")
+                    return error_msg
+
+                resp_data = await response.json()
+                self._remember_task_node(resp_data["task_id"], node)
+                return TaskResponse(
+                    task_id=resp_data["task_id"],
+                    status=resp_data["status"],
+                    queue_position=resp_data.get("queue_position", 0),
+                    stream_url=resp_data["stream_url"],
+                )
+        except CircuitOpenError as e:
+            return str(e)
         except aiohttp.ClientError as e:
             return f"{type(e).__name__}: {e}"
         except KeyError as e:
@@ -152,112 +435,194 @@ class RunnerClient(BaseRunnerClient):
         stream_url: str,
         user_id: int,
     ) -> AsyncIterator[StreamMessage]:
-        """SSE стрим задачи."""
-        self._cancel_flags[user_id] = asyncio.Event()
-        full_url = f"{self.base_url}{stream_url}"
+        """SSE стрим задачи с автоматическим переподключением.
+
+        При обрыве соединения (таймаут чтения, сброс прокси) стрим
+        переоткрывается с экспоненциальной задержкой и заголовком
+        Last-Event-ID (последний id события, иначе последний BotOutput.index).
+        Повторно присланные bot_output с уже доставленным index пропускаются;
+        bot_output без index, доставленные после точки возобновления, узнаются
+        по хэшу содержимого в порядке доставки и тоже пропускаются.
+        Если переподключиться не удалось, результат забирается через
+        get_result(task_id), чтобы не терять уже оплаченную работу.
+        """
+        cancel = self._cancel_flags[user_id] = asyncio.Event()
 
         # Извлекаем task_id из URL: /api/tasks/{task_id}/stream
         task_id = stream_url.split("/")[3] if "/tasks/" in stream_url else None
+        # Стрим читаем с узла, создавшего задачу
+        node = self._task_node(task_id) or self.balancer.pick()
+        full_url = f"{node.base_url}{stream_url}"
 
         logger.info(f"Starting stream from {full_url}")
 
-        try:
-            # Увеличиваем таймаут для долгих операций и читаем чанками для больших SSE
-            timeout = aiohttp.ClientTimeout(total=600, sock_read=120)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(
-                    full_url,
-                    headers={"X-API-Key": self.api_key},
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Stream error: HTTP {response.status}, body: {error_text[:200]}")
-                        yield StreamMessage(type="error", content=f"HTTP {response.status}: {error_text[:100]}")
-                        return
-
-                    has_data = False
-                    buffer = b""
-
-                    # Читаем чанками, чтобы избежать "Chunk too big"
-                    async for chunk in response.content.iter_chunked(1024 * 1024):  # 1 МБ чанки
-                        if self._cancel_flags[user_id].is_set():
-                            yield StreamMessage(type="cancelled", content="")
-                            return
+        last_event_id = ""
+        delivered_indexes: set[int] = set()
+        delivered_texts: set[str] = set()
+        # Хэши bot_output без index, доставленных после точки возобновления
+        unanchored: list[int] = []
+        server_retry: int | None = None
+        has_data = False
+        failures = 0
+        last_error = ""
 
-                        buffer += chunk
-
-                        # Разбиваем buffer на строки
-                        while b"\n" in buffer:
-                            line_bytes, buffer = buffer.split(b"\n", 1)
-
-                            try:
-                                line_str = line_bytes.decode("utf-8").strip()
-                            except UnicodeDecodeError:
-                                logger.warning("Failed to decode SSE line, skipping")
-                                continue
-
-                            if not line_str:
-                                continue
-
-                            logger.info(f"SSE line: {line_str[:200]}")
-
-                            if line_str.startswith("data: "):
-                                has_data = True
-                                try:
-                                    msg = json.loads(line_str[6:])
-                                    msg_type = msg.get("type", "result")
-                                    msg_content = msg.get("content", "")
-
-                                    if msg_type == "error" and not msg_content:
-                                        msg_content = "Неизвестная ошибка сервера"
-
-                                    # Обработка bot_output с дополнительными полями
-                                    if msg_type == "bot_output":
-                                        yield StreamMessage(
-                                            type="bot_output",
-                                            content=msg_content,
-                                            output_type=msg.get("output_type"),
-                                            filename=msg.get("filename"),
-                                            caption=msg.get("caption"),
-                                            format=msg.get("format"),  # "markdown" | None
-                                            metadata=msg,  # Сохраняем весь JSON для доступа к track_cost полям
-                                        )
+        try:
+            while True:
+                headers = {"X-API-Key": self.api_key}
+                resume_from = last_event_id or (str(max(delivered_indexes)) if delivered_indexes else "")
+                if resume_from:
+                    headers["Last-Event-ID"] = resume_from
+                # Сервер может прислать их повторно — в том же порядке
+                replay, replayed = list(unanchored), 0
+
+                try:
+                    # Увеличиваем таймаут для долгих операций
+                    timeout = aiohttp.ClientTimeout(total=600, sock_read=120)
+                    async with self._request("GET", stream_url, node, headers=headers, timeout=timeout) as response:
+                        if response.status != 200:
+                            error_text = await response.text()
+                            logger.error(f"Stream error: HTTP {response.status}, body: {error_text[:200]}")
+                            if not has_data and failures == 0:
+                                yield StreamMessage(
+                                    type="error", content=f"HTTP {response.status}: {error_text[:100]}"
+                                )
+                                return
+                            # Стрим уже недоступен для переподключения — забираем результат
+                            last_error = f"HTTP {response.status}"
+                            break
+
+                        decoder = SSEDecoder()
+                        async for event in _iter_sse(response, decoder):
+                            if cancel.is_set():
+                                yield StreamMessage(type="cancelled", content="")
+                                return
+
+                            has_data = True
+                            failures = 0
+                            if event.id and event.id != last_event_id:
+                                last_event_id = event.id
+                                # Всё после новой точки возобновления ещё не доставлялось
+                                unanchored.clear()
+                                replay = []
+                            server_retry = event.retry
+
+                            message = _to_stream_message(event, task_id)
+                            if message.type == "bot_output":
+                                index = (message.metadata or {}).get("index")
+                                if isinstance(index, int):
+                                    if index in delivered_indexes:
+                                        logger.debug(f"Skipping duplicate bot_output index={index}")
                                         continue
-
-                                    # Обработка track_cost события
-                                    if msg_type == "track_cost":
-                                        yield StreamMessage(
-                                            type="track_cost",
-                                            content="",
-                                            track_cost_data=msg,
-                                        )
+                                    delivered_indexes.add(index)
+                                    if not last_event_id:
+                                        unanchored.clear()
+                                        replay = []
+                                elif not event.id:
+                                    key = hash((message.output_type, message.content))
+                                    if replayed < len(replay) and replay[replayed] == key:
+                                        replayed += 1
+                                        logger.debug("Skipping replayed bot_output without index")
                                         continue
+                                    replayed = len(replay)
+                                    unanchored.append(key)
+                                if message.output_type == "text":
+                                    delivered_texts.add(message.content)
 
-                                    # Передаём task_id в complete/done сообщениях
-                                    yield StreamMessage(
-                                        type=msg_type,
-                                        content=msg_content,
-                                        metadata=msg.get("metadata"),
-                                        task_id=task_id if msg_type in ("done", "complete") else None,
-                                    )
-                                    if msg_type in ("done", "complete"):
-                                        return
-                                except json.JSONDecodeError:
-                                    yield StreamMessage(type="result", content=line_str[6:])
-
-                    if not has_data:
-                        logger.warning("Stream ended without data")
-                        yield StreamMessage(type="error", content="Стрим завершился без данных")
+                            yield message
+                            if message.type in ("done", "complete"):
+                                return
 
-        except aiohttp.ClientError as e:
-            logger.error(f"Stream client error: {e}")
-            yield StreamMessage(type="error", content=f"Ошибка соединения: {type(e).__name__}")
+                        if cancel.is_set():
+                            yield StreamMessage(type="cancelled", content="")
+                            return
+                        last_error = "стрим закрыт до завершения задачи"
+                        logger.warning(f"Stream closed before completion: {full_url}")
+
+                except (aiohttp.ClientError, TimeoutError) as e:
+                    last_error = str(e) if isinstance(e, CircuitOpenError) else type(e).__name__
+                    logger.warning(f"Stream interrupted: {last_error}: {e}")
+
+                failures += 1
+                if failures > self.stream_max_reconnects:
+                    break
+
+                delay = self._reconnect_delay(failures, server_retry)
+                logger.info(
+                    f"Reconnecting stream in {delay:.1f}s "
+                    f"(attempt {failures}/{self.stream_max_reconnects}, resume from {resume_from or '-'})"
+                )
+                if await _wait_cancelled(cancel, delay):
+                    yield StreamMessage(type="cancelled", content="")
+                    return
+
+            # Переподключиться не удалось: пробуем забрать готовый результат
+            if task_id is None:
+                yield StreamMessage(type="error", content=f"Ошибка соединения: {last_error}")
+                return
+
+            logger.warning(f"Stream for task {task_id} lost ({last_error}), falling back to get_result")
+            result = await self._wait_result(task_id, cancel)
+            if cancel.is_set():
+                yield StreamMessage(type="cancelled", content="")
+                return
+            if isinstance(result, str):
+                yield StreamMessage(type="error", content=f"Ошибка соединения: {result}")
+                return
+
+            if result.content and result.content not in delivered_texts:
+                yield StreamMessage(
+                    type="bot_output",
+                    content=result.content,
+                    output_type="text",
+                    metadata={"type": "bot_output", "output_type": "text", "content": result.content},
+                )
+            yield StreamMessage(type="complete", content="", task_id=task_id)
+
+        except SSEError as e:
+            logger.error(f"Stream decode error: {e}")
+            yield StreamMessage(type="error", content="Ответ сервера слишком большой")
         except Exception as e:
             logger.exception(f"Stream unexpected error: {e}")
             yield StreamMessage(type="error", content=f"Ошибка: {e}")
         finally:
             self._cancel_flags.pop(user_id, None)
 
+    def _reconnect_delay(self, attempt: int, server_retry: int | None) -> float:
+        """Экспоненциальная задержка с jitter; retry от сервера (мс) — нижняя граница."""
+        delay = min(self.stream_backoff_max, self.stream_backoff_base * 2.0 ** (attempt - 1))
+        delay *= random.uniform(0.5, 1.0)
+        if server_retry is not None:
+            delay = max(delay, server_retry / 1000)
+        return delay
+
+    async def _wait_result(self, task_id: str, cancel: asyncio.Event) -> TaskResult | str:
+        """Дождаться завершения задачи через get_result.
+
+        Returns:
+            TaskResult завершённой задачи или строка ошибки
+        """
+        deadline = asyncio.get_running_loop().time() + self.result_poll_timeout
+        attempt = 0
+        error = "timeout"
+
+        while True:
+            result = await self.get_result(task_id)
+            if isinstance(result, TaskResult):
+                if result.status in _TASK_DONE_STATUSES:
+                    return result
+                if result.status in _TASK_FAILED_STATUSES:
+                    return result.content or f"задача завершилась со статусом {result.status}"
+                error = f"задача не завершена ({result.status})"
+            else:
+                error = result
+
+            attempt += 1
+            delay = self._reconnect_delay(attempt, None)
+            if asyncio.get_running_loop().time() + delay > deadline:
+                return error
+            if await _wait_cancelled(cancel, delay):
+                return "cancelled"
+
     async def cancel_stream(self, user_id: int) -> bool:
         """Отменить активный стрим для пользователя."""
         if user_id in self._cancel_flags:
@@ -268,24 +633,25 @@ class RunnerClient(BaseRunnerClient):
     async def get_result(self, task_id: str) -> TaskResult | str:
         """Получить результат задачи (JSON с content)."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/api/tasks/{task_id}/result",
-                    headers={"X-API-Key": self.api_key},
-                    timeout=aiohttp.ClientTimeout(total=30),
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Get result error: HTTP {response.status}, body: {error_text[:200]}")
-                        return f"HTTP {response.status}"
-
-                    data = await response.json()
-                    return TaskResult(
-                        task_id=data.get("task_id", task_id),
-                        status=data.get("status", "unknown"),
-                        result_file=data.get("result_file"),
-                        content=data.get("content", ""),
-                    )
+            async with self._request(
+                "GET",
+                f"/api/tasks/{task_id}/result",
+                self._task_node(task_id),
+                headers={"X-API-Key": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=30),
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"Get result error: HTTP {response.status}, body: {error_text[:200]}")
+                    return f"HTTP {response.status}"
+
+                data = await response.json()
+                return TaskResult(
+                    task_id=data.get("task_id", task_id),
+                    status=data.get("status", "unknown"),
+                    result_file=data.get("result_file"),
+                    content=data.get("content", ""),
+                )
         except aiohttp.ClientError as e:
             logger.error(f"Get result client error: {e}")
             return f"{type(e).__name__}: {e}"
@@ -296,18 +662,19 @@ class RunnerClient(BaseRunnerClient):
     async def download_result(self, task_id: str) -> bytes | str:
         """Скачать файл результата."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/api/tasks/{task_id}/result/download",
-                    headers={"X-API-Key": self.api_key},
-                    timeout=aiohttp.ClientTimeout(total=60),
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Download result error: HTTP {response.status}, body: {error_text[:200]}")
-                        return f"HTTP {response.status}"
-
-                    return await response.read()
+            async with self._request(
+                "GET",
+                f"/api/tasks/{task_id}/result/download",
+                self._task_node(task_id),
+                headers={"X-API-Key": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=60),
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"Download result error: HTTP {response.status}, body: {error_text[:200]}")
+                    return f"HTTP {response.status}"
+
+                return await response.read()
         except aiohttp.ClientError as e:
             logger.error(f"Download result client error: {e}")
             return f"{type(e).__name__}: {e}"
@@ -332,24 +699,25 @@ class RunnerClient(BaseRunnerClient):
                 content_type="text/plain; charset=utf-8",
             )
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/api/constructor-user",
-                    data=form,
-                    headers={"X-API-Key": self.api_key},
-                    timeout=aiohttp.ClientTimeout(total=60),
-                ) as response:
-                    data = await response.json()
-
-                    if response.status == 200:
-                        return data
-
-                    detail = data.get("detail", {})
-                    if isinstance(detail, dict):
-                        error_code = detail.get("error_code", "UNKNOWN")
-                        error_msg = detail.get("message", f"HTTP {response.status}")
-                        return f"{error_code}: {error_msg}"
-                    return f"HTTP {response.status}: {detail}"
+            async with self._request(
+                "POST",
+                "/api/constructor-user",
+                data=form,
+                headers={"X-API-Key": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=60),
+            ) as response:
+                data = await response.json()
+
+                if response.status == 200:
+                    self.constructor_cache.invalidate(telegram_id)
+                    return data
+
+                detail = data.get("detail", {})
+                if isinstance(detail, dict):
+                    error_code = detail.get("error_code", "UNKNOWN")
+                    error_msg = detail.get("message", f"HTTP {response.status}")
+                    return f"{error_code}: {error_msg}"
+                return f"HTTP {response.status}: {detail}"
 
         except aiohttp.ClientError as e:
             logger.error(f"Upload constructor client error: {e}")
@@ -359,26 +727,46 @@ class RunnerClient(BaseRunnerClient):
             return str(e)
 
     async def download_constructor(self, telegram_id: int) -> dict | str:
-        """Скачать текущий конструктор (user или auto)."""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/api/constructor-user",
-                    params={"telegram_id": str(telegram_id)},
-                    headers={"X-API-Key": self.api_key},
-                    timeout=aiohttp.ClientTimeout(total=30),
-                ) as response:
-                    data = await response.json()
+        """Скачать текущий конструктор (user или auto).
 
-                    if response.status == 200:
-                        return data
+        Запрос условный: при закэшированном ETag отправляется If-None-Match,
+        и на 304 возвращается кэш. К ответу добавляются "version" и
+        "file_id" (Telegram file_id документа этой версии, если он уже
+        отправлялся — см. remember_constructor_file_id).
+        """
+        cached = self.constructor_cache.get(telegram_id)
+        headers = {"X-API-Key": self.api_key}
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
 
-                    detail = data.get("detail", {})
-                    if isinstance(detail, dict):
-                        error_code = detail.get("error_code", "UNKNOWN")
-                        error_msg = detail.get("message", f"HTTP {response.status}")
-                        return f"{error_code}: {error_msg}"
-                    return f"HTTP {response.status}: {detail}"
+        try:
+            async with self._request(
+                "GET",
+                "/api/constructor-user",
+                params={"telegram_id": str(telegram_id)},
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=30),
+            ) as response:
+                if response.status == 304 and cached is not None:
+                    self.constructor_cache.revalidated += 1
+                    return cached.as_response()
+
+                data = await response.json()
+
+                if response.status == 200:
+                    self.constructor_cache.fetched += 1
+                    entry = self.constructor_cache.put(telegram_id, data, response.headers.get("ETag"))
+                    return entry.as_response()
+
+                if response.status == 404:
+                    self.constructor_cache.invalidate(telegram_id)
+
+                detail = data.get("detail", {})
+                if isinstance(detail, dict):
+                    error_code = detail.get("error_code", "UNKNOWN")
+                    error_msg = detail.get("message", f"HTTP {response.status}")
+                    return f"{error_code}: {error_msg}"
+                return f"HTTP {response.status}: {detail}"
 
         except aiohttp.ClientError as e:
             logger.error(f"Download constructor client error: {e}")
@@ -387,27 +775,32 @@ class RunnerClient(BaseRunnerClient):
             logger.exception(f"Download constructor unexpected error: {e}")
             return str(e)
 
+    def remember_constructor_file_id(self, telegram_id: int, version: str, file_id: str) -> None:
+        """Запомнить Telegram file_id отправленного конструктора версии version."""
+        self.constructor_cache.set_file_id(telegram_id, version, file_id)
+
     async def reset_constructor(self, telegram_id: int) -> dict | str:
         """Удалить пользовательский конструктор."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.delete(
-                    f"{self.base_url}/api/constructor-user",
-                    params={"telegram_id": str(telegram_id)},
-                    headers={"X-API-Key": self.api_key},
-                    timeout=aiohttp.ClientTimeout(total=10),
-                ) as response:
-                    data = await response.json()
-
-                    if response.status == 200:
-                        return data
-
-                    detail = data.get("detail", {})
-                    if isinstance(detail, dict):
-                        error_code = detail.get("error_code", "UNKNOWN")
-                        error_msg = detail.get("message", f"HTTP {response.status}")
-                        return f"{error_code}: {error_msg}"
-                    return f"HTTP {response.status}: {detail}"
+            async with self._request(
+                "DELETE",
+                "/api/constructor-user",
+                params={"telegram_id": str(telegram_id)},
+                headers={"X-API-Key": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=10),
+            ) as response:
+                data = await response.json()
+
+                if response.status == 200:
+                    self.constructor_cache.invalidate(telegram_id)
+                    return data
+
+                detail = data.get("detail", {})
+                if isinstance(detail, dict):
+                    error_code = detail.get("error_code", "UNKNOWN")
+                    error_msg = detail.get("message", f"HTTP {response.status}")
+                    return f"{error_code}: {error_msg}"
+                return f"HTTP {response.status}: {detail}"
 
         except aiohttp.ClientError as e:
             logger.error(f"Reset constructor client error: {e}")
@@ -416,33 +809,109 @@ class RunnerClient(BaseRunnerClient):
             logger.exception(f"Reset constructor unexpected error: {e}")
             return str(e)
 
+    def cached_health(self) -> tuple[bool, str] | None:
+        """Последние результаты health-проберов, не старше двух интервалов.
+
+        Runner здоров, если здоров хотя бы один узел; None — свежих данных нет.
+        """
+        now = time.monotonic()
+        fresh = [
+            node.prober.health
+            for node in self.nodes
+            if node.prober is not None
+            and node.prober.health is not None
+            and now - node.prober.health.checked_at <= 2 * node.prober.interval
+        ]
+        if not fresh:
+            return None
+        for health in fresh:
+            if health.healthy:
+                return True, health.status
+        return False, fresh[0].status
+
+    def remember_cv_exists(self, user_id: int, exists: bool) -> None:
+        """Записать наличие CV в кэш."""
+        if self.cv_presence is not None:
+            self.cv_presence.put(user_id, exists)
+
+    def forget_cv_exists(self, user_id: int) -> None:
+        """Сбросить наличие CV в кэше."""
+        if self.cv_presence is not None:
+            self.cv_presence.invalidate(user_id)
+
     async def check_cv_exists(self, user_id: int) -> bool:
         """Проверить наличие CV через GET /api/cv/{user_id}.
 
+        Ответ берётся из кэша cv_presence, если он есть; запись, близкая
+        к истечению, обновляется в фоне.
+
         Graceful degradation: если endpoint не готов или ошибка,
         возвращаем True чтобы не блокировать пользователей.
+        Такие ответы не кэшируются.
+        """
+        cache = self.cv_presence
+        if cache is None:
+            exists = await self._fetch_cv_exists(user_id)
+            return True if exists is None else exists
+
+        cached = cache.get(user_id)
+        if cached is not None:
+            exists, refresh_due = cached
+            if refresh_due:
+                self._schedule_cv_refresh(user_id)
+            return exists
+
+        token = cache.read_token()
+        exists = await self._fetch_cv_exists(user_id)
+        if exists is None:
+            return True
+        cache.put(user_id, exists, token)
+        return exists
+
+    def _schedule_cv_refresh(self, user_id: int) -> None:
+        """Обновить запись кэша в фоне (не больше одного запроса на пользователя)."""
+        if user_id in self._cv_refreshes:
+            return
+        task = asyncio.create_task(self._refresh_cv_exists(user_id), name=f"cv-presence-{user_id}")
+        self._cv_refreshes[user_id] = task
+        task.add_done_callback(lambda _: self._cv_refreshes.pop(user_id, None))
+
+    async def _refresh_cv_exists(self, user_id: int) -> None:
+        cache = self.cv_presence
+        if cache is None:
+            return
+        token = cache.read_token()
+        exists = await self._fetch_cv_exists(user_id)
+        if exists is not None:
+            cache.put(user_id, exists, token)
+
+    async def _fetch_cv_exists(self, user_id: int) -> bool | None:
+        """Запросить наличие CV у Runner.
+
+        Returns:
+            True/False по ответу Runner, None если ответ не удалось получить
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/api/cv/{user_id}",
-                    headers={"X-API-Key": self.api_key},
-                    timeout=aiohttp.ClientTimeout(total=10),
-                ) as response:
-                    if response.status == 200:
-                        return True
-                    elif response.status == 404:
-                        return False
-                    else:
-                        # Graceful degradation: если endpoint не готов
-                        logger.warning(
-                            f"CV check returned unexpected status {response.status}, "
-                            f"allowing apply to proceed"
-                        )
-                        return True
+            async with self._request(
+                "GET",
+                f"/api/cv/{user_id}",
+                headers={"X-API-Key": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=10),
+            ) as response:
+                if response.status == 200:
+                    return True
+                elif response.status == 404:
+                    return False
+                else:
+                    # Graceful degradation: если endpoint не готов
+                    logger.warning(
+                        f"CV check returned unexpected status {response.status}, "
+                        f"allowing apply to proceed"
+                    )
+                    return None
         except aiohttp.ClientError as e:
             logger.warning(f"CV check connection error: {e}, allowing apply to proceed")
-            return True
+            return None
         except Exception as e:
             logger.warning(f"CV check error: {e}, allowing apply to proceed")
-            return True
+            return None
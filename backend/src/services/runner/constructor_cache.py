@@ -0,0 +1,82 @@
+"""Кэш конструкторов откликов по telegram_id.
+
+Хранит последний ответ GET /api/constructor-user вместе с версией (ETag
+Runner или хэш содержимого) и file_id документа, уже отправленного в
+Telegram. Запросы к Runner остаются, но идут с If-None-Match, а неизменный
+конструктор пересылается по file_id без повторной загрузки байтов.
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class CachedConstructor:
+    """Закэшированный конструктор пользователя."""
+
+    data: dict[str, Any]  # JSON ответа Runner (content, constructor_type, filename)
+    version: str
+    etag: str | None = None
+    file_id: str | None = None  # Telegram file_id отправленного документа
+
+    def as_response(self) -> dict[str, Any]:
+        """Ответ Runner, дополненный version и file_id."""
+        return {**self.data, "version": self.version, "file_id": self.file_id}
+
+
+def content_version(data: dict[str, Any]) -> str:
+    """Версия конструктора по содержимому, если Runner не прислал ETag."""
+    digest = hashlib.sha256()
+    for key in ("constructor_type", "filename", "content"):
+        digest.update(str(data.get(key, "")).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+class ConstructorCache:
+    """LRU кэш конструкторов (до max_size пользователей)."""
+
+    def __init__(self, max_size: int = 500) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[int, CachedConstructor] = OrderedDict()
+        self.revalidated = 0  # 304 от Runner
+        self.fetched = 0  # полные ответы
+
+    def get(self, telegram_id: int) -> CachedConstructor | None:
+        entry = self._entries.get(telegram_id)
+        if entry is not None:
+            self._entries.move_to_end(telegram_id)
+        return entry
+
+    def put(self, telegram_id: int, data: dict[str, Any], etag: str | None) -> CachedConstructor:
+        """Сохранить свежий ответ Runner.
+
+        file_id сохраняется, если версия не изменилась.
+        """
+        version = etag or content_version(data)
+        previous = self._entries.get(telegram_id)
+        file_id = previous.file_id if previous is not None and previous.version == version else None
+
+        entry = CachedConstructor(data=data, version=version, etag=etag, file_id=file_id)
+        if self.max_size <= 0:
+            return entry
+
+        self._entries[telegram_id] = entry
+        self._entries.move_to_end(telegram_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return entry
+
+    def set_file_id(self, telegram_id: int, version: str, file_id: str) -> None:
+        """Запомнить file_id документа, отправленного для этой версии."""
+        entry = self._entries.get(telegram_id)
+        if entry is not None and entry.version == version:
+            entry.file_id = file_id
+
+    def invalidate(self, telegram_id: int) -> None:
+        self._entries.pop(telegram_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
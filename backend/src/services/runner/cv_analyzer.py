@@ -1,11 +1,13 @@
 """CV Analyzer service."""
 
-from typing import AsyncIterator
+from collections.abc import AsyncGenerator
 
 import aiohttp
 
+from .admission import AdmissionController, admitted_stream
 from .client import BaseRunnerClient, TaskResponse
 from .models import CVFile, StreamMessage
+from .result_cache import ResultCache, recording, replay
 
 
 class CVAnalyzer:
@@ -13,19 +15,54 @@ class CVAnalyzer:
 
     ENDPOINT = "/analyze-cv"
 
-    def __init__(self, runner: BaseRunnerClient):
+    def __init__(
+        self,
+        runner: BaseRunnerClient,
+        admission: AdmissionController | None = None,
+        result_cache: ResultCache | None = None,
+    ):
         self.runner = runner
+        self.admission = admission
+        self.result_cache = result_cache
 
     async def analyze(
         self,
         cv_file: CVFile,
         telegram_id: int,
-    ) -> AsyncIterator[StreamMessage]:
+        use_cache: bool = True,
+    ) -> AsyncGenerator[StreamMessage, None]:
         """Запустить анализ CV.
 
         1. POST /analyze-cv -> получаем task_id и stream_url
         2. GET stream_url -> SSE стрим результатов
+
+        При занятых слотах admission сначала отдаёт сообщения type="queue"
+        с позицией в очереди. Если включён result_cache и use_cache=True,
+        сохранённый результат для того же входа отдаётся без нового трека.
         """
+        stream = self._run(cv_file, telegram_id)
+        cache = self.result_cache
+        if cache is not None and cache.enabled:
+            digest = cv_file.sha256
+            key = cache.cv_key(telegram_id, digest)
+            # Повтор возможен, только если в Runner сейчас это же CV
+            if use_cache and cache.current_cv(telegram_id) == digest:
+                cached = cache.get(key)
+                if cached is not None:
+                    async for message in replay(cached):
+                        yield message
+                    return
+            cache.note_cv_upload(telegram_id, digest)
+            stream = recording(cache, key, stream)
+
+        async for message in admitted_stream(self.admission, telegram_id, stream):
+            yield message
+
+    async def _run(
+        self,
+        cv_file: CVFile,
+        telegram_id: int,
+    ) -> AsyncGenerator[StreamMessage, None]:
         form = aiohttp.FormData()
         form.add_field(
             "file",
@@ -56,4 +93,5 @@ class CVAnalyzer:
 
     async def cancel(self, telegram_id: int) -> bool:
         """Отменить анализ."""
-        return await self.runner.cancel_stream(telegram_id)
+        dequeued = self.admission.cancel(telegram_id) if self.admission else False
+        return await self.runner.cancel_stream(telegram_id) or dequeued
@@ -0,0 +1,107 @@
+"""Кэш наличия CV пользователя в Runner.
+
+Хранит положительные и отрицательные ответы GET /api/cv/{user_id} с разными
+TTL. Запись обновляется локально, когда бот сам знает ответ: сбрасывается
+при загрузке нового CV и выставляется после успешного анализа /cv.
+"""
+
+import time
+from collections import OrderedDict
+
+
+class CVPresenceCache:
+    """LRU + TTL кэш «есть ли CV у пользователя».
+
+    get() сообщает, что запись близка к истечению (осталось меньше
+    refresh_ahead доли TTL), чтобы клиент обновил её в фоне, не заставляя
+    пользователя ждать Runner.
+
+    Запись из запроса, начатого до invalidate()/put() для этого пользователя,
+    отклоняется по read_token(), как в UserSnapshotCache.
+    """
+
+    def __init__(
+        self,
+        positive_ttl: float,
+        negative_ttl: float,
+        refresh_ahead: float = 0.2,
+        max_size: int = 10000,
+    ) -> None:
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.refresh_ahead = refresh_ahead
+        self.max_size = max_size
+        # user_id -> (expires_at, refresh_at, exists)
+        self._entries: OrderedDict[int, tuple[float, float, bool]] = OrderedDict()
+        self._generation = 0
+        self._changed: dict[int, int] = {}
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> tuple[bool, bool] | None:
+        """Получить закэшированный ответ.
+
+        Returns:
+            (exists, refresh_due) или None, если записи нет или она истекла
+        """
+        entry = self._entries.get(user_id)
+        now = time.monotonic()
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        expires_at, refresh_at, exists = entry
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return exists, refresh_at <= now
+
+    def read_token(self) -> int:
+        """Токен, который берётся перед запросом к Runner."""
+        return self._generation
+
+    def put(self, user_id: int, exists: bool, token: int | None = None) -> bool:
+        """Сохранить ответ.
+
+        Args:
+            token: read_token() на момент начала запроса; None — ответ
+                известен локально и записывается безусловно
+
+        Returns:
+            True если ответ сохранён
+        """
+        if self.max_size <= 0:
+            return False
+        if token is not None and (token < self._floor or self._changed.get(user_id, 0) > token):
+            return False
+        if token is None:
+            self._mark_changed(user_id)
+
+        ttl = self.positive_ttl if exists else self.negative_ttl
+        if ttl <= 0:
+            self._entries.pop(user_id, None)
+            return False
+
+        now = time.monotonic()
+        self._entries[user_id] = (now + ttl, now + ttl * (1 - self.refresh_ahead), exists)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, user_id: int) -> None:
+        """Забыть ответ и отклонить начатые до этого запросы."""
+        self._entries.pop(user_id, None)
+        self._mark_changed(user_id)
+
+    def _mark_changed(self, user_id: int) -> None:
+        self._generation += 1
+        self._changed[user_id] = self._generation
+        if len(self._changed) > max(self.max_size, 1):
+            self._changed.clear()
+            self._floor = self._generation
+
+    def __len__(self) -> int:
+        return len(self._entries)
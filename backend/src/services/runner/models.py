@@ -1,5 +1,6 @@
 """Models for Runner service."""
 
+import hashlib
 from dataclasses import dataclass
 from enum import Enum
 
@@ -141,6 +142,11 @@ class CVFile:
     MAX_SIZE = 1 * 1024 * 1024  # 1 MB
     ALLOWED_EXTENSIONS = {".pdf", ".txt"}
 
+    @property
+    def sha256(self) -> str:
+        """SHA-256 содержимого файла (hex)."""
+        return hashlib.sha256(self.content).hexdigest()
+
     @classmethod
     def validate(cls, content: bytes, filename: str, mime_type: str) -> "CVFile | FileValidationError":
         """Валидация файла CV."""
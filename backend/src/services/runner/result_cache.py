@@ -0,0 +1,198 @@
+"""Content-addressed cache of Runner track results.
+
+Повторный /apply на ту же вакансию или повторная отправка того же CV
+отдают сохранённые bot_output события вместо нового (платного) трека.
+Ключ — хэш входа: для /apply нормализованный URL вакансии плюс версия CV
+и конструктора пользователя, для /cv — SHA-256 байтов файла.
+
+Версии входов отслеживаются в процессе бота: загрузка CV и изменение
+конструктора меняют ключи /apply, поэтому старые результаты перестают
+находиться, а не возвращаются устаревшими.
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from src.core.logging import get_logger
+
+from .models import StreamMessage
+
+logger = get_logger(__name__)
+
+# Результаты крупнее не кэшируются (суммарный размер content)
+MAX_ENTRY_BYTES = 1024 * 1024
+
+_HH_VACANCY = re.compile(r"(?:^|\.)hh\.ru$", re.IGNORECASE)
+_VACANCY_ID = re.compile(r"/vacancy/(\d+)")
+
+
+def normalize_vacancy_url(url: str) -> str:
+    """Привести URL вакансии к каноническому виду.
+
+    https://www.hh.ru/vacancy/123?from=... и http://hh.ru/vacancy/123 дают
+    "hh.ru/vacancy/123".
+    """
+    parts = urlsplit(url.strip())
+    host = parts.hostname or ""
+    match = _VACANCY_ID.search(parts.path)
+    if _HH_VACANCY.search(host) and match:
+        return f"hh.ru/vacancy/{match.group(1)}"
+    return f"{host.lower().removeprefix('www.')}{parts.path.rstrip('/')}"
+
+
+@dataclass
+class UserInputs:
+    """Версии входных данных пользователя, влияющих на результат /apply."""
+
+    # Номер из общего счётчика кэша, меняется при смене CV или конструктора
+    version: int
+    cv_digest: str | None = None
+
+
+@dataclass
+class CachedResult:
+    """Сохранённый результат трека."""
+
+    messages: list[StreamMessage]
+    expires_at: float
+
+
+class ResultCache:
+    """LRU + TTL кэш результатов треков с счётчиками hits/misses.
+
+    Выключен при ttl_seconds <= 0 или max_size <= 0.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[str, CachedResult] = OrderedDict()
+        self._inputs: OrderedDict[int, UserInputs] = OrderedDict()
+        self._version_seq = 0
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def apply_key(self, user_id: int, vacancy_url: str) -> str:
+        """Ключ результата /apply."""
+        inputs = self._user_inputs(user_id)
+        return _digest(
+            "apply",
+            str(user_id),
+            normalize_vacancy_url(vacancy_url),
+            inputs.cv_digest or "",
+            str(inputs.version),
+        )
+
+    def cv_key(self, user_id: int, cv_digest: str) -> str:
+        """Ключ результата /cv."""
+        return _digest("cv", str(user_id), cv_digest)
+
+    def current_cv(self, user_id: int) -> str | None:
+        """SHA-256 последнего CV, отправленного пользователем в Runner."""
+        inputs = self._inputs.get(user_id)
+        return inputs.cv_digest if inputs is not None else None
+
+    def note_cv_upload(self, user_id: int, cv_digest: str) -> None:
+        """CV отправлено в Runner: меняется CV и автоконструктор."""
+        inputs = self._user_inputs(user_id)
+        inputs.cv_digest = cv_digest
+        inputs.version = self._next_version()
+
+    def note_constructor_change(self, user_id: int) -> None:
+        """Пользователь загрузил или сбросил конструктор."""
+        self._user_inputs(user_id).version = self._next_version()
+
+    def get(self, key: str) -> list[StreamMessage] | None:
+        """Получить сохранённые сообщения результата."""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        logger.info(f"Result cache hit ({self.hits} hits / {self.misses} misses)")
+        return entry.messages
+
+    def put(self, key: str, messages: list[StreamMessage]) -> bool:
+        """Сохранить результат.
+
+        Returns:
+            True если результат сохранён
+        """
+        if not self.enabled or not messages:
+            return False
+        size = sum(len(m.content or "") for m in messages)
+        if size > MAX_ENTRY_BYTES:
+            logger.debug(f"Result not cached: {size} bytes")
+            return False
+
+        self._entries[key] = CachedResult(messages=messages, expires_at=time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        self.stored += 1
+        return True
+
+    def _user_inputs(self, user_id: int) -> UserInputs:
+        inputs = self._inputs.get(user_id)
+        if inputs is None:
+            # Номера версий не повторяются: после вытеснения записи пользователь
+            # получает новый номер, и ключи /apply, посчитанные для прежних
+            # CV и конструктора, больше не совпадут
+            inputs = self._inputs[user_id] = UserInputs(version=self._next_version())
+        self._inputs.move_to_end(user_id)
+        while len(self._inputs) > max(self.max_size, 1) * 4:
+            self._inputs.popitem(last=False)
+        return inputs
+
+    def _next_version(self) -> int:
+        self._version_seq += 1
+        return self._version_seq
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+async def replay(messages: list[StreamMessage]) -> AsyncGenerator[StreamMessage, None]:
+    """Отдать сохранённый результат как стрим.
+
+    Финальное сообщение complete помечено metadata["cached"] = True:
+    сервисы не списывают токены за повтор.
+    """
+    for message in messages:
+        yield message
+    yield StreamMessage(type="complete", content="", metadata={"cached": True})
+
+
+async def recording(
+    cache: ResultCache,
+    key: str,
+    stream: AsyncGenerator[StreamMessage, None],
+) -> AsyncGenerator[StreamMessage, None]:
+    """Пропустить стрим насквозь и сохранить bot_output, если трек завершился."""
+    outputs: list[StreamMessage] = []
+    async with aclosing(stream):
+        async for message in stream:
+            if message.type == "bot_output" and message.output_type in ("text", "file"):
+                outputs.append(message)
+            elif message.type in ("done", "complete"):
+                cache.put(key, outputs)
+            yield message
@@ -1,9 +1,10 @@
 """Skills Analyzer service."""
 
-from typing import AsyncIterator
+from collections.abc import AsyncGenerator
 
 import aiohttp
 
+from .admission import AdmissionController, admitted_stream
 from .client import BaseRunnerClient
 from .models import StreamMessage
 
@@ -13,14 +14,15 @@ class SkillsAnalyzer:
 
     ENDPOINT = "/api/skills/analyze"
 
-    def __init__(self, runner: BaseRunnerClient):
+    def __init__(self, runner: BaseRunnerClient, admission: AdmissionController | None = None):
         self.runner = runner
+        self.admission = admission
 
     async def analyze(
         self,
         vacancy_urls: list[str],
         telegram_id: int,
-    ) -> AsyncIterator[StreamMessage]:
+    ) -> AsyncGenerator[StreamMessage, None]:
         """Запустить анализ навыков по списку вакансий.
 
         1. POST /api/skills/analyze -> получаем task_id и stream_url
@@ -29,7 +31,19 @@ class SkillsAnalyzer:
         Args:
             vacancy_urls: Список URL вакансий на hh.ru (до 20 штук)
             telegram_id: Telegram ID пользователя
+
+        При занятых слотах admission сначала отдаёт сообщения type="queue"
+        с позицией в очереди.
         """
+        stream = self._run(vacancy_urls, telegram_id)
+        async for message in admitted_stream(self.admission, telegram_id, stream):
+            yield message
+
+    async def _run(
+        self,
+        vacancy_urls: list[str],
+        telegram_id: int,
+    ) -> AsyncGenerator[StreamMessage, None]:
         form = aiohttp.FormData()
         # Передаём список URL каждый с новой строки (API ожидает vacancies_list)
         form.add_field("vacancies_list", "\n".join(vacancy_urls))
@@ -56,4 +70,5 @@ class SkillsAnalyzer:
 
     async def cancel(self, telegram_id: int) -> bool:
         """Отменить анализ навыков."""
-        return await self.runner.cancel_stream(telegram_id)
+        dequeued = self.admission.cancel(telegram_id) if self.admission else False
+        return await self.runner.cancel_stream(telegram_id) or dequeued
@@ -0,0 +1,186 @@
+"""Incremental Server-Sent Events decoder.
+
+Разбор по спецификации WHATWG (text/event-stream): поля data/event/id/retry,
+многострочный data, комментарии, окончания строк LF, CRLF и CR.
+Байты копятся в одном bytearray; уже просмотренная часть незавершённой
+строки повторно не сканируется, поэтому большие события (файлы в bot_output)
+разбираются за линейное время.
+"""
+
+from dataclasses import dataclass
+
+DEFAULT_MAX_EVENT_SIZE = 32 * 1024 * 1024  # 32 МБ
+
+
+class SSEError(ValueError):
+    """Поток нарушает ограничения декодера (например, слишком большое событие)."""
+
+
+@dataclass
+class SSEEvent:
+    """Событие SSE после dispatch."""
+
+    data: str
+    event: str = "message"
+    id: str = ""  # last event id на момент dispatch
+    retry: int | None = None  # последнее значение retry (мс), если было
+
+
+class SSEDecoder:
+    """Потоковый декодер text/event-stream.
+
+    Использование:
+        decoder = SSEDecoder()
+        async for chunk in response.content.iter_any():
+            for event in decoder.feed(chunk):
+                ...
+        for event in decoder.flush():
+            ...
+
+    Память ограничена max_event_size: незавершённая строка вместе с уже
+    накопленным data текущего события не может превысить этот размер,
+    иначе feed() бросает SSEError.
+    """
+
+    def __init__(self, max_event_size: int = DEFAULT_MAX_EVENT_SIZE) -> None:
+        self.max_event_size = max_event_size
+        self.last_event_id = ""
+        self.retry: int | None = None
+        self._buffer = bytearray()
+        self._scan_from = 0  # до этой позиции в буфере конца строки нет
+        self._data: list[bytes] = []
+        self._data_size = 0
+        self._event_type = ""
+
+    def feed(self, chunk: bytes) -> list[SSEEvent]:
+        """Принять очередной кусок потока и вернуть завершённые события."""
+        self._buffer += chunk
+        events: list[SSEEvent] = []
+
+        buffer = self._buffer
+        start = 0
+        with memoryview(buffer) as view:
+            while True:
+                size = len(buffer)
+                newline = buffer.find(b"\n", self._scan_from)
+                carriage = buffer.find(b"\r", self._scan_from, size if newline == -1 else newline)
+                if carriage != -1:
+                    # CR в самом конце буфера может оказаться началом CRLF: ждём данных
+                    if carriage == size - 1:
+                        self._scan_from = carriage
+                        break
+                    end = carriage
+                    next_start = carriage + 2 if buffer[carriage + 1] == 0x0A else carriage + 1
+                elif newline != -1:
+                    end = newline
+                    next_start = newline + 1
+                else:
+                    self._scan_from = size
+                    break
+
+                event = self._process_line(buffer, view, start, end)
+                if event is not None:
+                    events.append(event)
+                start = next_start
+                self._scan_from = start
+
+        if start:
+            # Один сдвиг на чанк, а не на каждую строку
+            del buffer[:start]
+            self._scan_from -= start
+
+        if len(buffer) + self._data_size > self.max_event_size:
+            size = len(buffer) + self._data_size
+            self._reset_event()
+            buffer.clear()
+            self._scan_from = 0
+            raise SSEError(f"SSE event exceeds {self.max_event_size} bytes ({size})")
+
+        return events
+
+    def flush(self) -> list[SSEEvent]:
+        """Завершить поток.
+
+        По спецификации незавершённое событие в конце потока отбрасывается.
+        Здесь последняя строка без перевода строки и событие без финальной
+        пустой строки всё же доставляются: Runner может закрыть соединение
+        сразу после последнего data, и терять done/complete нельзя.
+        """
+        events: list[SSEEvent] = []
+        if self._buffer:
+            tail = self._buffer
+            if tail.endswith(b"\r"):
+                del tail[-1:]
+            with memoryview(tail) as view:
+                event = self._process_line(tail, view, 0, len(tail))
+            if event is not None:
+                events.append(event)
+        event = self._dispatch()
+        if event is not None:
+            events.append(event)
+        self._buffer = bytearray()
+        self._scan_from = 0
+        return events
+
+    def _process_line(
+        self,
+        buffer: bytearray,
+        view: memoryview,
+        start: int,
+        end: int,
+    ) -> SSEEvent | None:
+        if start == end:
+            return self._dispatch()
+
+        if buffer[start] == 0x3A:  # ":" — комментарий
+            return None
+
+        colon = buffer.find(b":", start, end)
+        if colon == -1:
+            name = bytes(view[start:end])
+            value_start = end
+        else:
+            name = bytes(view[start:colon])
+            value_start = colon + 1
+            if value_start < end and buffer[value_start] == 0x20:
+                value_start += 1
+
+        if name == b"data":
+            value = bytes(view[value_start:end])
+            self._data.append(value)
+            self._data_size += len(value) + 1
+        elif name == b"event":
+            self._event_type = bytes(view[value_start:end]).decode("utf-8", errors="replace")
+        elif name == b"id":
+            value = bytes(view[value_start:end])
+            if b"\x00" not in value:
+                self.last_event_id = value.decode("utf-8", errors="replace")
+        elif name == b"retry":
+            value = bytes(view[value_start:end])
+            if value.isdigit():
+                self.retry = int(value)
+        # Неизвестные поля игнорируются
+        return None
+
+    def _dispatch(self) -> SSEEvent | None:
+        if not self._data:
+            self._event_type = ""
+            return None
+
+        if len(self._data) == 1:
+            data = self._data[0].decode("utf-8", errors="replace")
+        else:
+            data = b"\n".join(self._data).decode("utf-8", errors="replace")
+        event = SSEEvent(
+            data=data,
+            event=self._event_type or "message",
+            id=self.last_event_id,
+            retry=self.retry,
+        )
+        self._reset_event()
+        return event
+
+    def _reset_event(self) -> None:
+        self._data = []
+        self._data_size = 0
+        self._event_type = ""
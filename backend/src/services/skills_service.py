@@ -1,18 +1,25 @@
 """Skills analysis service with billing integration."""
 
 import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, aclosing
 from dataclasses import dataclass
+from typing import Any
 
 from aiogram import Bot
-from aiogram.exceptions import TelegramNetworkError
+from aiogram.exceptions import TelegramAPIError, TelegramNetworkError
 from aiogram.types import BufferedInputFile
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.exceptions import (
     InsufficientBalanceError,
     SubscriptionExpiredError,
 )
 from src.core.logging import get_logger
+from src.db.session import get_session
 from src.services.runner import SkillsAnalyzer, BotOutputType, StreamMessage
+from src.services.stream_pipeline import pipelined
+from src.services.stream_renderer import StreamingTextRenderer
 from src.services.token_service import TokenService
 
 logger = get_logger(__name__)
@@ -20,9 +27,6 @@ logger = get_logger(__name__)
 # Стоимость анализа навыков в токенах
 SKILLS_COST = 1
 
-# Лимит длины сообщения Telegram
-MAX_MESSAGE_LENGTH = 4096
-
 # Retry настройки
 MAX_RETRIES = 3
 RETRY_DELAY = 1.0  # секунд
@@ -45,17 +49,21 @@ class SkillsService:
     - Координация SkillsAnalyzer
     - Обработка bot_output событий
     - Списание токенов после успешного анализа
+
+    Соединение с БД не удерживается во время стрима Runner: проверка
+    доступа и списание идут через короткие сессии session_factory.
     """
 
     def __init__(
         self,
-        token_service: TokenService,
         skills_analyzer: SkillsAnalyzer,
         bot: Bot,
+        session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]] = get_session,
     ):
-        self.token_service = token_service
+        self.session_factory = session_factory
         self.skills_analyzer = skills_analyzer
         self.bot = bot
+        self._queue_message_id: int | None = None  # Сообщение с позицией в очереди
 
     async def check_access(self, user_id: int) -> tuple[bool, str | None]:
         """Проверить доступ пользователя к анализу навыков.
@@ -63,7 +71,8 @@ class SkillsService:
         Returns:
             (can_access, error_message)
         """
-        return await self.token_service.can_spend(user_id, SKILLS_COST)
+        async with self.session_factory() as session:
+            return await TokenService(session).can_spend(user_id, SKILLS_COST)
 
     async def analyze_skills(
         self,
@@ -96,32 +105,44 @@ class SkillsService:
         success = False
         task_id: str | None = None
 
+        renderer = StreamingTextRenderer(self.bot, chat_id, call=self._send_with_retry)
         try:
-            async for message in self.skills_analyzer.analyze(vacancy_urls, user_id):
-                result = await self._handle_stream_message(message, chat_id)
-
-                if result == "error":
-                    return SkillsResult(success=False, error=message.content)
-                elif result == "cancelled":
-                    return SkillsResult(success=False, error="Отменено")
-                elif result == "complete":
-                    success = True
-                    task_id = message.task_id
-                    break
+            async with aclosing(pipelined(self.skills_analyzer.analyze(vacancy_urls, user_id))) as messages:
+                async for message in messages:
+                    if message.type in ("error", "cancelled", "done", "complete"):
+                        # Дописать накопленный текст до сообщений об итоге трека
+                        await renderer.finish()
+                    result = await self._handle_stream_message(message, chat_id, renderer)
+
+                    if result == "error":
+                        return SkillsResult(success=False, error=message.content)
+                    elif result == "cancelled":
+                        return SkillsResult(success=False, error="Отменено")
+                    elif result == "complete":
+                        success = True
+                        task_id = message.task_id
+                        break
+
+            # Стрим закончился без complete
+            await renderer.finish()
 
         except Exception as e:
             logger.exception(f"Skills analysis failed: {e}")
             return SkillsResult(success=False, error=str(e))
+        finally:
+            renderer.close()
 
         # 3. Списание токенов при успехе
         if success:
             try:
-                await self.token_service.spend_tokens(
-                    user_id=user_id,
-                    amount=SKILLS_COST,
-                    description="Анализ навыков",
-                    metadata={"task_id": task_id, "vacancy_count": len(vacancy_urls)},
-                )
+                # Короткая сессия только на списание
+                async with self.session_factory() as session:
+                    await TokenService(session).spend_tokens(
+                        user_id=user_id,
+                        amount=SKILLS_COST,
+                        description="Анализ навыков",
+                        metadata={"task_id": task_id, "vacancy_count": len(vacancy_urls)},
+                    )
                 return SkillsResult(success=True, tokens_spent=SKILLS_COST)
             except (InsufficientBalanceError, SubscriptionExpiredError) as e:
                 # Race condition: баланс изменился во время анализа
@@ -138,6 +159,7 @@ class SkillsService:
         self,
         message: StreamMessage,
         chat_id: int,
+        renderer: StreamingTextRenderer,
     ) -> str:
         """Обработать сообщение из стрима.
 
@@ -154,25 +176,41 @@ class SkillsService:
         if message.type in ("done", "complete"):
             return "complete"
 
+        if message.type == "queue":
+            await self._show_queue_position(chat_id, message.content)
+            return "continue"
+
         if message.type == "progress":
             # Пропускаем технические прогресс-сообщения
             return "continue"
 
         if message.type == "bot_output":
-            await self._handle_bot_output(message, chat_id)
+            await self._handle_bot_output(message, chat_id, renderer)
             return "continue"
 
         if message.type == "result" and message.content:
             # Legacy: текстовый результат
-            await self._send_text_safe(chat_id, message.content)
+            await renderer.append(message.content)
             return "continue"
 
         return "continue"
 
+    async def _show_queue_position(self, chat_id: int, text: str) -> None:
+        """Показать позицию в очереди admission, обновляя одно сообщение."""
+        try:
+            if self._queue_message_id is None:
+                sent = await self.bot.send_message(chat_id, text)
+                self._queue_message_id = sent.message_id
+            else:
+                await self.bot.edit_message_text(text, chat_id=chat_id, message_id=self._queue_message_id)
+        except TelegramAPIError as e:
+            logger.warning(f"Failed to show queue position: {e}")
+
     async def _handle_bot_output(
         self,
         message: StreamMessage,
         chat_id: int,
+        renderer: StreamingTextRenderer,
     ) -> None:
         """Обработать bot_output событие."""
         output = message.as_bot_output()
@@ -184,9 +222,11 @@ class SkillsService:
             if output.content:
                 # Конвертируем format от Runner в parse_mode для Telegram
                 parse_mode = "Markdown" if output.format == "markdown" else None
-                await self._send_text_safe(chat_id, output.content, parse_mode=parse_mode)
+                await renderer.append(output.content, parse_mode=parse_mode)
 
         elif output.output_type == BotOutputType.FILE and output.content and output.filename:
+            # Документ идёт после уже выведенного текста, следующий текст — новым сообщением
+            await renderer.break_message()
             await self._send_document_safe(
                 chat_id=chat_id,
                 content=output.content,
@@ -194,30 +234,6 @@ class SkillsService:
                 caption=output.caption,
             )
 
-    async def _send_text_safe(
-        self,
-        chat_id: int,
-        text: str,
-        parse_mode: str | None = None,
-    ) -> None:
-        """Отправить текст, разбивая на части если нужно. С retry.
-
-        Args:
-            chat_id: ID чата
-            text: Текст сообщения
-            parse_mode: Режим парсинга ("Markdown", "MarkdownV2", "HTML" или None)
-        """
-        if len(text) <= MAX_MESSAGE_LENGTH:
-            await self._send_with_retry(
-                self.bot.send_message, chat_id, text, parse_mode=parse_mode
-            )
-        else:
-            for i in range(0, len(text), MAX_MESSAGE_LENGTH):
-                chunk = text[i : i + MAX_MESSAGE_LENGTH]
-                await self._send_with_retry(
-                    self.bot.send_message, chat_id, chunk, parse_mode=parse_mode
-                )
-
     async def _send_document_safe(
         self,
         chat_id: int,
@@ -234,13 +250,16 @@ class SkillsService:
             caption=caption,
         )
 
-    async def _send_with_retry(self, method, *args, **kwargs) -> None:
-        """Выполнить метод с retry при сетевых ошибках."""
+    async def _send_with_retry(self, method: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Выполнить метод с retry при сетевых ошибках.
+
+        Returns:
+            Результат метода Bot API
+        """
         last_error = None
         for attempt in range(MAX_RETRIES):
             try:
-                await method(*args, **kwargs)
-                return
+                return await method(*args, **kwargs)
             except TelegramNetworkError as e:
                 last_error = e
                 if attempt < MAX_RETRIES - 1:
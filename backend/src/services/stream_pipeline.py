@@ -0,0 +1,114 @@
+"""Decoupled Runner stream reading and Telegram delivery.
+
+Сервисы обрабатывают сообщения трека последовательно: пока отправка в
+Telegram ждёт retry, SSE-сокет Runner никто не читает, и долгий трек может
+упасть по sock_read таймауту. pipelined() читает стрим в отдельной задаче
+в ограниченную очередь, а потребитель (отправитель в Telegram) забирает
+сообщения в том же порядке.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
+from dataclasses import dataclass
+
+from src.core.logging import get_logger
+from src.services.runner import StreamMessage
+
+logger = get_logger(__name__)
+
+# Ёмкость очереди между чтением стрима и отправкой в Telegram
+DEFAULT_QUEUE_SIZE = 256
+
+# Типы сообщений, которые можно отбросить при переполнении очереди
+DROPPABLE_TYPES = frozenset({"progress"})
+
+
+@dataclass
+class PipelineStats:
+    """Метрики backpressure одного трека."""
+
+    received: int = 0  # прочитано из стрима
+    delivered: int = 0  # отдано отправителю
+    dropped: int = 0  # отброшено при полной очереди (только DROPPABLE_TYPES)
+    max_depth: int = 0  # максимальная длина очереди
+    blocked_seconds: float = 0.0  # сколько чтение ждало места в очереди
+
+
+@dataclass
+class _End:
+    """Маркер конца стрима (error — исключение чтения)."""
+
+    error: BaseException | None = None
+
+
+async def pipelined(
+    stream: AsyncGenerator[StreamMessage, None],
+    maxsize: int = DEFAULT_QUEUE_SIZE,
+    stats: PipelineStats | None = None,
+) -> AsyncGenerator[StreamMessage, None]:
+    """Читать stream в фоновой задаче и отдавать сообщения по порядку.
+
+    - Порядок сообщений сохраняется (одна задача чтения, FIFO очередь).
+    - При полной очереди progress-сообщения отбрасываются, остальные
+      ждут места (blocked_seconds).
+    - Исключение чтения пробрасывается потребителю после уже прочитанных
+      сообщений.
+    - Закрытие генератора (break/return потребителя, ошибка отправки,
+      отмена) отменяет чтение и закрывает исходный стрим.
+
+    Использовать через aclosing(), чтобы чтение останавливалось сразу:
+
+        async with aclosing(pipelined(analyzer.analyze(...))) as messages:
+            async for message in messages:
+                ...
+    """
+    stats = stats if stats is not None else PipelineStats()
+    queue: asyncio.Queue[StreamMessage | _End] = asyncio.Queue(maxsize)
+
+    async def read() -> None:
+        end = _End()
+        try:
+            async with aclosing(stream):
+                async for message in stream:
+                    stats.received += 1
+                    if queue.full():
+                        if message.type in DROPPABLE_TYPES:
+                            stats.dropped += 1
+                            continue
+                        started = time.monotonic()
+                        await queue.put(message)
+                        stats.blocked_seconds += time.monotonic() - started
+                    else:
+                        queue.put_nowait(message)
+                    stats.max_depth = max(stats.max_depth, queue.qsize())
+        except Exception as e:
+            end = _End(e)
+        await queue.put(end)
+
+    reader = asyncio.create_task(read(), name="runner-stream-reader")
+    try:
+        while True:
+            item = await queue.get()
+            if isinstance(item, _End):
+                if item.error is not None:
+                    raise item.error
+                return
+            stats.delivered += 1
+            yield item
+    finally:
+        if not reader.done():
+            reader.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await reader
+        summary = (
+            f"Stream pipeline: received={stats.received}, delivered={stats.delivered}, "
+            f"dropped={stats.dropped}, max_depth={stats.max_depth}, "
+            f"blocked={stats.blocked_seconds:.2f}s"
+        )
+        if stats.dropped or stats.blocked_seconds:
+            logger.info(summary)
+        else:
+            logger.debug(summary)
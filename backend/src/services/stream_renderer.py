@@ -0,0 +1,194 @@
+"""Progressive rendering of streamed text into Telegram messages.
+
+Текстовые bot_output трека дописываются в одно сообщение через
+editMessageText вместо отдельного send_message на каждое событие.
+Обновления дебаунсятся (пачка событий даёт одно редактирование), при
+достижении лимита длины текст переносится в новое сообщение по границе
+абзаца, строки или слова, не разрывая блоки ``` в Markdown.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Лимит длины сообщения Telegram
+MAX_MESSAGE_LENGTH = 4096
+
+# Минимальный интервал между редактированиями одного сообщения (секунд)
+EDIT_DEBOUNCE = 1.0
+
+# Разделитель между последовательными текстовыми выводами в одном сообщении
+PART_SEPARATOR = "\n\n"
+
+_FENCE = "```"
+
+
+def split_text(text: str, limit: int = MAX_MESSAGE_LENGTH, markdown: bool = False) -> list[str]:
+    """Разбить текст на части не длиннее limit.
+
+    Граница выбирается по убыванию предпочтения: пустая строка, перевод
+    строки, пробел, жёсткий разрез. В Markdown незакрытый блок ``` в конце
+    части закрывается и открывается заново в следующей.
+    """
+    chunks: list[str] = []
+    reopen = ""
+    # Запас под закрытие/открытие блока кода
+    budget = limit - (len(_FENCE) + 1) * 2 if markdown else limit
+    while len(reopen) + len(text) > limit:
+        window = budget - len(reopen)
+        cut = -1
+        for separator in (PART_SEPARATOR, "\n", " "):
+            cut = text.rfind(separator, 0, window)
+            if cut > window // 2:
+                break
+            cut = -1
+        if cut <= 0:
+            cut = window
+        chunk = reopen + text[:cut].rstrip()
+        text = text[cut:].lstrip("\n ")
+        reopen = ""
+        if markdown and chunk.count(_FENCE) % 2 == 1:
+            chunk += "\n" + _FENCE
+            reopen = _FENCE + "\n"
+        chunks.append(chunk)
+    if text:
+        chunks.append(reopen + text)
+    return chunks
+
+
+async def _call(method: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+    return await method(*args, **kwargs)
+
+
+class StreamingTextRenderer:
+    """Выводит текст трека в чат, редактируя одно сообщение.
+
+    Первый текст отправляется сразу, последующие дописываются в то же
+    сообщение не чаще раза в debounce секунд. Смена parse_mode, отправка
+    документа (break_message) или переполнение начинают новое сообщение.
+
+    Usage:
+        renderer = StreamingTextRenderer(bot, chat_id, call=self._send_with_retry)
+        await renderer.append("Текст", parse_mode="Markdown")
+        await renderer.finish()
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        chat_id: int,
+        call: Callable[..., Awaitable[Any]] = _call,
+        debounce: float = EDIT_DEBOUNCE,
+        max_length: int = MAX_MESSAGE_LENGTH,
+    ) -> None:
+        """
+        Args:
+            call: Обёртка вызова Bot API (например, _send_with_retry сервиса),
+                должна возвращать результат метода
+        """
+        self.bot = bot
+        self.chat_id = chat_id
+        self.call = call
+        self.debounce = debounce
+        self.max_length = max_length
+        self._text = ""  # Текущее сообщение целиком
+        self._rendered = ""  # Что уже показано в Telegram
+        self._parse_mode: str | None = None
+        self._message_id: int | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+        self._lock = asyncio.Lock()
+        self.sent = 0
+        self.edited = 0
+
+    async def append(self, text: str, parse_mode: str | None = None) -> None:
+        """Дописать текстовый вывод."""
+        if not text:
+            return
+        if self._text and parse_mode != self._parse_mode:
+            await self.break_message()
+        self._parse_mode = parse_mode
+
+        for piece in split_text(text, self.max_length, markdown=parse_mode is not None):
+            candidate = f"{self._text}{PART_SEPARATOR}{piece}" if self._text else piece
+            if len(candidate) > self.max_length:
+                await self.break_message()
+                self._parse_mode = parse_mode
+                candidate = piece
+            self._text = candidate
+
+        if self._message_id is None:
+            # Первый вывод показываем сразу
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def flush(self) -> None:
+        """Показать накопленный текст немедленно."""
+        if self._flush_task is not None:
+            # Таймер ещё спит: его работа выполняется здесь
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        async with self._lock:
+            text = self._text
+            if not text or text == self._rendered:
+                return
+            if self._message_id is None:
+                sent = await self._deliver(self.bot.send_message, self.chat_id, text)
+                self._message_id = sent.message_id
+                self.sent += 1
+            else:
+                await self._deliver(
+                    self.bot.edit_message_text, text, chat_id=self.chat_id, message_id=self._message_id
+                )
+                self.edited += 1
+            self._rendered = text
+
+    async def break_message(self) -> None:
+        """Завершить текущее сообщение: следующий текст пойдёт в новое."""
+        await self.flush()
+        self._text = ""
+        self._rendered = ""
+        self._message_id = None
+
+    async def finish(self) -> None:
+        """Показать остаток текста (вызывается в конце трека)."""
+        await self.break_message()
+        if self.sent or self.edited:
+            logger.debug(f"Rendered stream to chat {self.chat_id}: {self.sent} sent, {self.edited} edits")
+
+    def close(self) -> None:
+        """Отменить отложенное обновление без отправки."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.debounce)
+        # Отправку уже не отменяем: иначе сообщение может уйти без сохранённого message_id
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            # Текст останется неотрисованным и уйдёт при следующем flush/finish
+            logger.warning(f"Deferred stream render failed: {e}")
+
+    async def _deliver(self, method: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Вызвать метод Bot API с parse_mode, при ошибке разметки — без неё."""
+        try:
+            return await self.call(method, *args, parse_mode=self._parse_mode, **kwargs)
+        except TelegramBadRequest as e:
+            error = str(e).lower()
+            if "message is not modified" in error:
+                return None
+            if self._parse_mode is None or "can't parse" not in error:
+                raise
+            logger.warning(f"Falling back to plain text: {e}")
+            return await self.call(method, *args, parse_mode=None, **kwargs)
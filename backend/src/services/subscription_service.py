@@ -1,6 +1,10 @@
 """Subscription management service.
 
 M11: Updated to use tariff-based subscription fee and period.
+
+Scheduled tasks pass an outbox-mode NotificationService: notifications are
+enqueued in the same transaction as the subscription change they report,
+with dedupe keys so re-running a task does not notify twice.
 """
 
 import logging
@@ -14,7 +18,7 @@ from src.db.models.transaction import Transaction, TransactionType
 from src.db.models.user import User
 from src.db.repositories.tariff_repository import TariffRepository
 from src.db.repositories.transaction_repository import TransactionRepository
-from src.db.repositories.user_repository import UserRepository
+from src.db.repositories.user_repository import UserRepository, UserSnapshot
 from src.services.billing_service import calculate_subscription_end
 from src.services.notification_service import NotificationService
 
@@ -84,18 +88,22 @@ class SubscriptionService:
                 # Only notify if we're at or past this threshold
                 if days_left <= days:
                     try:
-                        # M11: Include balance and fee info
-                        success = await self.notification_service.notify_subscription_expiring(
-                            user.id,
-                            days_left,
-                            balance=user.token_balance,
-                            subscription_fee=subscription_fee,
-                        )
-                        if success:
-                            await self.user_repo.update_subscription_notification(
+                        # Notification and marker commit together or not at all
+                        async with self.session.begin_nested():
+                            # M11: Include balance and fee info
+                            success = await self.notification_service.notify_subscription_expiring(
                                 user.id,
                                 days_left,
+                                balance=user.token_balance,
+                                subscription_fee=subscription_fee,
+                                dedupe_key=f"expiring:{user.id}:{user.subscription_end:%Y-%m-%d}:{days_left}",
                             )
+                            if success:
+                                await self.user_repo.update_subscription_notification(
+                                    user.id,
+                                    days_left,
+                                )
+                        if success:
                             notified[days].append(user.id)
                             logger.info(
                                 "Sent expiry notification to user %d (days_left=%d)",
@@ -153,7 +161,9 @@ class SubscriptionService:
                 reason="insufficient_balance",
                 required=renewal_price,
                 available=user.token_balance,
+                dedupe_key=f"renewal_failed:{user_id}:{datetime.utcnow():%Y-%m-%d}",
             )
+            await self.session.commit()
             return False
 
         try:
@@ -187,16 +197,17 @@ class SubscriptionService:
             )
             await self.transaction_repo.create(transaction)
 
-            await self.session.commit()
-
-            # Send success notification
+            # Success notification commits together with the charge
             await self.notification_service.notify_renewal_success(
                 user_id,
                 new_end,
                 renewal_price,
                 updated_user.token_balance,
+                dedupe_key=f"renewal:{user_id}:{new_end:%Y-%m-%d}",
             )
 
+            await self.session.commit()
+
             logger.info(
                 "Successfully renewed subscription for user %d until %s",
                 user_id,
@@ -212,7 +223,9 @@ class SubscriptionService:
                 reason="system_error",
                 required=renewal_price,
                 available=user.token_balance,
+                dedupe_key=f"renewal_failed:{user_id}:{datetime.utcnow():%Y-%m-%d}",
             )
+            await self.session.commit()
             return False
 
     async def process_all_auto_renewals(self) -> dict[str, list[int]]:
@@ -260,15 +273,18 @@ class SubscriptionService:
 
         users = await self.user_repo.get_expired_subscriptions()
         expired_users: list[int] = []
+        today = datetime.utcnow().date()
 
         for user in users:
             try:
-                # M11: Notify with balance and fee info
-                await self.notification_service.notify_subscription_expired(
-                    user.id,
-                    subscription_fee=subscription_fee,
-                    balance=user.token_balance,
-                )
+                async with self.session.begin_nested():
+                    # M11: Notify with balance and fee info (at most once a day)
+                    await self.notification_service.notify_subscription_expired(
+                        user.id,
+                        subscription_fee=subscription_fee,
+                        balance=user.token_balance,
+                        dedupe_key=f"expired:{user.id}:{today:%Y-%m-%d}",
+                    )
                 expired_users.append(user.id)
                 logger.info("Subscription expired for user %d", user.id)
             except Exception as e:
@@ -278,13 +294,14 @@ class SubscriptionService:
                     e,
                 )
 
+        await self.session.commit()
         return expired_users
 
-    async def get_subscription_status(self, user: User) -> dict:
+    async def get_subscription_status(self, user: User | UserSnapshot) -> dict:
         """Get detailed subscription status for a user.
 
         Args:
-            user: User model
+            user: User model or its read-only snapshot
 
         Returns:
             Dict with subscription details
@@ -8,14 +8,10 @@ from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.exceptions import (
-    ConcurrentModificationError,
-    InsufficientBalanceError,
     NotFoundError,
-    OptimisticLockError,
     SubscriptionExpiredError,
     UserBlockedError,
 )
-from src.db.models.transaction import Transaction, TransactionType
 from src.db.repositories.transaction_repository import TransactionRepository
 from src.db.repositories.user_repository import UserRepository
 
@@ -122,14 +118,19 @@ class TokenService:
         amount: float,
         description: str,
         metadata: dict | None = None,
+        idempotency_key: str | None = None,
     ) -> SpendResult:
         """Spend tokens from user's balance.
 
+        Eligibility check, debit and ledger insert run as a single
+        statement (see UserRepository.spend_with_ledger).
+
         Args:
             user_id: Telegram user ID
             amount: Amount to spend (positive)
             description: Description for transaction
             metadata: Optional additional data
+            idempotency_key: Optional client key, recorded in transaction metadata
 
         Returns:
             SpendResult with transaction details
@@ -139,76 +140,57 @@ class TokenService:
             NotFoundError: User not found
             UserBlockedError: User is blocked
             SubscriptionExpiredError: No active subscription
-            InsufficientBalanceError: Not enough tokens
-            ConcurrentModificationError: Race condition detected
         """
         if amount <= 0:
             raise ValueError("Amount must be positive")
 
-        # Get user with current version for optimistic locking
-        user = await self.user_repo.get_by_id(user_id)
-        if not user:
-            raise NotFoundError(f"User {user_id} not found")
+        tx_metadata = dict(metadata or {})
+        if idempotency_key is not None:
+            tx_metadata["idempotency_key"] = idempotency_key
 
-        # Check blocked status
-        if user.is_blocked:
-            raise UserBlockedError(f"User {user_id} is blocked")
+        record = await self.user_repo.spend_with_ledger(
+            user_id=user_id,
+            amount=amount,
+            description=description,
+            metadata=tx_metadata,
+        )
+        if record is None:
+            raise NotFoundError(f"User {user_id} not found")
 
-        # Check subscription
-        now = datetime.utcnow()
-        if not user.subscription_end or user.subscription_end <= now:
+        if not record.debited:
+            if record.is_blocked:
+                raise UserBlockedError(f"User {user_id} is blocked")
             raise SubscriptionExpiredError(
-                f"Subscription expired on {user.subscription_end}"
-                if user.subscription_end
+                f"Subscription expired on {record.subscription_end}"
+                if record.subscription_end
                 else "No subscription"
             )
 
-        # Check balance - разрешаем уход в минус, но логируем
-        if user.token_balance < amount:
-            logger.warning(
-                f"User {user_id} balance will go negative: "
-                f"current={user.token_balance}, spend={amount}, "
-                f"result={user.token_balance - amount}"
-            )
-            # НЕ выбрасываем исключение - продолжаем списание
+        if record.balance_after is None or record.transaction_id is None:
+            # Debit and ledger insert are one statement: a debit without a row is a bug
+            raise RuntimeError(f"Spend for user {user_id} debited without a ledger row")
 
-        balance_before = user.token_balance
-        new_balance = balance_before - amount
+        new_balance = record.balance_after
+        balance_before = new_balance + amount
 
-        # Update balance with optimistic locking
-        try:
-            await self.user_repo.update_balance(
-                user_id=user_id,
-                delta=-amount,
-                expected_version=user.balance_version,
-            )
-        except OptimisticLockError:
-            raise ConcurrentModificationError(
-                "Balance was modified by another request. Please retry."
+        # Разрешаем уход в минус, но логируем
+        if new_balance < 0:
+            logger.warning(
+                f"User {user_id} balance went negative: "
+                f"before={balance_before}, spend={amount}, result={new_balance}"
             )
 
-        # Create transaction record
-        transaction = Transaction(
-            user_id=user_id,
-            type=TransactionType.SPEND,
-            tokens_delta=-amount,
-            balance_after=new_balance,
-            description=description,
-            metadata_=metadata or {},
-        )
-        await self.transaction_repo.create(transaction)
-
         logger.info(
-            "Tokens spent: user=%d, amount=%d, balance=%d->%d, tx=%s",
+            "Tokens spent: user=%d, amount=%s, balance=%s->%s, tx=%s",
             user_id,
             amount,
             balance_before,
             new_balance,
-            transaction.id,
+            record.transaction_id,
         )
 
         return SpendResult(
-            transaction_id=transaction.id,
+            transaction_id=record.transaction_id,
             tokens_spent=amount,
             balance_before=balance_before,
             balance_after=new_balance,
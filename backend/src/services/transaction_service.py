@@ -1,16 +1,49 @@
 """Transaction service for transaction operations."""
 
+import base64
 import logging
+from datetime import datetime, timedelta
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.models.transaction import Transaction, TransactionType
 from src.db.repositories.transaction_repository import TransactionRepository, TransactionStats
-from src.services.dto.transaction import TransactionDTO, TransactionListDTO
+from src.services.dto.transaction import TransactionDTO, TransactionListDTO, TransactionPageDTO
 
 logger = logging.getLogger(__name__)
 
+_EPOCH = datetime(1970, 1, 1)
+_UUID_TOKEN_LEN = 22  # base64url of 16 bytes without padding
+
+
+def encode_cursor(transaction: Transaction, backward: bool = False) -> str:
+    """Encode keyset position as a compact token.
+
+    Format: direction ("n" older / "p" newer), created_at in microseconds
+    since epoch as hex, id as unpadded base64url. Fits Telegram's 64-byte
+    callback_data and contains no ":" (the CallbackData separator).
+    """
+    micros = (transaction.created_at - _EPOCH) // timedelta(microseconds=1)
+    uuid_token = base64.urlsafe_b64encode(transaction.id.bytes).rstrip(b"=").decode()
+    return f"{'p' if backward else 'n'}{micros:x}{uuid_token}"
+
+
+def decode_cursor(token: str) -> tuple[tuple[datetime, UUID], bool] | None:
+    """Decode token from encode_cursor.
+
+    Returns:
+        ((created_at, id), backward) or None if the token is malformed
+    """
+    if len(token) <= _UUID_TOKEN_LEN + 1 or token[0] not in ("n", "p"):
+        return None
+    try:
+        micros = int(token[1:-_UUID_TOKEN_LEN], 16)
+        transaction_id = UUID(bytes=base64.urlsafe_b64decode(token[-_UUID_TOKEN_LEN:] + "=="))
+    except ValueError:
+        return None
+    return (_EPOCH + timedelta(microseconds=micros), transaction_id), token[0] == "p"
+
 
 class TransactionService:
     """Service for transaction operations."""
@@ -92,6 +125,57 @@ class TransactionService:
             has_more=offset + len(items) < total,
         )
 
+    async def get_user_transactions_page(
+        self,
+        user_id: int,
+        limit: int = 20,
+        cursor: str | None = None,
+        total: int | None = None,
+        type_filter: TransactionType | None = None,
+    ) -> TransactionPageDTO:
+        """Get user transactions with keyset pagination.
+
+        Args:
+            user_id: Telegram user ID
+            limit: Page size
+            cursor: Token from a previous page's next_cursor/prev_cursor;
+                None or malformed starts from the newest page
+            total: Previously counted total to reuse; counted when None
+            type_filter: Filter by transaction type
+
+        Returns:
+            TransactionPageDTO with items and cursors for adjacent pages
+        """
+        decoded = decode_cursor(cursor) if cursor else None
+        position, backward = decoded if decoded is not None else (None, False)
+
+        transactions, has_more = await self.transaction_repo.get_page_by_user(
+            user_id=user_id,
+            limit=limit,
+            cursor=position,
+            backward=backward,
+            type_filter=type_filter,
+        )
+
+        if total is None:
+            total = await self.transaction_repo.count_by_user(user_id, type_filter)
+
+        # Going back past the newest row or forward past the oldest one
+        # may return an empty page; the adjacent button is then dropped.
+        if backward:
+            has_older = bool(transactions)
+            has_newer = has_more
+        else:
+            has_older = has_more
+            has_newer = position is not None and bool(transactions)
+
+        return TransactionPageDTO(
+            items=[self._to_dto(t) for t in transactions],
+            total=total,
+            next_cursor=encode_cursor(transactions[-1]) if has_older else None,
+            prev_cursor=encode_cursor(transactions[0], backward=True) if has_newer else None,
+        )
+
     async def get_user_stats(self, user_id: int) -> TransactionStats:
         """Get aggregated transaction stats."""
         return await self.transaction_repo.get_user_stats(user_id)
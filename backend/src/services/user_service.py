@@ -5,7 +5,8 @@ from datetime import UTC, datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.models.user import User
-from src.db.repositories.user_repository import UserRepository
+from src.db.repositories.user_repository import UserRepository, UserSnapshot
+from src.db.user_cache import user_cache
 from src.services.dto.user import SubscriptionStatus, UserProfile
 
 
@@ -55,6 +56,62 @@ class UserService:
 
         return user, created
 
+    async def get_or_create_snapshot(
+        self,
+        telegram_id: int,
+        username: str | None = None,
+        first_name: str | None = None,
+        last_name: str | None = None,
+    ) -> tuple[UserSnapshot, bool]:
+        """Get or create user as a slim read-only projection.
+
+        Used on the per-update path: constant DB cost regardless of how many
+        invoices and transactions the user has.
+
+        Returns:
+            Tuple of (snapshot, created) where created is True if new user was created.
+        """
+        snapshot, created = await self.user_repo.get_or_create_snapshot(
+            user_id=telegram_id,
+            username=username,
+            first_name=first_name,
+            last_name=last_name,
+        )
+
+        if not created and (
+            snapshot.username != username
+            or snapshot.first_name != first_name
+            or snapshot.last_name != last_name
+        ):
+            await self.user_repo.update_profile(
+                telegram_id,
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+            )
+            snapshot = snapshot.model_copy(
+                update={
+                    "username": username,
+                    "first_name": first_name,
+                    "last_name": last_name,
+                }
+            )
+
+        return snapshot, created
+
+    async def get_fresh_snapshot(self, telegram_id: int) -> UserSnapshot | None:
+        """Re-read user snapshot from the primary and refresh the cache.
+
+        Balance and subscription are also changed by the API process
+        (payment webhook, token API), whose writes cannot invalidate this
+        process's snapshot cache. Screens that show them read them fresh.
+        """
+        token = user_cache.read_token()
+        snapshot = await self.user_repo.get_snapshot(telegram_id)
+        if snapshot is not None:
+            user_cache.put(snapshot, token)
+        return snapshot
+
     async def get_user(self, telegram_id: int) -> User | None:
         """Get user by Telegram ID."""
         return await self.user_repo.get_by_id(telegram_id)
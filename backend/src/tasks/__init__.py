@@ -1,5 +1,6 @@
 """Scheduled tasks module."""
 
+from src.tasks.partition_tasks import run_ensure_partitions_task
 from src.tasks.subscription_tasks import (
     run_auto_renewal_task,
     run_expiry_notification_task,
@@ -9,6 +10,7 @@ from src.tasks.subscription_tasks import (
 
 __all__ = [
     "run_auto_renewal_task",
+    "run_ensure_partitions_task",
     "run_expiry_notification_task",
     "run_expire_subscriptions_task",
     "setup_scheduler",
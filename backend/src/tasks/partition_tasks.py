@@ -0,0 +1,29 @@
+"""Transactions partition maintenance tasks."""
+
+import logging
+
+from src.core.config import settings
+from src.db.repositories.transaction_partition_repository import (
+    TransactionPartitionRepository,
+)
+from src.db.session import get_session
+
+logger = logging.getLogger(__name__)
+
+
+async def run_ensure_partitions_task() -> list[str]:
+    """Task to create upcoming monthly transactions partitions.
+
+    Keeps TRANSACTION_PARTITIONS_AHEAD months created ahead, so inserts
+    never land in the DEFAULT partition.
+
+    Returns:
+        Names of created partitions
+    """
+    async with get_session() as session:
+        repo = TransactionPartitionRepository(session)
+        created = await repo.ensure_partitions(settings.transaction_partitions_ahead)
+
+    if created:
+        logger.info("Created transactions partitions: %s", ", ".join(created))
+    return created
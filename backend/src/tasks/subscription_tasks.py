@@ -5,12 +5,12 @@ import logging
 from datetime import datetime
 from typing import Any
 
-from aiogram import Bot
-
 from src.core.config import settings
+from src.db.repositories.outbox_repository import OutboxRepository
 from src.db.session import get_session
 from src.services.notification_service import NotificationService
 from src.services.subscription_service import SubscriptionService
+from src.tasks.partition_tasks import run_ensure_partitions_task
 
 logger = logging.getLogger(__name__)
 
@@ -18,22 +18,20 @@ logger = logging.getLogger(__name__)
 _scheduler: Any = None
 
 
-async def run_expiry_notification_task(bot: Bot) -> dict[int, list[int]]:
+async def run_expiry_notification_task() -> dict[int, list[int]]:
     """Task to send expiry notifications for subscriptions.
 
     Checks for subscriptions expiring within configured days
     and sends notifications to users.
 
-    Args:
-        bot: Telegram bot instance
-
     Returns:
         Dict mapping days_left to list of notified user IDs
     """
     logger.info("Running expiry notification task at %s", datetime.utcnow())
 
     async with get_session() as session:
-        notification_service = NotificationService(bot)
+        # Notifications are enqueued with the changes and sent by OutboxDispatcher
+        notification_service = NotificationService(outbox=OutboxRepository(session))
         subscription_service = SubscriptionService(session, notification_service)
 
         result = await subscription_service.check_expiring_subscriptions()
@@ -44,7 +42,7 @@ async def run_expiry_notification_task(bot: Bot) -> dict[int, list[int]]:
         return result
 
 
-async def run_auto_renewal_task(bot: Bot) -> dict[str, list[int]]:
+async def run_auto_renewal_task() -> dict[str, list[int]]:
     """Task to process auto-renewals for expiring subscriptions.
 
     Attempts to renew subscriptions for users with:
@@ -52,16 +50,14 @@ async def run_auto_renewal_task(bot: Bot) -> dict[str, list[int]]:
     - subscription expiring today or already expired
     - sufficient token balance
 
-    Args:
-        bot: Telegram bot instance
-
     Returns:
         Dict with 'success' and 'failed' user ID lists
     """
     logger.info("Running auto-renewal task at %s", datetime.utcnow())
 
     async with get_session() as session:
-        notification_service = NotificationService(bot)
+        # Notifications are enqueued with the changes and sent by OutboxDispatcher
+        notification_service = NotificationService(outbox=OutboxRepository(session))
         subscription_service = SubscriptionService(session, notification_service)
 
         result = await subscription_service.process_all_auto_renewals()
@@ -74,21 +70,19 @@ async def run_auto_renewal_task(bot: Bot) -> dict[str, list[int]]:
         return result
 
 
-async def run_expire_subscriptions_task(bot: Bot) -> list[int]:
+async def run_expire_subscriptions_task() -> list[int]:
     """Task to notify users about expired subscriptions.
 
     Finds users with expired subscriptions and sends notifications.
 
-    Args:
-        bot: Telegram bot instance
-
     Returns:
         List of user IDs that were notified
     """
     logger.info("Running expire subscriptions task at %s", datetime.utcnow())
 
     async with get_session() as session:
-        notification_service = NotificationService(bot)
+        # Notifications are enqueued with the changes and sent by OutboxDispatcher
+        notification_service = NotificationService(outbox=OutboxRepository(session))
         subscription_service = SubscriptionService(session, notification_service)
 
         expired_users = await subscription_service.expire_subscriptions()
@@ -100,11 +94,10 @@ async def run_expire_subscriptions_task(bot: Bot) -> list[int]:
         return expired_users
 
 
-def setup_scheduler(bot: Bot) -> Any:
+def setup_scheduler() -> Any:
     """Set up APScheduler for subscription tasks.
 
-    Args:
-        bot: Telegram bot instance for notifications
+    Notifications are enqueued to the outbox and delivered by OutboxDispatcher.
 
     Returns:
         Configured scheduler instance
@@ -127,7 +120,6 @@ def setup_scheduler(bot: Bot) -> Any:
     scheduler.add_job(
         run_expiry_notification_task,
         CronTrigger(hour="*/6"),
-        args=[bot],
         id="expiry_notifications",
         name="Send subscription expiry notifications",
         replace_existing=True,
@@ -137,7 +129,6 @@ def setup_scheduler(bot: Bot) -> Any:
     scheduler.add_job(
         run_auto_renewal_task,
         CronTrigger(hour=0, minute=5),
-        args=[bot],
         id="auto_renewals",
         name="Process subscription auto-renewals",
         replace_existing=True,
@@ -147,12 +138,20 @@ def setup_scheduler(bot: Bot) -> Any:
     scheduler.add_job(
         run_expire_subscriptions_task,
         CronTrigger(hour=10, minute=0),
-        args=[bot],
         id="expire_subscriptions",
         name="Notify about expired subscriptions",
         replace_existing=True,
     )
 
+    # Task 4: Create upcoming transactions partitions (daily at 03:00)
+    scheduler.add_job(
+        run_ensure_partitions_task,
+        CronTrigger(hour=3, minute=0),
+        id="transaction_partitions",
+        name="Create upcoming transactions partitions",
+        replace_existing=True,
+    )
+
     _scheduler = scheduler
     logger.info("Subscription scheduler configured with %d jobs", len(scheduler.get_jobs()))
 
@@ -175,20 +174,17 @@ def stop_scheduler() -> None:
         logger.info("Subscription scheduler stopped")
 
 
-async def run_all_tasks_once(bot: Bot) -> dict:
+async def run_all_tasks_once() -> dict:
     """Run all subscription tasks once (for testing/manual execution).
 
-    Args:
-        bot: Telegram bot instance
-
     Returns:
         Combined results from all tasks
     """
     logger.info("Running all subscription tasks manually at %s", datetime.utcnow())
 
-    notifications = await run_expiry_notification_task(bot)
-    renewals = await run_auto_renewal_task(bot)
-    expired = await run_expire_subscriptions_task(bot)
+    notifications = await run_expiry_notification_task()
+    renewals = await run_auto_renewal_task()
+    expired = await run_expire_subscriptions_task()
 
     return {
         "notifications": notifications,